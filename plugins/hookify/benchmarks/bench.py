@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""End-to-end latency, throughput and memory benchmarks for hookify.
+
+For every ruleset size and payload this measures:
+
+- process: cold-start latency and peak RSS of the real hooks/*.py
+  scripts, run as Claude Code runs them (stdin in, JSON out), with the
+  daemon disabled.
+- daemon: the same scripts talking to a running daemon.
+- warm: in-process RuleEngine.evaluate_rules time with rules loaded and
+  peak Python allocation during one evaluation.
+
+Everything runs in a temporary project with its own cache and runtime
+dirs, so the user's caches are untouched, and with the decision cache
+off, so repeated payloads measure rule evaluation. Results are JSON, so two runs
+(e.g. on two commits) can be compared with --compare.
+
+Usage:
+    python3 bench.py [--quick] [--sizes 10,100] [--payloads bash,write]
+                     [--modes process,warm] [--repeat 5] [-o results.json]
+    python3 bench.py --compare base.json head.json [--threshold 1.2]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from typing import Any, Dict, List
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGINS_DIR = os.path.dirname(PLUGIN_ROOT)
+if PLUGINS_DIR not in sys.path:
+    sys.path.insert(0, PLUGINS_DIR)
+
+from hookify.benchmarks import synthetic
+
+# Hook script per payload's hook event
+HOOK_SCRIPTS = {
+    'PreToolUse': 'pretooluse.py',
+    'PostToolUse': 'posttooluse.py',
+    'Stop': 'stop.py',
+    'UserPromptSubmit': 'userpromptsubmit.py',
+}
+
+ALL_SIZES = [10, 100, 1000, 10000]
+ALL_PAYLOADS = ['bash', 'write', 'multiedit', 'prompt', 'stop']
+ALL_MODES = ['process', 'daemon', 'warm']
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary(times_ms: List[float]) -> Dict[str, float]:
+    return {
+        'runs': len(times_ms),
+        'min_ms': round(min(times_ms), 3),
+        'median_ms': round(_percentile(times_ms, 0.5), 3),
+        'p95_ms': round(_percentile(times_ms, 0.95), 3),
+        'max_ms': round(max(times_ms), 3),
+    }
+
+
+def build_payloads(work_dir: str, names: List[str], args) -> Dict[str, Dict[str, Any]]:
+    """Build the requested payloads, writing the transcript if needed."""
+    payloads = {}
+    for name in names:
+        if name == 'bash':
+            payloads[name] = synthetic.bash_payload()
+        elif name == 'write':
+            payloads[name] = synthetic.write_payload(args.write_mb * 1024 * 1024)
+        elif name == 'multiedit':
+            payloads[name] = synthetic.multiedit_payload(args.edits)
+        elif name == 'prompt':
+            payloads[name] = synthetic.prompt_payload()
+        elif name == 'stop':
+            transcript = os.path.join(work_dir, 'transcript.jsonl')
+            synthetic.write_transcript(transcript, args.transcript_mb * 1024 * 1024)
+            payloads[name] = synthetic.stop_payload(transcript)
+        else:
+            raise ValueError(f"Unknown payload: {name}")
+    return payloads
+
+
+def _with_session(payload: Dict[str, Any], session: str) -> Dict[str, Any]:
+    # A fresh session per run defeats transcript checkpoints, so Stop runs
+    # measure a full scan rather than an incremental one
+    payload = dict(payload)
+    payload['session_id'] = session
+    return payload
+
+
+def run_hook_process(project_dir: str, env: Dict[str, str], payload: Dict[str, Any],
+                     work_dir: str) -> Dict[str, Any]:
+    """Run the real hook script once and return wall time and peak RSS."""
+    script = os.path.join(PLUGIN_ROOT, 'hooks', HOOK_SCRIPTS[payload['hook_event_name']])
+    payload_path = os.path.join(work_dir, 'payload.json')
+    with open(payload_path, 'w') as f:
+        json.dump(payload, f)
+
+    with open(payload_path, 'rb') as stdin, tempfile.TemporaryFile() as stdout:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, script], cwd=project_dir, env=env,
+                                stdin=stdin, stdout=stdout, stderr=subprocess.DEVNULL)
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, 'waitstatus_to_exitcode') else status
+        stdout.seek(0)
+        output = stdout.read()
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss_kb = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+    return {'ms': elapsed * 1000, 'rss_kb': rss_kb, 'output': output}
+
+
+def bench_process(project_dir: str, env: Dict[str, str], payload: Dict[str, Any],
+                  work_dir: str, repeat: int) -> Dict[str, Any]:
+    """Benchmark cold-start hook processes."""
+    # Warm-up run fills the ruleset cache like any earlier event would
+    run_hook_process(project_dir, env, _with_session(payload, 'warmup'), work_dir)
+
+    runs = [run_hook_process(project_dir, env, _with_session(payload, f'run-{i}'), work_dir)
+            for i in range(repeat)]
+    result = _summary([r['ms'] for r in runs])
+    result['peak_rss_kb'] = max(r['rss_kb'] for r in runs)
+    result['matched'] = runs[-1]['output'].strip() not in (b'', b'{}')
+    return result
+
+
+def bench_daemon(project_dir: str, env: Dict[str, str], payload: Dict[str, Any],
+                 work_dir: str, repeat: int) -> Dict[str, Any]:
+    """Benchmark hook processes answered by a running daemon."""
+    from hookify.core import daemon
+
+    env = dict(env)
+    env.pop('HOOKIFY_DAEMON', None)
+    env['PYTHONPATH'] = PLUGINS_DIR
+    server = subprocess.Popen([sys.executable, '-m', 'hookify.core.daemon', project_dir],
+                              cwd=project_dir, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        old_runtime = os.environ.get('XDG_RUNTIME_DIR')
+        os.environ['XDG_RUNTIME_DIR'] = env['XDG_RUNTIME_DIR']
+        socket_path = daemon.socket_path(project_dir, env)
+        if old_runtime is None:
+            del os.environ['XDG_RUNTIME_DIR']
+        else:
+            os.environ['XDG_RUNTIME_DIR'] = old_runtime
+
+        deadline = time.time() + 10
+        while not os.path.exists(socket_path) and time.time() < deadline:
+            time.sleep(0.01)
+        return bench_process(project_dir, env, payload, work_dir, repeat)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def bench_warm(project_dir: str, payload: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    """Benchmark in-process evaluation with rules already loaded."""
+    import tracemalloc
+    from hookify.core.config_loader import load_rules
+    from hookify.core.daemon import rule_event_for
+    from hookify.core.ordering import ConditionStats
+    from hookify.core.rule_engine import RuleEngine
+
+    old_cwd = os.getcwd()
+    os.chdir(project_dir)
+    try:
+        tool_name = payload.get('tool_name', '')
+        rules = load_rules(event=rule_event_for(payload['hook_event_name'], tool_name),
+                           tool_name=tool_name)
+        engine = RuleEngine(ConditionStats())
+
+        times = []
+        for i in range(repeat):
+            run_payload = _with_session(payload, f'warm-{i}')
+            start = time.perf_counter()
+            engine.evaluate_rules(rules, run_payload)
+            times.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        engine.evaluate_rules(rules, _with_session(payload, 'warm-alloc'))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.chdir(old_cwd)
+
+    result = _summary(times)
+    result['rules_visited'] = len(rules)
+    result['peak_alloc_kb'] = peak // 1024
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PLUGIN_ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def run(args) -> Dict[str, Any]:
+    """Run the benchmark matrix and return the results document."""
+    work_dir = tempfile.mkdtemp(prefix='hookify-bench-')
+    env = dict(os.environ)
+    env.update({
+        'CLAUDE_PLUGIN_ROOT': PLUGIN_ROOT,
+        'HOOKIFY_DAEMON': '0',
+        # Repeated payloads would be answered from the decision cache
+        'HOOKIFY_DECISION_CACHE': '0',
+        'XDG_CACHE_HOME': os.path.join(work_dir, 'cache'),
+        'XDG_RUNTIME_DIR': os.path.join(work_dir, 'run'),
+        # Keep the user's own ~/.claude rules out of the measurements
+        'CLAUDE_CONFIG_DIR': os.path.join(work_dir, 'config'),
+    })
+    env.pop('CLAUDE_PROJECT_DIR', None)
+    os.makedirs(env['XDG_RUNTIME_DIR'], mode=0o700)
+
+    # The warm benchmark runs in this process; keep its caches and rule
+    # sources isolated too
+    isolated = ('XDG_CACHE_HOME', 'CLAUDE_CONFIG_DIR', 'CLAUDE_PROJECT_DIR', 'HOOKIFY_DECISION_CACHE')
+    old_environ = {name: os.environ.get(name) for name in isolated}
+    for name in isolated:
+        if name in env:
+            os.environ[name] = env[name]
+        else:
+            os.environ.pop(name, None)
+
+    results = []
+    try:
+        payloads = build_payloads(work_dir, args.payloads, args)
+        for size in args.sizes:
+            project_dir = os.path.join(work_dir, f'project-{size}')
+            synthetic.generate_ruleset(project_dir, size, seed=args.seed)
+            for name, payload in payloads.items():
+                for mode in args.modes:
+                    if mode == 'process':
+                        result = bench_process(project_dir, env, payload, work_dir, args.repeat)
+                    elif mode == 'daemon':
+                        result = bench_daemon(project_dir, env, payload, work_dir, args.repeat)
+                    else:
+                        result = bench_warm(project_dir, payload, args.repeat)
+                    result.update({'rules': size, 'payload': name, 'mode': mode})
+                    results.append(result)
+                    print(f"{mode:8} {size:6} rules {name:10} median {result['median_ms']:9.2f} ms",
+                          file=sys.stderr)
+    finally:
+        for name, value in old_environ.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'version': 1,
+        'meta': {
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'args': {k: v for k, v in vars(args).items() if k not in ('compare', 'output')},
+        },
+        'results': results,
+    }
+
+
+def compare(base_path: str, head_path: str, threshold: float) -> int:
+    """Print median time ratios between two result files.
+
+    Returns:
+        1 if any benchmark slowed down by more than threshold, else 0.
+    """
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+
+    def key(r):
+        return (r['mode'], r['rules'], r['payload'])
+
+    base_results = {key(r): r for r in base['results']}
+    regressions = 0
+    print(f"{'mode':8} {'rules':>6} {'payload':10} {'base ms':>10} {'head ms':>10} {'ratio':>7}")
+    for r in head['results']:
+        b = base_results.get(key(r))
+        if not b:
+            continue
+        ratio = r['median_ms'] / b['median_ms'] if b['median_ms'] else float('inf')
+        flag = '  REGRESSION' if ratio > threshold else ''
+        regressions += bool(flag)
+        print(f"{r['mode']:8} {r['rules']:6} {r['payload']:10} "
+              f"{b['median_ms']:10.2f} {r['median_ms']:10.2f} {ratio:7.2f}{flag}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=lambda s: [int(x) for x in s.split(',')], default=ALL_SIZES)
+    parser.add_argument('--payloads', type=lambda s: s.split(','), default=ALL_PAYLOADS)
+    parser.add_argument('--modes', type=lambda s: s.split(','), default=ALL_MODES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--write-mb', type=int, default=4)
+    parser.add_argument('--edits', type=int, default=500)
+    parser.add_argument('--transcript-mb', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--quick', action='store_true',
+                        help='small sizes and payloads for a fast smoke run')
+    parser.add_argument('-o', '--output', help='write results JSON here (default: stdout)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'HEAD'))
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(args.compare[0], args.compare[1], args.threshold))
+
+    if args.quick:
+        args.sizes = [10, 100]
+        args.repeat = 3
+        args.write_mb = 1
+        args.edits = 100
+        args.transcript_mb = 5
+
+    document = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
+
+
+if __name__ == '__main__':
+    main()
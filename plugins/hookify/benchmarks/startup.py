@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Cold-start budget check for the hookify hook scripts.
+
+Most hook events match no rule, so their cost is almost all interpreter
+startup and imports. This runs the real hooks/*.py scripts, the way
+hooks.json runs them (python3 -S), on events that match nothing:
+
+- empty-bucket: a prompt in a project with only bash rules, answered
+  from the bucket summary without parsing the payload.
+- daemon: a non-matching Bash command, answered by a running daemon.
+
+For each it records `-X importtime` and fails (exit 1) if the hook
+imports a module on the forbidden list, if hookify's own imports take
+longer than --import-budget, or if the median end-to-end time is over
+--target. Everything runs in a temporary project with its own cache and
+runtime dirs.
+
+Usage:
+    python3 startup.py [--repeat 20] [--target 50] [--import-budget 15]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from typing import Any, Dict, List, Tuple
+
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGINS_DIR = os.path.dirname(PLUGIN_ROOT)
+
+# Modules that mean the hook did more work than a no-match event needs
+FORBIDDEN_MODULES = [
+    'json', 're', 'typing', 'socket', 'hashlib', 'dataclasses', 'glob', 'tempfile', 'subprocess',
+]
+
+RULE_TEMPLATE = """---
+name: startup-{index}
+enabled: true
+event: bash
+pattern: startup-check-{index}\\s+--never
+action: warn
+---
+
+Startup check rule {index}.
+"""
+
+SCENARIOS = {
+    'empty-bucket': ('userpromptsubmit.py', {
+        'hook_event_name': 'UserPromptSubmit',
+        'session_id': 'startup',
+        'user_prompt': 'Please refactor the parser and run the tests',
+    }),
+    'daemon': ('pretooluse.py', {
+        'hook_event_name': 'PreToolUse',
+        'session_id': 'startup',
+        'tool_name': 'Bash',
+        'tool_input': {'command': 'git status && ls -la'},
+    }),
+}
+
+
+def parse_importtime(stderr: str) -> Tuple[List[str], int]:
+    """Parse -X importtime output.
+
+    Returns:
+        (modules, hookify_us): every imported module name, and the
+        cumulative microseconds of hookify's top-level imports.
+    """
+    modules = []
+    hookify_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        modules.append(module)
+        # Top-level entries have exactly one space after the bar
+        if module.startswith('hookify') and not name.startswith('  '):
+            hookify_us += int(cumulative)
+    return modules, hookify_us
+
+
+def run_hook(script: str, payload: bytes, project_dir: str, env: Dict[str, str],
+             importtime: bool = False) -> Tuple[float, bytes, str]:
+    """Run a hook script once; return wall ms, stdout and stderr."""
+    command = [sys.executable, '-S']
+    if importtime:
+        command += ['-X', 'importtime']
+    command.append(os.path.join(PLUGIN_ROOT, 'hooks', script))
+    start = time.perf_counter()
+    proc = subprocess.run(command, input=payload, cwd=project_dir, env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, proc.stdout, proc.stderr.decode('utf-8', 'replace')
+
+
+def check_scenario(name: str, project_dir: str, env: Dict[str, str], args) -> Dict[str, Any]:
+    """Measure one scenario and list the budget violations."""
+    script, payload = SCENARIOS[name]
+    data = json.dumps(payload).encode('utf-8')
+
+    _, output, stderr = run_hook(script, data, project_dir, env, importtime=True)
+    modules, hookify_us = parse_importtime(stderr)
+    times = sorted(run_hook(script, data, project_dir, env)[0] for _ in range(args.repeat))
+    median = times[len(times) // 2]
+
+    problems = []
+    if output.strip() != b'{}':
+        problems.append(f'expected no match, got {output.strip()[:200]!r}')
+    forbidden = sorted(set(modules) & set(FORBIDDEN_MODULES))
+    if forbidden:
+        problems.append(f"imports {', '.join(forbidden)}")
+    if hookify_us / 1000 > args.import_budget:
+        problems.append(f'hookify imports took {hookify_us / 1000:.1f}ms (budget {args.import_budget:g}ms)')
+    if median > args.target:
+        problems.append(f'median {median:.1f}ms (target {args.target:g}ms)')
+
+    return {
+        'scenario': name,
+        'median_ms': round(median, 3),
+        'min_ms': round(times[0], 3),
+        'import_ms': round(hookify_us / 1000, 3),
+        'modules': len(modules),
+        'problems': problems,
+    }
+
+
+def run(args) -> List[Dict[str, Any]]:
+    """Set up a temporary project and check every scenario."""
+    work_dir = tempfile.mkdtemp(prefix='hookify-startup-')
+    project_dir = os.path.join(work_dir, 'project')
+    rules_dir = os.path.join(project_dir, '.claude')
+    os.makedirs(rules_dir)
+    for i in range(args.rules):
+        with open(os.path.join(rules_dir, f'hookify.startup-{i:03d}.local.md'), 'w') as f:
+            f.write(RULE_TEMPLATE.format(index=i))
+
+    env = dict(os.environ)
+    env.update({
+        'CLAUDE_PLUGIN_ROOT': PLUGIN_ROOT,
+        'XDG_CACHE_HOME': os.path.join(work_dir, 'cache'),
+        'XDG_RUNTIME_DIR': os.path.join(work_dir, 'run'),
+        'CLAUDE_CONFIG_DIR': os.path.join(work_dir, 'config'),
+    })
+    env.pop('CLAUDE_PROJECT_DIR', None)
+    env.pop('HOOKIFY_DAEMON', None)
+    env.pop('HOOKIFY_CACHE', None)
+    os.makedirs(env['XDG_RUNTIME_DIR'], mode=0o700)
+
+    server = None
+    try:
+        # Fill the ruleset cache and bucket summary like an earlier event would
+        warm_env = dict(env, HOOKIFY_DAEMON='0')
+        run_hook('pretooluse.py', json.dumps(SCENARIOS['daemon'][1]).encode('utf-8'), project_dir, warm_env)
+
+        server = subprocess.Popen([sys.executable, '-m', 'hookify.core.daemon', project_dir],
+                                  cwd=project_dir, env=dict(env, PYTHONPATH=PLUGINS_DIR),
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        runtime_dir = os.path.join(env['XDG_RUNTIME_DIR'], f'hookify-{os.getuid()}')
+        deadline = time.time() + 10
+        while time.time() < deadline and not (
+                os.path.isdir(runtime_dir) and any(n.endswith('.sock') for n in os.listdir(runtime_dir))):
+            time.sleep(0.01)
+
+        return [check_scenario(name, project_dir, env, args) for name in args.scenarios]
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scenarios', type=lambda s: s.split(','), default=list(SCENARIOS))
+    parser.add_argument('--rules', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--target', type=float, default=50.0,
+                        help='median end-to-end ms allowed per no-match event')
+    parser.add_argument('--import-budget', type=float, default=15.0,
+                        help='ms allowed for importing hookify modules')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            status = 'FAIL' if r['problems'] else 'ok'
+            print(f"{r['scenario']:14} median {r['median_ms']:7.2f} ms  min {r['min_ms']:7.2f} ms  "
+                  f"hookify imports {r['import_ms']:6.2f} ms  {status}")
+            for problem in r['problems']:
+                print(f'    {problem}')
+    sys.exit(1 if any(r['problems'] for r in results) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Synthetic rulesets and hook payloads for hookify benchmarks.
+
+Rulesets spread rules across the bash, file, stop, prompt and all events
+and use every operator. Patterns are drawn so that most rules don't
+match, like real policies. A few do match, so the output path is
+exercised too. Generation is seeded, so the same arguments always
+produce the same files.
+"""
+
+import os
+import json
+import random
+from typing import Any, Dict, List
+
+OPERATORS = ['regex_match', 'contains', 'equals', 'not_contains', 'starts_with', 'ends_with']
+
+# Fields each event's rules check
+EVENT_FIELDS = {
+    'bash': ['command'],
+    'file': ['file_path', 'new_text', 'content', 'old_text'],
+    'stop': ['reason', 'transcript'],
+    'prompt': ['user_prompt'],
+    'all': ['command', 'file_path', 'content'],
+}
+
+# Share of rules per event
+EVENT_WEIGHTS = [('bash', 30), ('file', 40), ('stop', 10), ('prompt', 10), ('all', 10)]
+
+# Text every synthetic payload contains; every 50th rule looks for it
+MARKER = 'hookify-bench-marker'
+
+# Field each event's marker rules check
+MARKER_FIELDS = {
+    'bash': 'command',
+    'file': 'content',
+    'stop': 'reason',
+    'prompt': 'user_prompt',
+    'all': 'command',
+}
+
+# Out of every this many stop rules, one reads the transcript
+TRANSCRIPT_RULE_EVERY = 25
+
+_REGEX_TEMPLATES = [
+    r'{w}\s+-{f}',
+    r'\b{w}\(',
+    r'\.{w}$',
+    r'({w}|{v})_{f}',
+    r'{w}[0-9]+{v}',
+    r'^{w}\b',
+]
+
+
+def _word(rng: random.Random) -> str:
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 9)))
+
+
+def _pattern(rng: random.Random, operator: str) -> str:
+    if operator == 'regex_match':
+        template = rng.choice(_REGEX_TEMPLATES)
+        return template.format(w=_word(rng), v=_word(rng), f=rng.choice('rfxv'))
+    return _word(rng)
+
+
+def _rule_file(index: int, event: str, conditions: List[Dict[str, str]], action: str) -> str:
+    lines = [
+        '---',
+        f'name: bench-rule-{index}',
+        'enabled: true',
+        f'event: {event}',
+        f'action: {action}',
+        'conditions:',
+    ]
+    for condition in conditions:
+        lines.append(f"  - field: {condition['field']}")
+        lines.append(f"    operator: {condition['operator']}")
+        lines.append(f"    pattern: {condition['pattern']}")
+    lines.append('---')
+    lines.append('')
+    lines.append(f'Benchmark rule {index} matched.')
+    return '\n'.join(lines) + '\n'
+
+
+def generate_ruleset(project_dir: str, count: int, seed: int = 0) -> List[str]:
+    """Write count rule files into project_dir/.claude.
+
+    Args:
+        project_dir: Project directory to create rules in
+        count: Number of rules
+        seed: Random seed
+
+    Returns:
+        List of rule file paths written
+    """
+    rng = random.Random(seed)
+    rules_dir = os.path.join(project_dir, '.claude')
+    os.makedirs(rules_dir, exist_ok=True)
+
+    events = [event for event, weight in EVENT_WEIGHTS for _ in range(weight)]
+    paths = []
+    stop_rules = 0
+    for i in range(count):
+        event = rng.choice(events)
+        fields = EVENT_FIELDS[event]
+        if event == 'stop':
+            stop_rules += 1
+            fields = ['transcript'] if stop_rules % TRANSCRIPT_RULE_EVERY == 0 else ['reason']
+
+        conditions = []
+        for _ in range(rng.randint(1, 3)):
+            operator = rng.choice(OPERATORS)
+            conditions.append({
+                'field': rng.choice(fields),
+                'operator': operator,
+                'pattern': _pattern(rng, operator),
+            })
+
+        # Every 50th rule matches the synthetic payloads
+        if i % 50 == 0:
+            conditions = [{'field': MARKER_FIELDS[event], 'operator': 'contains', 'pattern': MARKER}]
+
+        path = os.path.join(rules_dir, f'hookify.bench-{i:05d}.local.md')
+        with open(path, 'w') as f:
+            f.write(_rule_file(i, event, conditions, rng.choice(['warn', 'warn', 'block'])))
+        paths.append(path)
+
+    return paths
+
+
+def _filler(rng: random.Random, size: int) -> str:
+    """Generate roughly size characters of code-like text."""
+    words = [_word(rng) for _ in range(200)]
+    parts = []
+    length = 0
+    while length < size:
+        line = f"    const {rng.choice(words)} = {rng.choice(words)}({rng.choice(words)}, {rng.randint(0, 9999)});\n"
+        parts.append(line)
+        length += len(line)
+    return ''.join(parts)
+
+
+def bash_payload(seed: int = 0) -> Dict[str, Any]:
+    """A short Bash PreToolUse payload."""
+    return {
+        'hook_event_name': 'PreToolUse',
+        'session_id': f'bench-{seed}',
+        'tool_name': 'Bash',
+        'tool_input': {'command': f'git status && npm test -- --watch=false # {MARKER}'},
+    }
+
+
+def write_payload(size: int, seed: int = 0) -> Dict[str, Any]:
+    """A Write PreToolUse payload with about size characters of content."""
+    rng = random.Random(seed)
+    return {
+        'hook_event_name': 'PreToolUse',
+        'session_id': f'bench-{seed}',
+        'tool_name': 'Write',
+        'tool_input': {
+            'file_path': '/project/src/generated/module.ts',
+            'content': _filler(rng, size) + f'// {MARKER}\n',
+        },
+    }
+
+
+def multiedit_payload(edits: int, seed: int = 0) -> Dict[str, Any]:
+    """A MultiEdit PreToolUse payload with edits small edits."""
+    rng = random.Random(seed)
+    return {
+        'hook_event_name': 'PreToolUse',
+        'session_id': f'bench-{seed}',
+        'tool_name': 'MultiEdit',
+        'tool_input': {
+            'file_path': '/project/src/app.py',
+            'edits': [
+                {'old_string': _filler(rng, 80), 'new_string': _filler(rng, 120)}
+                for _ in range(edits)
+            ],
+        },
+    }
+
+
+def prompt_payload(seed: int = 0) -> Dict[str, Any]:
+    """A short UserPromptSubmit payload."""
+    return {
+        'hook_event_name': 'UserPromptSubmit',
+        'session_id': f'bench-{seed}',
+        'user_prompt': f'Please refactor the parser and run the tests ({MARKER})',
+    }
+
+
+def write_transcript(path: str, size: int, seed: int = 0) -> None:
+    """Write a JSONL transcript of about size bytes without holding it in memory."""
+    rng = random.Random(seed)
+    chunk = _filler(rng, 4096)
+    written = 0
+    with open(path, 'w') as f:
+        turn = 0
+        while written < size:
+            role = 'assistant' if turn % 2 else 'user'
+            line = json.dumps({'type': role, 'message': {'role': role, 'content': chunk}}) + '\n'
+            f.write(line)
+            written += len(line)
+            turn += 1
+
+
+def stop_payload(transcript_path: str, seed: int = 0) -> Dict[str, Any]:
+    """A Stop payload pointing at transcript_path."""
+    return {
+        'hook_event_name': 'Stop',
+        'session_id': f'bench-{seed}',
+        'transcript_path': transcript_path,
+        'reason': f'Task complete ({MARKER})',
+    }
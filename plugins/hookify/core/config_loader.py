@@ -1,16 +1,33 @@
 #!/usr/bin/env python3
 """Configuration loader for hookify plugin.
 
-Loads and parses .claude/hookify.*.local.md files.
+Loads and parses hookify rule files from every rule source:
+
+- hookify.<name>.local.md holds one rule: YAML frontmatter, then the
+  message.
+- hookify.<name>.bundle.md holds any number of rules, each a frontmatter
+  block followed by its message. Lines of exactly --- separate them, so
+  bundle messages must not use --- as a horizontal rule.
+
+Sources are layered (see fastpath.rule_dirs): user-global ~/.claude,
+the project root's .claude, then .claude dirs nested between the project
+root and the current directory. A rule in a later source replaces every
+rule with the same name from earlier sources, keeping the position of
+the first one; "enabled: false" there switches the rule off. Rules
+without a name never override.
 """
 
 import os
 import sys
-import glob
 import re
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, field
 
+from hookify.core.fastpath import is_bundle, rule_files, rule_fingerprint
+from hookify.core.rule_index import RuleIndex
+from hookify.matchers.regex_safety import check_pattern
+from hookify.utils.cache_files import cache_enabled
+
 
 @dataclass
 class Condition:
@@ -40,6 +57,9 @@ class Rule:
     action: str = "warn"  # "warn" or "block" (future)
     tool_matcher: Optional[str] = None  # Override tool matching
     message: str = ""  # Message body from markdown
+    scan_first: Optional[int] = None  # Search only the first N chars of large fields
+    scan_last: Optional[int] = None  # Search only the last N chars of large fields
+    skip_larger_than: Optional[int] = None  # Don't apply to fields longer than N chars
 
     @classmethod
     def from_dict(cls, frontmatter: Dict[str, Any], message: str) -> 'Rule':
@@ -80,16 +100,39 @@ class Rule:
             conditions=conditions,
             action=frontmatter.get('action', 'warn'),
             tool_matcher=frontmatter.get('tool_matcher'),
-            message=message.strip()
+            message=message.strip(),
+            scan_first=parse_size(frontmatter.get('scan_first')),
+            scan_last=parse_size(frontmatter.get('scan_last')),
+            skip_larger_than=parse_size(frontmatter.get('skip_larger_than'))
         )
 
 
+# Size suffixes accepted by parse_size
+_SIZE_UNITS = {'': 1, 'k': 1024, 'kb': 1024, 'm': 1024 ** 2, 'mb': 1024 ** 2}
+_SIZE = re.compile(r'\s*(\d+)\s*([a-z]*)\s*', re.IGNORECASE)
+
+
+def parse_size(value: Any) -> Optional[int]:
+    """Parse a size like "64KB", "2MB" or "4096" into a character count.
+
+    Returns:
+        The size, or None if value is empty.
+
+    Raises:
+        ValueError: if value is not a valid size
+    """
+    if value is None or value == '':
+        return None
+    m = _SIZE.fullmatch(str(value))
+    if not m or m.group(2).lower() not in _SIZE_UNITS:
+        raise ValueError(f"invalid size '{value}' (expected e.g. 4096, 64KB or 2MB)")
+    return int(m.group(1)) * _SIZE_UNITS[m.group(2).lower()]
+
+
 def extract_frontmatter(content: str) -> tuple[Dict[str, Any], str]:
     """Extract YAML frontmatter and message body from markdown.
 
     Returns (frontmatter_dict, message_body).
-
-    Supports multi-line dictionary items in lists by preserving indentation.
     """
     if not content.startswith('---'):
         return {}, content
@@ -99,9 +142,14 @@ def extract_frontmatter(content: str) -> tuple[Dict[str, Any], str]:
     if len(parts) < 3:
         return {}, content
 
-    frontmatter_text = parts[1]
-    message = parts[2].strip()
+    return parse_frontmatter(parts[1]), parts[2].strip()
+
+
+def parse_frontmatter(frontmatter_text: str) -> Dict[str, Any]:
+    """Parse the YAML between two --- markers into a dict.
 
+    Supports multi-line dictionary items in lists by preserving indentation.
+    """
     # Simple YAML parser that handles indented list items
     frontmatter = {}
     lines = frontmatter_text.split('\n')
@@ -192,38 +240,99 @@ def extract_frontmatter(content: str) -> tuple[Dict[str, Any], str]:
             current_list.append(current_dict)
         frontmatter[current_key] = current_list
 
-    return frontmatter, message
+    return frontmatter
+
+
+# Separates frontmatter blocks from messages in bundle files
+_BUNDLE_SEPARATOR = re.compile(r'^---[ \t]*$', re.MULTILINE)
 
 
-def load_rules(event: Optional[str] = None) -> List[Rule]:
-    """Load all hookify rules from .claude directory.
+def split_bundle(content: str) -> tuple[List[tuple[Dict[str, Any], str]], bool]:
+    """Split a bundle file into (frontmatter_dict, message_body) per rule.
+
+    Text before the first --- is a description and is ignored.
+
+    Returns:
+        (sections, complete): complete is False if the last frontmatter
+        block has no closing ---.
+    """
+    parts = _BUNDLE_SEPARATOR.split(content)
+    sections = [(parse_frontmatter(parts[i]), parts[i + 1].strip())
+                for i in range(1, len(parts) - 1, 2)]
+    return sections, len(parts) % 2 == 1
+
+
+def load_rules(event: Optional[str] = None, tool_name: Optional[str] = None) -> List[Rule]:
+    """Load all hookify rules from every rule source.
+
+    Parsed rules are cached on disk (see ruleset_cache), so when no rule
+    file changed this costs a stat per file instead of a full parse.
 
     Args:
         event: Optional event filter ("bash", "file", "stop", etc.)
+        tool_name: Optional tool filter; drops rules whose tool_matcher
+            can never match this tool
 
     Returns:
         List of enabled Rule objects matching the event.
     """
-    rules = []
-
-    # Find all hookify.*.local.md files
-    pattern = os.path.join('.claude', 'hookify.*.local.md')
-    files = glob.glob(pattern)
+    # Find rule and bundle files in every source, lowest precedence first
+    files = rule_files()
 
-    for file_path in files:
+    cache = None
+    fingerprint = None
+    try:
+        from hookify.core import ruleset_cache
+        if cache_enabled():
+            fingerprint = rule_fingerprint(files)
+            if fingerprint is not None:
+                cache = ruleset_cache
+                cached = cache.load_cached(fingerprint, event, tool_name)
+                if cached is None:
+                    cached = cache.load_shared(files, fingerprint, event, tool_name)
+                if cached is not None:
+                    return cached
+    except (IOError, OSError) as e:
+        print(f"Warning: Hookify rule cache unavailable: {e}", file=sys.stderr)
+        cache = None
+
+    rules = parse_rule_files(files)
+
+    if cache:
         try:
-            rule = load_rule_file(file_path)
-            if not rule:
-                continue
+            cache.store(files, fingerprint, rules)
+        except (IOError, OSError) as e:
+            print(f"Warning: Failed to write hookify rule cache: {e}", file=sys.stderr)
+        # The ruleset changed: point out problems once, not on every event
+        from hookify.core.lint import lint_rules
+        for finding in lint_rules(rules, check_patterns=False):
+            if finding.severity != 'info':
+                print(f"Warning: Hookify rule '{finding.rule}' {finding.message}", file=sys.stderr)
+        # and forget the match counts of conditions that are gone
+        from hookify.core.ordering import ConditionStats
+        stats = ConditionStats.for_project()
+        if stats.prune(rules):
+            stats.save(force=True)
+
+    return RuleIndex(rules).lookup(event, tool_name)
+
+
+def parse_rule_files(files: List[str]) -> List[Rule]:
+    """Parse rule and bundle files into a ruleset, bypassing the cache.
 
-            # Filter by event if specified
-            if event:
-                if rule.event != 'all' and rule.event != event:
-                    continue
+    Args:
+        files: Rule file paths, lowest precedence first; a rule in a
+            later directory overrides a same-named one in an earlier one
 
-            # Only include enabled rules
-            if rule.enabled:
-                rules.append(rule)
+    Returns:
+        Enabled Rule objects in load order, for every event.
+    """
+    loaded = []
+    for file_path in files:
+        try:
+            file_rules = load_bundle_file(file_path) if is_bundle(file_path) else [load_rule_file(file_path)]
+            source = os.path.dirname(file_path)
+            loaded.extend((source, rule) for rule in file_rules if rule)
 
         except (IOError, OSError, PermissionError) as e:
             # File I/O errors - log and continue
@@ -238,7 +347,71 @@ def load_rules(event: Optional[str] = None) -> List[Rule]:
             print(f"Warning: Unexpected error loading {file_path} ({type(e).__name__}): {e}", file=sys.stderr)
             continue
 
-    return rules
+    # Only include enabled rules, once overrides are applied
+    return [rule for rule in resolve_overrides(loaded) if rule.enabled]
+
+
+def resolve_overrides(loaded: List[tuple[str, Rule]]) -> List[Rule]:
+    """Apply source precedence to rules loaded from several sources.
+
+    A rule replaces every same-named rule from a different, earlier
+    source and takes the position of the first of them. Same-named rules
+    within one source all stay, as do rules without a name.
+
+    Args:
+        loaded: (source_dir, rule) pairs, lowest precedence first
+
+    Returns:
+        Rules in load order, including disabled ones.
+    """
+    rules: List[Optional[Rule]] = []
+    named: Dict[str, tuple[str, List[int]]] = {}
+    for source, rule in loaded:
+        previous = named.get(rule.name)
+        if rule.name == 'unnamed' or previous is None:
+            named.setdefault(rule.name, (source, []))[1].append(len(rules))
+            rules.append(rule)
+        elif previous[0] == source:
+            previous[1].append(len(rules))
+            rules.append(rule)
+        else:
+            first, *rest = previous[1]
+            rules[first] = rule
+            for position in rest:
+                rules[position] = None
+            named[rule.name] = (source, [first])
+    return [rule for rule in rules if rule is not None]
+
+
+def _check_patterns(rule: Rule, label: str) -> Optional[Rule]:
+    """Reject invalid patterns, and rewrite or reject ones that can backtrack catastrophically.
+
+    A condition with an invalid pattern never matches, so neither does
+    its rule: disabling it here reports the error once, at load, rather
+    than on every evaluation.
+
+    Returns:
+        The rule, or None if it must be disabled.
+    """
+    for condition in rule.conditions:
+        if condition.operator != 'regex_match':
+            continue
+        try:
+            re.compile(condition.pattern, re.IGNORECASE)
+        except re.error as e:
+            print(f"Error: Rule '{rule.name}' in {label} disabled: "
+                  f"invalid pattern '{condition.pattern}': {e}", file=sys.stderr)
+            return None
+        safe_pattern, problem = check_pattern(condition.pattern)
+        if problem:
+            print(f"Error: Rule '{rule.name}' in {label} disabled: "
+                  f"pattern '{condition.pattern}' {problem}", file=sys.stderr)
+            return None
+        if safe_pattern != condition.pattern:
+            print(f"Warning: Rule '{rule.name}' in {label}: pattern '{condition.pattern}' "
+                  f"rewritten to '{safe_pattern}' to avoid catastrophic backtracking", file=sys.stderr)
+            condition.pattern = safe_pattern
+    return rule
 
 
 def load_rule_file(file_path: str) -> Optional[Rule]:
@@ -257,8 +430,7 @@ def load_rule_file(file_path: str) -> Optional[Rule]:
             print(f"Warning: {file_path} missing YAML frontmatter (must start with ---)", file=sys.stderr)
             return None
 
-        rule = Rule.from_dict(frontmatter, message)
-        return rule
+        return _check_patterns(Rule.from_dict(frontmatter, message), file_path)
 
     except (IOError, OSError, PermissionError) as e:
         print(f"Error: Cannot read {file_path}: {e}", file=sys.stderr)
@@ -274,6 +446,47 @@ def load_rule_file(file_path: str) -> Optional[Rule]:
         return None
 
 
+def load_bundle_file(file_path: str) -> List[Rule]:
+    """Load every rule in a bundle file.
+
+    A malformed rule is skipped with an error; the rest of the bundle
+    still loads.
+
+    Returns:
+        List of Rule objects (empty if the file can't be read).
+    """
+    try:
+        with open(file_path, 'r') as f:
+            content = f.read()
+    except (IOError, OSError, PermissionError) as e:
+        print(f"Error: Cannot read {file_path}: {e}", file=sys.stderr)
+        return []
+    except UnicodeDecodeError as e:
+        print(f"Error: Invalid encoding in {file_path}: {e}", file=sys.stderr)
+        return []
+
+    sections, complete = split_bundle(content)
+    if not complete:
+        print(f"Warning: {file_path} ends with an unclosed frontmatter block; it was ignored", file=sys.stderr)
+    if not sections:
+        print(f"Warning: {file_path} contains no rules (each must start with ---)", file=sys.stderr)
+
+    rules = []
+    for number, (frontmatter, message) in enumerate(sections, 1):
+        label = f'{file_path} (rule {number})'
+        try:
+            if not frontmatter:
+                print(f"Warning: {label} has empty frontmatter", file=sys.stderr)
+                continue
+            rule = _check_patterns(Rule.from_dict(frontmatter, message), label)
+        except (ValueError, KeyError, AttributeError, TypeError) as e:
+            print(f"Error: Malformed rule {label}: {e}", file=sys.stderr)
+            continue
+        if rule:
+            rules.append(rule)
+    return rules
+
+
 # For testing
 if __name__ == '__main__':
     import sys
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""Persistent rule evaluation daemon for hookify plugin.
+
+Every hook event used to start a fresh interpreter that re-imported the
+engine and re-parsed every rule file. The daemon is a long-lived process,
+one per project directory, that listens on a Unix socket and keeps parsed
+rules and compiled regexes in memory. Rules are reloaded only when the
+rule files change. A few worker processes forked from it serve
+requests concurrently, so one slow evaluation doesn't stall other hooks.
+The engine reads its settings (HOOKIFY_* variables, the config and cache
+dirs) from the environment once, so each distinct set of those values
+gets its own daemon and socket.
+
+The hook scripts use request() as a thin client. When the daemon is not
+reachable they evaluate in-process as before and call spawn() so the next
+event can use it.
+
+Set HOOKIFY_DAEMON=0 to disable the daemon entirely.
+
+Sockets live in a directory that must belong to the current user and be
+mode 0700; otherwise another local user could have created it, or could
+plant a socket in it, and read payloads or forge decisions. The daemon
+refuses to start in such a directory and clients don't connect to one,
+so hooks evaluate in-process.
+
+The client side runs in every hook process before anything else is
+known, so it forwards the raw payload without parsing it and uses the
+_socket extension directly: the socket module imports enum, selectors
+and more, which costs more than the round trip to the daemon.
+"""
+
+import os
+import stat
+import sys
+import _socket
+
+from hookify.utils.cache_files import project_key, short_hash
+
+# Seconds a client waits for the daemon before falling back to in-process.
+# Well under the 10s hook timeout so the fallback still has time to run.
+CLIENT_TIMEOUT = 3.0
+
+# Worker processes serving requests concurrently, so one slow evaluation
+# doesn't hold up the hooks that arrive while it runs
+WORKERS = 4
+
+# Connections that may wait for a free worker, about one evaluation's wait
+# each. Once it is full, connect() fails at once and the client evaluates
+# in-process instead of waiting out CLIENT_TIMEOUT.
+BACKLOG = WORKERS
+
+# Seconds without requests before the daemon exits.
+IDLE_TIMEOUT = 30 * 60
+
+# Environment variables besides HOOKIFY_* that change how rules are
+# loaded or evaluated
+SETTINGS_ENV = ('CLAUDE_PROJECT_DIR', 'CLAUDE_CONFIG_DIR', 'XDG_CACHE_HOME', 'HOME')
+
+# Hook event name -> rule event for events that don't depend on the tool
+HOOK_EVENTS = {
+    'Stop': 'stop',
+    'UserPromptSubmit': 'prompt',
+}
+
+
+def daemon_enabled() -> bool:
+    """Check whether the daemon may be used on this platform and environment."""
+    return hasattr(_socket, 'AF_UNIX') and os.environ.get('HOOKIFY_DAEMON', '1') != '0'
+
+
+def runtime_dir() -> str:
+    """Get the per-user directory holding daemon sockets and lock files."""
+    base = os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR') or '/tmp'
+    return os.path.join(base, f'hookify-{os.getuid()}')
+
+
+def private_dir(path: str) -> bool:
+    """Check that path is a real directory, owned by us and closed to others."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid()
+            and stat.S_IMODE(st.st_mode) == 0o700)
+
+
+def settings_key(environ=None) -> str:
+    """Get a key for the environment settings a daemon evaluates with.
+
+    Args:
+        environ: Environment to read (defaults to os.environ)
+    """
+    environ = os.environ if environ is None else environ
+    settings = sorted(f'{name}={value}' for name, value in environ.items()
+                      if (name.startswith('HOOKIFY_') and name != 'HOOKIFY_DAEMON') or name in SETTINGS_ENV)
+    return short_hash('\0'.join(settings))[:8]
+
+
+def socket_path(project_dir: str, environ=None) -> str:
+    """Get the socket path for the daemon serving project_dir.
+
+    Socket names are hashed so long project paths stay under the
+    AF_UNIX path length limit. They include settings_key(environ), so a
+    hook only reaches a daemon started with the same settings.
+    """
+    return os.path.join(runtime_dir(), f'{project_key(project_dir)}-{settings_key(environ)}.sock')
+
+
+def rule_event_for(hook_event: str, tool_name: str) -> str:
+    """Map a hook event and tool name to the rule event used for filtering.
+
+    Args:
+        hook_event: Hook event name ("PreToolUse", "Stop", etc.)
+        tool_name: Tool being used (empty for non-tool events)
+
+    Returns:
+        Rule event ("bash", "file", "stop", "prompt") or None for other tools
+    """
+    if hook_event in HOOK_EVENTS:
+        return HOOK_EVENTS[hook_event]
+    if tool_name == 'Bash':
+        return 'bash'
+    if tool_name in ['Edit', 'Write', 'MultiEdit']:
+        return 'file'
+    return None
+
+
+def request(hook_event: str, payload: bytes, project_dir: str = None) -> str:
+    """Send a hook payload to the daemon and return its JSON reply.
+
+    Args:
+        hook_event: Hook event name the payload belongs to
+        payload: Raw hook input as read from stdin
+        project_dir: Project directory (defaults to the current directory)
+
+    Returns:
+        Reply JSON string, or None if the daemon is unreachable or failed
+    """
+    if not daemon_enabled():
+        return None
+
+    if not private_dir(runtime_dir()):
+        return None
+
+    path = socket_path(project_dir or os.getcwd())
+    try:
+        sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    except OSError:
+        return None
+    try:
+        sock.settimeout(CLIENT_TIMEOUT)
+        sock.connect(path)
+        sock.sendall(hook_event.encode('utf-8') + b'\n' + payload)
+        sock.shutdown(_socket.SHUT_WR)
+
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    except OSError:
+        # Includes timeouts
+        return None
+    finally:
+        sock.close()
+
+    reply = b''.join(chunks).decode('utf-8', errors='replace').strip()
+    return reply or None
+
+
+def spawn(project_dir: str = None) -> None:
+    """Start a detached daemon for project_dir in the background.
+
+    Safe to call when a daemon is already running or starting: the new
+    process exits as soon as it fails to take the daemon lock.
+    """
+    if not daemon_enabled():
+        return
+
+    import subprocess
+
+    project_dir = project_dir or os.getcwd()
+    plugins_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [plugins_dir, env.get('PYTHONPATH')]))
+
+    try:
+        subprocess.Popen(
+            [sys.executable, '-m', 'hookify.core.daemon', project_dir],
+            cwd=project_dir,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as e:
+        print(f"Warning: Failed to start hookify daemon: {e}", file=sys.stderr)
+
+
+class RuleServer:
+    """Holds parsed rules in memory and evaluates hook payloads."""
+
+    def __init__(self):
+        """Initialize rule server."""
+        import threading
+        from hookify.core.rule_engine import RuleEngine
+
+        self.engine = RuleEngine()
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._index = None
+
+    def _current_fingerprint(self) -> tuple:
+        """Stat every rule file so edits, additions and removals are noticed."""
+        from hookify.core.fastpath import rule_files, rule_fingerprint
+
+        return rule_fingerprint(rule_files())
+
+    def rules_for(self, event: str, tool_name: str) -> list:
+        """Get enabled rules for event and tool, reloading if rule files changed."""
+        from hookify.core.config_loader import load_rules
+        from hookify.core.rule_index import RuleIndex
+
+        fingerprint = self._current_fingerprint()
+        with self._lock:
+            if self._index is None or fingerprint != self._fingerprint:
+                self._fingerprint = fingerprint
+                self._index = RuleIndex(load_rules())
+                # Don't write back counts the loader dropped for removed conditions
+                self.engine.stats.prune(self._index.rules)
+            index = self._index
+        return index.lookup(event, tool_name)
+
+    def handle(self, hook_event: str, input_data: dict) -> dict:
+        """Evaluate a hook payload exactly like the in-process hook scripts."""
+        tool_name = input_data.get('tool_name', '')
+        event = rule_event_for(hook_event, tool_name)
+        rules = self.rules_for(event, tool_name)
+        return self.engine.evaluate_rules(rules, input_data)
+
+
+# Package directories hook processes import from
+PACKAGE_DIRS = ('core', 'matchers', 'utils')
+
+
+def _precompile() -> None:
+    """Compile the package into the pycache prefix, if bytecode goes to one.
+
+    dispatch sets a prefix under the hookify cache dir when the plugin
+    dir isn't writable. Without a prefix nothing is written into the
+    plugin tree, and nothing at all when writing bytecode is off.
+    """
+    import compileall
+
+    if sys.dont_write_bytecode or not sys.pycache_prefix:
+        return
+    plugin_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        for name in PACKAGE_DIRS:
+            compileall.compile_dir(os.path.join(plugin_root, name), quiet=2)
+    except Exception:
+        pass  # A missing .pyc only costs startup time
+
+
+def serve(project_dir: str) -> None:
+    """Run the daemon for project_dir until it has been idle for IDLE_TIMEOUT."""
+    import fcntl
+    import json
+    import signal
+    import socketserver
+
+    os.chdir(project_dir)
+    run_dir = runtime_dir()
+    os.makedirs(run_dir, mode=0o700, exist_ok=True)
+    if not private_dir(run_dir):
+        print(f"Warning: Not starting hookify daemon: {run_dir} must be a directory "
+              f"owned by you with mode 0700", file=sys.stderr)
+        return
+    path = socket_path(project_dir)
+
+    # Only one daemon per project and settings: hold an exclusive lock for our lifetime
+    lock_file = open(path + '.lock', 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return
+
+    # Any socket left behind belongs to a daemon that no longer holds the lock
+    if os.path.exists(path):
+        os.unlink(path)
+
+    # In a read-only install hooks cache bytecode under a pycache prefix;
+    # fill it once here so no hook pays for compiling a module first
+    _precompile()
+
+    # Load the rules before forking so every worker starts with them
+    rule_server = RuleServer()
+    rule_server.rules_for(None, None)
+
+    class Handler(socketserver.StreamRequestHandler):
+        # Don't let a stalled client hold up the requests queued behind it
+        timeout = CLIENT_TIMEOUT
+
+        def handle(self):
+            hook_event = self.rfile.readline().decode('utf-8').strip()
+            try:
+                input_data = json.loads(self.rfile.read() or b'{}')
+                result = rule_server.handle(hook_event, input_data)
+            except Exception as e:
+                result = {"systemMessage": f"Hookify error: {str(e)}"}
+            self.wfile.write(json.dumps(result).encode('utf-8'))
+
+    # Each worker process accepts and handles requests in its main thread,
+    # where the regex time budget (see regex_safety.deadline) can interrupt
+    # a search. The listening socket's file descriptor is non-blocking so a
+    # worker that loses the race for a connection goes back to waiting
+    # instead of blocking in accept() past its idle timeout. (Setting it
+    # through the socket object would make handle_request() poll with a
+    # zero timeout.)
+    class Server(socketserver.UnixStreamServer):
+        request_queue_size = BACKLOG
+        timeout = IDLE_TIMEOUT
+        idle = False
+
+        def server_activate(self):
+            super().server_activate()
+            os.set_blocking(self.socket.fileno(), False)
+
+        def handle_timeout(self):
+            self.idle = True
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    workers = []
+    with Server(path, Handler) as server:
+        os.chmod(path, 0o600)
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            for _ in range(WORKERS):
+                pid = os.fork()
+                if pid == 0:
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    status = 0
+                    try:
+                        while not server.idle:
+                            server.handle_request()
+                        # Keep the match counts not saved yet (see ConditionStats.save)
+                        rule_server.engine.stats.save(force=True)
+                    except BaseException:
+                        status = 1
+                    finally:
+                        os._exit(status)
+                workers.append(pid)
+            # Workers exit once idle; the daemon is done when all of them are
+            while workers:
+                pid, _ = os.wait()
+                if pid in workers:
+                    workers.remove(pid)
+        finally:
+            for pid in workers:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            if os.path.exists(path):
+                os.unlink(path)
+            lock_file.close()
+
+
+if __name__ == '__main__':
+    serve(sys.argv[1] if len(sys.argv) > 1 else os.getcwd())
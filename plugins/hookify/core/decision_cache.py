@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Content-addressed cache of hook decisions for hookify plugin.
+
+Agents repeat the same tool calls constantly: `npm test`, `git status`,
+rewriting the same file. A decision depends only on the rules being
+evaluated, the hook event, the tool and the values of the fields those
+rules read, so it is stored under a hash of exactly those:
+
+- the ruleset signature, a hash of every rule's definition, so editing
+  any rule changes it;
+- the hook event name and tool name;
+- each field some condition reads, as the engine extracts it. Other
+  input (session, cwd, tool_input keys no rule reads) is not part of the
+  key, so the same command in another session is still a hit.
+
+Some evaluations are never cached:
+
+- rulesets reading the transcript, which grows between events (matching
+  it is already incremental, see matchers.transcript);
+- evaluations where a regex ran over its time budget, whose outcome
+  depends on machine load.
+
+Entries are small JSON files under decisions/<project key>/ in the user
+cache dir, written atomically, so concurrent hook processes and the
+daemon share them. A hit touches its entry; when a project has more
+than about MAX_ENTRIES entries the least recently used are removed.
+
+Set HOOKIFY_DECISION_CACHE=0 to disable just this cache, or
+HOOKIFY_CACHE=0 to disable it along with the other caches.
+"""
+
+import os
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from hookify.core.config_loader import Rule
+from hookify.matchers.payload import FieldView
+from hookify.utils.cache_files import cache_enabled, cache_dir, project_key, read_json, write_json_atomic
+
+# Bump when the entry format or matching semantics change
+DECISION_VERSION = 3
+
+# Entries kept per project before the least recently used are evicted
+MAX_ENTRIES = 1024
+
+
+def ruleset_signature(rules: List[Rule]) -> str:
+    """Hash the full definition of every rule, in order."""
+    digest = hashlib.blake2b(digest_size=20)
+    for rule in rules:
+        digest.update(repr(rule).encode('utf-8', 'surrogatepass'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def fields_read(rules: List[Rule]) -> Optional[List[str]]:
+    """List the fields the conditions of rules read.
+
+    Returns:
+        Sorted field names, or None if a rule reads the transcript and
+        decisions for these rules must not be cached.
+    """
+    fields = {condition.field for rule in rules for condition in rule.conditions}
+    if 'transcript' in fields:
+        return None
+    return sorted(fields)
+
+
+def decision_key(signature: str, hook_event: str, tool_name: str,
+                 values: List[Tuple[str, Optional[FieldView]]]) -> str:
+    """Hash everything a decision depends on into a cache key.
+
+    Args:
+        signature: ruleset_signature of the evaluated rules
+        hook_event: Hook event name
+        tool_name: Tool being used (empty for non-tool events)
+        values: (field, view) pairs for every field read, None if absent
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f'{DECISION_VERSION}\0{signature}\0{hook_event}\0{tool_name}\0'.encode('utf-8', 'surrogatepass'))
+    for field, view in values:
+        if view is None:
+            digest.update(f'{field}\1'.encode('utf-8', 'surrogatepass'))
+            continue
+        # The length keeps one field's value from running into the next field
+        digest.update(f'{field}\0{len(view)}\0'.encode('utf-8', 'surrogatepass'))
+        # Hashed once per view, however many keys include it
+        digest.update(view.digest())
+    return digest.hexdigest()
+
+
+class DecisionCache:
+    """Bounded on-disk store of hook responses, shared by all hook processes of a project."""
+
+    def __init__(self, directory: str, max_entries: int = MAX_ENTRIES):
+        """Initialize decision cache.
+
+        Args:
+            directory: Directory holding one file per entry
+            max_entries: Entries kept before the least recently used are evicted
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+
+    @classmethod
+    def for_project(cls) -> Optional['DecisionCache']:
+        """Get the cache for the current project, or None if caching is off."""
+        if not cache_enabled() or os.environ.get('HOOKIFY_DECISION_CACHE', '1') == '0':
+            return None
+        return cls(os.path.join(cache_dir(), 'decisions', project_key()))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the cached response for key, marking it recently used."""
+        path = self._path(key)
+        data = read_json(path, DECISION_VERSION)
+        if data is None or not isinstance(data.get('response'), dict):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # Evicted meanwhile; the response is still right
+        return data['response']
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """Store a response, evicting old entries now and then."""
+        try:
+            write_json_atomic(self._path(key), {'version': DECISION_VERSION, 'response': response})
+            # Keys are uniformly distributed: check the size on 1 in 16 writes
+            if key[0] == '0':
+                self._evict()
+        except (IOError, OSError):
+            pass  # A lost entry only costs a re-evaluation
+
+    def _evict(self) -> None:
+        """Remove least recently used entries once there are too many."""
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith('.json') and not entry.name.startswith('.'):
+                    try:
+                        entries.append((entry.stat().st_mtime_ns, entry.path))
+                    except OSError:
+                        continue
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        # Trim well below the limit so eviction doesn't run on every check
+        for _, path in entries[:len(entries) - self.max_entries * 3 // 4]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+# For testing
+if __name__ == '__main__':
+    from hookify.core.config_loader import Condition
+
+    rules = [Rule(name='rm', enabled=True, event='bash',
+                  conditions=[Condition('command', 'regex_match', r'rm\s+-rf')])]
+    signature = ruleset_signature(rules)
+    key = decision_key(signature, 'PreToolUse', 'Bash', [('command', FieldView.of('rm -rf /tmp/x'))])
+    print("Fields read:", fields_read(rules))
+    print("Key:", key)
+    print("Same input, same key:",
+          key == decision_key(signature, 'PreToolUse', 'Bash', [('command', FieldView.of('rm -rf /tmp/x'))]))
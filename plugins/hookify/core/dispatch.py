@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Shared entry point for the hookify hook scripts.
+
+Each hook event starts a new interpreter, so the order of work is
+chosen to import as little as possible before it is known that a rule
+applies:
+
+1. fastpath.may_have_rules answers from stat calls and a plain-text
+   summary whether any rule can apply to the event. Most events end
+   here, having imported only os.
+2. The daemon, if running, gets the raw payload and returns the reply;
+   neither json nor the engine is imported in this process.
+3. Otherwise the payload is parsed, rules are loaded and evaluated
+   in-process, and the daemon is started for the next event.
+
+Only this module's main() runs in hook processes; the scripts in hooks/
+just call it with their event name.
+"""
+
+import os
+import sys
+
+from hookify.core import daemon, fastpath
+from hookify.utils.cache_files import cache_dir
+
+# Read-only installs can't cache bytecode next to the sources; keep it
+# under the user cache dir so later imports don't recompile every time
+if getattr(sys, 'pycache_prefix', '') is None and not os.access(os.path.dirname(os.path.abspath(__file__)), os.W_OK):
+    sys.pycache_prefix = os.path.join(cache_dir(), 'pycache')
+    os.environ['PYTHONPYCACHEPREFIX'] = sys.pycache_prefix
+
+# Hook events whose rules depend on the tool being used
+TOOL_EVENTS = ('PreToolUse', 'PostToolUse')
+
+
+def _print_json(data) -> None:
+    import json
+
+    print(json.dumps(data), file=sys.stdout)
+
+
+def main(hook_event: str) -> None:
+    """Evaluate rules for one hook event and print the JSON reply.
+
+    Args:
+        hook_event: Hook event name ("PreToolUse", "Stop", etc.)
+    """
+    try:
+        # Read input from stdin
+        raw_input = sys.stdin.buffer.read()
+
+        # No rule can apply: answer before parsing or importing anything.
+        # Tool events don't know their tool yet, so any rule counts here.
+        if hook_event in TOOL_EVENTS:
+            event, tool_name = None, None
+        else:
+            event, tool_name = daemon.rule_event_for(hook_event, ''), ''
+        if not fastpath.may_have_rules(event, tool_name):
+            print('{}', file=sys.stdout)
+            return
+
+        # Fast path: the persistent daemon already has the rules in memory
+        reply = daemon.request(hook_event, raw_input)
+        if reply is not None:
+            print(reply, file=sys.stdout)
+            return
+
+        import json
+
+        input_data = json.loads(raw_input)
+
+        # Determine event type for filtering: for tool events, "bash" vs "file"
+        tool_name = input_data.get('tool_name', '')
+        event = daemon.rule_event_for(hook_event, tool_name)
+        if hook_event in TOOL_EVENTS and not fastpath.may_have_rules(event, tool_name):
+            print('{}', file=sys.stdout)
+            return
+
+        from hookify.core.config_loader import load_rules
+        from hookify.core.rule_engine import RuleEngine
+
+        # Load rules
+        rules = load_rules(event=event, tool_name=tool_name if hook_event in TOOL_EVENTS else None)
+
+        # Evaluate rules
+        engine = RuleEngine()
+        result = engine.evaluate_rules(rules, input_data)
+
+        # Always output JSON (even if empty)
+        print(json.dumps(result), file=sys.stdout)
+
+        # Start the daemon so later events skip loading rules
+        daemon.spawn()
+
+    except Exception as e:
+        # On any error, allow the operation and log
+        _print_json({"systemMessage": f"Hookify error: {str(e)}"})
+
+    finally:
+        # ALWAYS exit 0 - never block operations due to hook errors
+        sys.exit(0)
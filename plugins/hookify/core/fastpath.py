@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Startup-critical rule checks for hookify plugin.
+
+Every hook event starts a fresh interpreter, and most events match no
+rule. This module answers "can any rule apply?" before anything heavy
+is imported: it lists rule files with os.scandir, stats them, and
+compares the result with a plain-text bucket summary that the ruleset
+cache writes next to its project index. No json, re, glob or hashlib is
+needed, so a hook with nothing to do costs little more than interpreter
+startup.
+
+Rule discovery lives here too (rule_dirs, rule_files), so the loader,
+the daemon and this check always agree on which files make a ruleset.
+
+Summary format (projects/<key>.buckets under the cache dir):
+
+    <SUMMARY_VERSION>
+    <non-empty bucket keys, tab separated>
+    <path>\t<mtime_ns>\t<size>\t<inode>      one line per rule file
+
+Imports only os and other import-free hookify modules.
+"""
+
+import os
+
+from hookify.core.rule_index import matching_keys
+from hookify.utils.cache_files import cache_enabled, cache_dir, project_key, write_atomic
+
+# Bump when the summary format changes
+SUMMARY_VERSION = '1'
+
+RULES_DIR = '.claude'
+RULE_PREFIX = 'hookify.'
+RULE_SUFFIX = '.local.md'
+BUNDLE_SUFFIX = '.bundle.md'
+
+
+def project_root() -> str:
+    """Get the project root: CLAUDE_PROJECT_DIR if set, else the current directory."""
+    return os.path.abspath(os.environ.get('CLAUDE_PROJECT_DIR') or os.curdir)
+
+
+def user_rules_dir() -> str:
+    """Get the user-global rules dir (CLAUDE_CONFIG_DIR, default ~/.claude)."""
+    return os.environ.get('CLAUDE_CONFIG_DIR') or os.path.join(os.path.expanduser('~'), RULES_DIR)
+
+
+def rule_dirs() -> list:
+    """List rule source directories, lowest precedence first.
+
+    1. User-global rules (~/.claude)
+    2. Project rules (<project root>/.claude)
+    3. Nested rules: .claude in each directory from the project root
+       down to the current directory, outermost first
+
+    Project rules stay relative to the current directory when it is
+    the project root, as they always have been.
+    """
+    root = project_root()
+    cwd = os.path.abspath(os.curdir)
+    dirs = [user_rules_dir(), RULES_DIR if root == cwd else os.path.join(root, RULES_DIR)]
+    if cwd.startswith(root.rstrip(os.sep) + os.sep):
+        parts = cwd[len(root):].strip(os.sep).split(os.sep)
+        for depth in range(1, len(parts)):
+            dirs.append(os.path.join(root, *parts[:depth], RULES_DIR))
+        dirs.append(RULES_DIR)
+
+    unique = []
+    seen = set()
+    for path in dirs:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def is_bundle(file_path: str) -> bool:
+    """Check whether a rule file is a bundle holding several rules."""
+    return file_path.endswith(BUNDLE_SUFFIX)
+
+
+def scan_rules_dir(rules_dir: str) -> list:
+    """List one directory's rule and bundle files with one scandir pass."""
+    min_length = len(RULE_PREFIX) + min(len(RULE_SUFFIX), len(BUNDLE_SUFFIX))
+    found = []
+    try:
+        with os.scandir(rules_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if (name.startswith(RULE_PREFIX) and len(name) >= min_length
+                        and (name.endswith(RULE_SUFFIX) or name.endswith(BUNDLE_SUFFIX))):
+                    found.append(os.path.join(rules_dir, name))
+    except OSError:
+        return []
+    return sorted(found)
+
+
+def rule_files() -> list:
+    """List rule files from every source, lowest precedence first.
+
+    Each source contributes its hookify.*.local.md rule files and
+    hookify.*.bundle.md bundles, sorted by name. See rule_dirs() for the
+    sources and config_loader.load_rules() for how they override.
+    """
+    files = []
+    for rules_dir in rule_dirs():
+        files.extend(scan_rules_dir(rules_dir))
+    return files
+
+
+def rule_fingerprint(files: list) -> tuple:
+    """Stat rule files into a fingerprint that changes when any file changes.
+
+    Args:
+        files: Rule file paths, in precedence order
+
+    Returns:
+        Tuple of (path, mtime_ns, size, inode) entries in the same order,
+        or None if a file vanished while being checked.
+    """
+    entries = []
+    for file_path in files:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        entries.append((file_path, st.st_mtime_ns, st.st_size, st.st_ino))
+    return tuple(entries)
+
+
+def _summary_path() -> str:
+    return os.path.join(cache_dir(), 'projects', f'{project_key()}.buckets')
+
+
+def _fingerprint_lines(fingerprint: tuple) -> list:
+    return ['\t'.join(str(part) for part in entry) for entry in fingerprint]
+
+
+def write_summary(fingerprint: tuple, buckets) -> None:
+    """Record the non-empty buckets of the ruleset built from fingerprint."""
+    lines = [SUMMARY_VERSION, '\t'.join(sorted(buckets))] + _fingerprint_lines(fingerprint)
+    write_atomic(_summary_path(), '\n'.join(lines) + '\n')
+
+
+def may_have_rules(event: str, tool_name: str) -> bool:
+    """Check with stat calls only whether any rule can apply.
+
+    Args:
+        event: Rule event being evaluated, or None for every event
+        tool_name: Tool being used (empty for non-tool events), or None
+            to skip tool filtering
+
+    Returns:
+        False only when an up-to-date summary proves the bucket is empty;
+        True when rules may apply or the summary can't tell.
+    """
+    if not cache_enabled():
+        return True
+
+    fingerprint = rule_fingerprint(rule_files())
+    if fingerprint is None:
+        return True
+
+    try:
+        with open(_summary_path(), 'r') as f:
+            lines = f.read().split('\n')
+    except (IOError, OSError, UnicodeDecodeError):
+        return True
+
+    if len(lines) < 2 or lines[0] != SUMMARY_VERSION:
+        return True
+    if lines[2:-1] != _fingerprint_lines(fingerprint):
+        return True
+
+    buckets = lines[1].split('\t') if lines[1] else []
+    return bool(matching_keys(buckets, event, tool_name))
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""Static cost and safety analysis of hookify rules.
+
+lint_rules() looks at a ruleset without running it and reports:
+
+- rules that can never match: no conditions, an unknown event or
+  operator, a tool_matcher naming no tool of the rule's event, a field
+  the event never provides, or conditions that contradict each other;
+- rules with the same event, tools and conditions as an earlier rule;
+- rules that make frequent events expensive: transcript conditions on
+  tool events, and regexes that can't be prefiltered or that stack
+  unbounded wildcards over whole payloads.
+
+classify_rule() rates what evaluating a rule costs (low, medium, high)
+from the fields it reads, its regexes and its scan limits.
+
+lint_sources() parses rule files through config_loader and adds the
+problems the loader reports (invalid or catastrophic patterns, malformed
+frontmatter) once per file; that is what `hookify lint` prints. The
+loader runs lint_rules() itself whenever the ruleset changes.
+"""
+
+import io
+import os
+import re
+from contextlib import redirect_stderr
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from hookify.core.config_loader import Rule, load_bundle_file, load_rule_file, resolve_overrides
+from hookify.core.fastpath import is_bundle, rule_files, scan_rules_dir
+from hookify.core.plan import OPERATORS
+from hookify.matchers.regex_safety import find_catastrophic, wide_repeats
+from hookify.matchers.regex_set import required_literals
+
+SEVERITIES = ('error', 'warning', 'info')
+COSTS = ('low', 'medium', 'high')
+
+# Tools each rule event applies to (None: any)
+EVENT_TOOLS = {
+    'bash': {'Bash'},
+    'file': {'Edit', 'Write', 'MultiEdit'},
+    'stop': set(),
+    'prompt': set(),
+    'all': None,
+}
+
+# Events whose hooks run on every matching tool call, before and after it
+HOT_EVENTS = ('bash', 'file', 'all')
+
+# Fields only some events provide
+EVENT_FIELDS = {
+    'command': ('bash',),
+    'file_path': ('file',),
+    'content': ('file',),
+    'new_text': ('file',),
+    'new_string': ('file',),
+    'old_text': ('file',),
+    'old_string': ('file',),
+}
+
+# Fields that can be megabytes long
+PAYLOAD_FIELDS = ('content', 'new_text', 'new_string', 'old_text', 'old_string')
+
+# Limits at or below this many characters make a payload check cheap
+CHEAP_SCAN = 64 * 1024
+
+
+@dataclass
+class Finding:
+    """A problem found in a rule."""
+    severity: str  # "error", "warning" or "info"
+    rule: str  # Rule name, or '' for file-level problems
+    message: str
+    source: str = ''  # Rule file, if known
+
+
+@dataclass
+class RuleCost:
+    """Estimated evaluation cost of one rule."""
+    rule: str
+    event: str
+    cost: str  # "low", "medium" or "high"
+    reasons: List[str] = field(default_factory=list)
+    source: str = ''
+
+
+def _scan_limit(rule: Rule) -> Optional[int]:
+    """Get the most characters a search of one field by rule may read, or None if unlimited."""
+    limits = []
+    if rule.scan_first is not None or rule.scan_last is not None:
+        limits.append((rule.scan_first or 0) + (rule.scan_last or 0))
+    if rule.skip_larger_than is not None:
+        limits.append(rule.skip_larger_than)
+    return min(limits) if limits else None
+
+
+def classify_rule(rule: Rule, source: str = '') -> RuleCost:
+    """Estimate what evaluating a rule costs.
+
+    Cheap checks read short fields (command, file_path, the prompt) or
+    compare whole values. Searches of payload fields cost up to their
+    size, less when a regex has required literals to prefilter on, and
+    the transcript is read on every event the rule applies to.
+
+    Args:
+        rule: Rule to classify
+        source: Rule file, for the report
+
+    Returns:
+        Cost with one reason per condition above low cost.
+    """
+    cost = RuleCost(rule.name, rule.event, 'low', source=source)
+    limit = _scan_limit(rule)
+
+    def raise_to(level: str, reason: str):
+        cost.reasons.append(reason)
+        if COSTS.index(level) > COSTS.index(cost.cost):
+            cost.cost = level
+
+    for condition in rule.conditions:
+        label = f'{condition.field} {condition.operator}'
+        searches = condition.operator in ('regex_match', 'contains', 'not_contains')
+        wildcards = wide_repeats(condition.pattern) if condition.operator == 'regex_match' else 0
+        if condition.field == 'transcript':
+            if rule.event in HOT_EVENTS:
+                raise_to('high', f'{label}: reads the transcript on every tool call')
+            else:
+                raise_to('medium', f'{label}: reads new transcript lines on every {rule.event} event')
+        elif condition.field in PAYLOAD_FIELDS and searches:
+            if limit is not None and limit <= CHEAP_SCAN:
+                continue
+            scope = 'the whole payload' if limit is None else f'up to {limit} characters'
+            if condition.operator != 'regex_match':
+                raise_to('medium', f'{label}: substring search of {scope}')
+            elif wildcards > 1:
+                raise_to('high', f'{label}: {wildcards} unbounded wildcards over {scope}')
+            elif required_literals(condition.pattern) is None:
+                raise_to('high', f'{label}: regex with no required literal runs over {scope}')
+            else:
+                raise_to('medium', f'{label}: regex over {scope}, prefiltered by its literals')
+        elif wildcards > 1:
+            raise_to('medium', f'{label}: {wildcards} unbounded wildcards')
+    if rule.event == 'all' and cost.cost != 'low':
+        cost.reasons.append('event all: runs for every hook event')
+    return cost
+
+
+def _never_matches(rule: Rule) -> Optional[str]:
+    """Explain why rule can never match, or return None."""
+    if not rule.conditions:
+        return 'has no conditions, so it never matches'
+    if rule.event not in EVENT_TOOLS:
+        return f"has unknown event '{rule.event}' (use bash, file, stop, prompt or all), so it never loads"
+    tools = EVENT_TOOLS[rule.event]
+    if rule.tool_matcher and rule.tool_matcher != '*' and tools is not None:
+        named = set(rule.tool_matcher.split('|'))
+        if not tools & named:
+            event_tools = ', '.join(sorted(tools)) or 'no tools'
+            return (f"has tool_matcher '{rule.tool_matcher}' but {rule.event} events have "
+                    f"{event_tools}, so it never matches")
+    for condition in rule.conditions:
+        if condition.operator not in OPERATORS and condition.operator != 'regex_match':
+            return f"uses unknown operator '{condition.operator}', so it never matches"
+        events = EVENT_FIELDS.get(condition.field)
+        if events is not None and rule.event != 'all' and rule.event not in events:
+            return f"checks field '{condition.field}', which {rule.event} events don't have"
+    return _contradiction(rule)
+
+
+def _contradiction(rule: Rule) -> Optional[str]:
+    """Find two conditions on one field that can't both hold."""
+    by_field: Dict[str, Dict[str, List[str]]] = {}
+    for condition in rule.conditions:
+        by_field.setdefault(condition.field, {}).setdefault(condition.operator, []).append(condition.pattern)
+    for name, operators in by_field.items():
+        equals = set(operators.get('equals', []))
+        if len(equals) > 1:
+            return f"requires '{name}' to equal several different values"
+        value = next(iter(equals), None)
+        for pattern in operators.get('contains', []):
+            if pattern in operators.get('not_contains', []):
+                return f"requires '{name}' to both contain and not contain '{pattern}'"
+            if value is not None and pattern not in value:
+                return f"requires '{name}' to equal '{value}' and contain '{pattern}'"
+        if value is not None:
+            if any(not value.startswith(p) for p in operators.get('starts_with', [])):
+                return f"requires '{name}' to equal '{value}' and start with something else"
+            if any(not value.endswith(p) for p in operators.get('ends_with', [])):
+                return f"requires '{name}' to equal '{value}' and end with something else"
+    return None
+
+
+def _rule_signature(rule: Rule) -> tuple:
+    """Identify what a rule matches, independent of its name and message."""
+    tools = frozenset((rule.tool_matcher or '*').split('|'))
+    conditions = frozenset((c.field, c.operator, c.pattern) for c in rule.conditions)
+    return (rule.event, tools, conditions, rule.scan_first, rule.scan_last, rule.skip_larger_than)
+
+
+def lint_rules(rules: List[Rule], sources: Optional[Dict[int, str]] = None,
+               check_patterns: bool = True) -> List[Finding]:
+    """Analyze a ruleset for rules that never match, duplicates and costly patterns.
+
+    Args:
+        rules: Rules in load order
+        sources: id(rule) -> rule file, for the report
+        check_patterns: Also report invalid and catastrophic regexes;
+            the loader already disables rules with those
+
+    Returns:
+        Findings in rule order.
+    """
+    sources = sources or {}
+    findings = []
+    seen: Dict[tuple, Rule] = {}
+    for rule in rules:
+        source = sources.get(id(rule), '')
+
+        def report(severity: str, message: str):
+            findings.append(Finding(severity, rule.name, message, source))
+
+        for condition in rule.conditions if check_patterns else ():
+            if condition.operator != 'regex_match':
+                continue
+            try:
+                re.compile(condition.pattern, re.IGNORECASE)
+            except re.error as e:
+                report('error', f"pattern '{condition.pattern}' is invalid: {e}")
+                continue
+            problem = find_catastrophic(condition.pattern)
+            if problem:
+                report('error', f"pattern '{condition.pattern}' {problem}")
+
+        reason = _never_matches(rule)
+        if reason:
+            report('warning', reason)
+
+        signature = _rule_signature(rule)
+        earlier = seen.setdefault(signature, rule)
+        if earlier is not rule:
+            same_action = '' if earlier.action == rule.action else f' (but {earlier.action} vs {rule.action})'
+            report('warning', f"matches exactly what rule '{earlier.name}' matches{same_action}")
+
+        if rule.event in HOT_EVENTS:
+            for condition in rule.conditions:
+                if condition.field == 'transcript':
+                    report('warning', 'reads the transcript on every tool call; '
+                                      'use event: stop if it only matters at the end of a turn')
+                    break
+        if rule.event == 'all' and classify_rule(rule).cost == 'high':
+            report('warning', 'is expensive and runs for every hook event; give it a specific event')
+    return findings
+
+
+def _loader_findings(output: str, source: str) -> List[Finding]:
+    """Turn the loader's stderr messages for one file into findings."""
+    findings = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        severity, _, message = line.partition(': ')
+        severity = severity.lower()
+        if severity not in SEVERITIES:
+            severity, message = 'warning', line
+        findings.append(Finding(severity, '', message, source))
+    return findings
+
+
+def expand_paths(paths: List[str]) -> List[str]:
+    """Expand rule directories to the rule and bundle files in them."""
+    files = []
+    for path in paths:
+        files.extend(scan_rules_dir(path) if os.path.isdir(path) else [path])
+    return files
+
+
+def lint_sources(files: Optional[List[str]] = None) -> Tuple[List[Finding], List[RuleCost]]:
+    """Parse rule files through the loader and analyze the resulting ruleset.
+
+    Args:
+        files: Rule and bundle files, lowest precedence first (default:
+            every rule source, as hooks load them)
+
+    Returns:
+        (findings, costs): loader problems followed by lint_rules
+        findings, and the cost of each enabled rule.
+    """
+    if files is None:
+        files = rule_files()
+    findings = []
+    loaded = []
+    sources: Dict[int, str] = {}
+    for path in files:
+        # The loader reports problems on stderr; collect them per file
+        output = io.StringIO()
+        try:
+            with redirect_stderr(output):
+                file_rules = load_bundle_file(path) if is_bundle(path) else [load_rule_file(path)]
+        except (IOError, OSError) as e:
+            findings.append(Finding('error', '', f'Failed to read: {e}', path))
+            continue
+        except Exception as e:
+            findings.append(Finding('error', '', f'Failed to parse ({type(e).__name__}): {e}', path))
+            continue
+        finally:
+            findings.extend(_loader_findings(output.getvalue(), path))
+        for rule in file_rules:
+            if rule:
+                sources[id(rule)] = path
+                loaded.append((os.path.dirname(path), rule))
+
+    rules = [rule for rule in resolve_overrides(loaded) if rule.enabled]
+    findings.extend(lint_rules(rules, sources))
+    costs = [classify_rule(rule, sources.get(id(rule), '')) for rule in rules]
+    return findings, costs
+
+
+def format_report(findings: List[Finding], costs: List[RuleCost], show_cost: bool = False) -> str:
+    """Format lint results as markdown.
+
+    Args:
+        findings: Problems to list, most severe first
+        costs: Rule costs, listed most expensive first if show_cost
+        show_cost: Include the per-rule cost table
+    """
+    counts = {severity: sum(1 for f in findings if f.severity == severity) for severity in SEVERITIES}
+    lines = [f"## Hookify lint ({len(costs)} rules; errors: {counts['error']}, warnings: {counts['warning']})", '']
+    if findings:
+        for f in sorted(findings, key=lambda f: SEVERITIES.index(f.severity)):
+            where = f' ({f.source})' if f.source else ''
+            if f.rule:
+                subject = f"Rule '{f.rule}'{where} "
+            else:
+                # Loader messages usually name the file already
+                subject = f'{f.source}: ' if f.source and f.source not in f.message else ''
+            lines.append(f'- **{f.severity}** {subject}{f.message}')
+    else:
+        lines.append('No problems found.')
+
+    if show_cost:
+        lines += ['', '### Rule cost', '',
+                  '| Rule | Event | Cost | Why |', '|------|-------|------|-----|']
+        for c in sorted(costs, key=lambda c: COSTS.index(c.cost), reverse=True):
+            why = '; '.join(c.reasons) or 'short fields or whole-value comparisons only'
+            lines.append(f'| {c.rule} | {c.event} | {c.cost} | {why} |')
+    return '\n'.join(lines)
+
+
+# For testing
+if __name__ == '__main__':
+    from hookify.core.config_loader import Condition
+
+    rules = [
+        Rule(name='rm', enabled=True, event='bash',
+             conditions=[Condition('command', 'regex_match', r'rm\s+-rf')]),
+        Rule(name='rm-again', enabled=True, event='bash',
+             conditions=[Condition('command', 'regex_match', r'rm\s+-rf')]),
+        Rule(name='history', enabled=True, event='all',
+             conditions=[Condition('transcript', 'regex_match', r'.*secret.*=.*')]),
+        Rule(name='wrong-tool', enabled=True, event='bash', tool_matcher='Write',
+             conditions=[Condition('command', 'contains', 'x')]),
+        Rule(name='keys', enabled=True, event='file',
+             conditions=[Condition('content', 'regex_match', r'\w+_KEY\s*=')]),
+    ]
+    print(format_report(lint_rules(rules), [classify_rule(rule) for rule in rules], show_cost=True))
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Cost- and selectivity-driven evaluation order for hookify plugin.
+
+All conditions of a rule must match, so the cheapest condition that is
+most likely to fail should run first. Each condition gets a static cost
+estimate from its field, operator and pattern, and a failure probability
+from how often it matched before. Conditions are ordered by cost divided
+by failure probability, and rules by their expected cost.
+
+Match counts persist per project under the user cache dir, so the order
+improves over a session. The file is rewritten at most every
+SAVE_INTERVAL seconds or SAVE_EVERY evaluations, and counts for
+conditions no rule has any more are dropped when the ruleset changes.
+Ordering never changes results: conditions are pure and the engine
+reports matched rules in load order.
+"""
+
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from hookify.core.config_loader import Condition, Rule
+from hookify.utils.cache_files import (
+    cache_enabled, cache_dir, project_key, read_json, write_json_atomic
+)
+
+# Bump when the stats file format changes
+STATS_VERSION = 1
+
+# Counts are halved past this many evaluations so old behavior fades out
+MAX_EVALUATIONS = 1000
+
+# The stats file is rewritten once it is this many seconds old, or once
+# this many evaluations are unsaved. Counts recorded in between by a
+# short-lived hook process are dropped; they only tune ordering.
+SAVE_INTERVAL = 60
+SAVE_EVERY = 100
+
+# Relative cost of reading each field; unknown fields cost DEFAULT_FIELD_COST
+FIELD_COSTS = {
+    'file_path': 1,
+    'command': 2,
+    'reason': 2,
+    'user_prompt': 5,
+    'old_text': 20,
+    'old_string': 20,
+    'new_text': 20,
+    'new_string': 20,
+    'content': 20,
+    'transcript': 1000,
+}
+DEFAULT_FIELD_COST = 5
+
+# Relative cost of each operator on the same input
+OPERATOR_COSTS = {
+    'equals': 1,
+    'starts_with': 1,
+    'ends_with': 1,
+    'glob': 1,
+    'path_prefix': 1,
+    'contains': 2,
+    'not_contains': 2,
+    'regex_match': 4,
+}
+
+_QUANTIFIER = re.compile(r'[*+?]|\{\d+(,\d*)?\}')
+_NESTED_QUANTIFIER = re.compile(r'\([^()]*[*+][^()]*\)[*+{]')
+
+
+@lru_cache(maxsize=1024)
+def regex_complexity(pattern: str) -> float:
+    """Estimate how expensive a regex is relative to a plain substring scan."""
+    complexity = 1.0 + 0.25 * len(_QUANTIFIER.findall(pattern)) + 0.25 * pattern.count('|')
+    if _NESTED_QUANTIFIER.search(pattern):
+        complexity *= 4
+    return complexity
+
+
+@lru_cache(maxsize=1024)
+def _cost(field: str, operator: str, pattern: str) -> float:
+    cost = FIELD_COSTS.get(field, DEFAULT_FIELD_COST) * OPERATOR_COSTS.get(operator, 1)
+    if operator == 'regex_match':
+        cost *= regex_complexity(pattern)
+    return cost
+
+
+def estimate_cost(condition: Condition) -> float:
+    """Estimate the relative cost of checking condition.
+
+    Args:
+        condition: Condition to estimate
+
+    Returns:
+        Cost in arbitrary units (an equals on file_path is 1)
+    """
+    return _cost(condition.field, condition.operator, condition.pattern)
+
+
+def condition_key(condition: Condition) -> str:
+    """Get the key a condition's statistics are stored under."""
+    return f'{condition.field}|{condition.operator}|{condition.pattern}'
+
+
+class ConditionStats:
+    """Per-condition evaluation and match counts for one project."""
+
+    def __init__(self, path: str = None):
+        """Initialize stats, loading any saved counts from path.
+
+        Args:
+            path: Stats file, or None to keep counts in memory only
+        """
+        self.path = path
+        self.counts: Dict[str, List[int]] = {}
+        # Evaluations recorded since the last save, and when that was
+        self.pending = 0
+        self.saved_at = 0.0
+        if path:
+            data = read_json(path, STATS_VERSION)
+            if data and isinstance(data.get('conditions'), dict):
+                self.counts = data['conditions']
+                try:
+                    self.saved_at = os.path.getmtime(path)
+                except OSError:
+                    pass
+
+    @classmethod
+    def for_project(cls) -> 'ConditionStats':
+        """Get stats for the project in the current directory."""
+        if not cache_enabled():
+            return cls()
+        return cls(os.path.join(cache_dir(), 'stats', f'{project_key()}.json'))
+
+    def record(self, condition: Condition, matched: bool) -> None:
+        """Record one evaluation of condition."""
+        counts = self.counts.setdefault(condition_key(condition), [0, 0])
+        counts[0] += 1
+        if matched:
+            counts[1] += 1
+        if counts[0] > MAX_EVALUATIONS:
+            counts[0] //= 2
+            counts[1] //= 2
+        self.pending += 1
+
+    def match_probability(self, condition: Condition) -> float:
+        """Estimate how likely condition is to match (Laplace-smoothed)."""
+        evaluations, matches = self.counts.get(condition_key(condition), (0, 0))
+        return (matches + 1) / (evaluations + 2)
+
+    def prune(self, rules: List[Rule]) -> int:
+        """Drop counts for conditions none of rules has.
+
+        Args:
+            rules: The whole current ruleset, not one event's rules
+
+        Returns:
+            Number of conditions dropped
+        """
+        keep = {condition_key(condition) for rule in rules for condition in rule.conditions}
+        stale = [key for key in self.counts if key not in keep]
+        for key in stale:
+            del self.counts[key]
+        if stale:
+            self.pending += 1
+        return len(stale)
+
+    def save(self, force: bool = False) -> None:
+        """Persist counts if anything changed and a save is due.
+
+        Args:
+            force: Save now instead of waiting for SAVE_INTERVAL or SAVE_EVERY
+        """
+        if not self.path or not self.pending:
+            return
+        now = time.time()
+        if not force and self.pending < SAVE_EVERY and now - self.saved_at < SAVE_INTERVAL:
+            return
+        self.pending = 0
+        self.saved_at = now
+        try:
+            write_json_atomic(self.path, {'version': STATS_VERSION, 'conditions': self.counts})
+        except (IOError, OSError):
+            pass  # Stats only tune ordering; losing an update is harmless
+
+
+def order_conditions(conditions: List[Tuple[int, Condition]],
+                     stats: ConditionStats) -> List[Tuple[int, Condition]]:
+    """Order a rule's conditions so cheap, likely-to-fail checks run first.
+
+    Args:
+        conditions: (index, condition) pairs in file order
+        stats: Observed match counts
+
+    Returns:
+        The same pairs, ordered by cost / probability of failing.
+    """
+    def rank(item):
+        index, condition = item
+        fail = 1.0 - stats.match_probability(condition)
+        return (estimate_cost(condition) / fail, index)
+
+    return sorted(conditions, key=rank)
+
+
+def expected_rule_cost(rule: Rule, stats: ConditionStats) -> float:
+    """Estimate the cost of evaluating rule with its conditions in best order."""
+    cost = 0.0
+    reach = 1.0
+    for _, condition in order_conditions(list(enumerate(rule.conditions)), stats):
+        cost += reach * estimate_cost(condition)
+        reach *= stats.match_probability(condition)
+    return cost
+
+
+def order_rules(rules: List[Rule], stats: ConditionStats) -> List[int]:
+    """Get rule positions ordered by expected cost, cheapest first.
+
+    Ties keep load order, so the order is deterministic for given stats.
+    """
+    return sorted(range(len(rules)), key=lambda i: (expected_rule_cost(rules[i], stats), i))
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Compiled evaluation plans for hookify rulesets.
+
+Evaluating rules one at a time repeats work: a condition shared by many
+rules (say a file_path regex on \\.env$) is checked once per rule, and
+every check dispatches on the operator name. EvaluationPlan compiles a
+rule list once, and the engine reuses the plan for every event that list
+is evaluated against:
+
+- Each distinct (field, operator, pattern, scan limits) check becomes
+  one ConditionNode, evaluated at most once per event however many
+  rules use it.
+- Operators are bound to their pattern when the node is built, so
+  evaluating a node is one call with no lookup by operator name.
+- Rules become CompiledRule records: the node for each condition, the
+  tools the rule applies to and the fields it reads.
+- regex_match patterns that start with a letter and that fold_pattern
+  can rewrite are matched case-sensitively against the field lowercased
+  once per event, rather than with re.IGNORECASE, which turns off the
+  regex engine's fast scan for a leading letter. Other patterns, and
+  non-ASCII fields, still use re.IGNORECASE: lowercasing a large field
+  only pays off when the scan gets faster.
+- regex_match patterns get the literals one of which any match must
+  contain (see regex_set.required_literals). On a large ASCII field the
+  engine looks for them in the lowercased field first and runs the
+  regex only if one is there.
+- glob and path_prefix patterns of each field are indexed together in
+  a PathSet (see matchers.path_set), built the first time the field is
+  matched, so all of them are checked with one lookup per event.
+
+Field values are extracted once per event too: field_getter() maps a
+(tool, field) pair to the function that derives it from tool_input.
+"""
+
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.fastpath import project_root
+from hookify.matchers.path_set import PATH_OPERATORS, PathSet, path_matches
+from hookify.matchers.payload import FieldView
+from hookify.matchers.regex_set import fold_pattern, literal_start, required_literals
+
+# Operators that search the field, and so honor scan_first / scan_last
+SEARCH_OPERATORS = frozenset(('regex_match', 'contains', 'not_contains'))
+
+# Fields read from the hook input rather than tool_input; their values
+# differ between a tool call's PreToolUse and PostToolUse
+INPUT_FIELDS = frozenset(('reason', 'transcript', 'user_prompt'))
+
+
+def _contains(pattern: str, regions: List[FieldView]) -> bool:
+    return any(region.contains(pattern) for region in regions)
+
+
+def _not_contains(pattern: str, regions: List[FieldView]) -> bool:
+    return not any(region.contains(pattern) for region in regions)
+
+
+def _equals(pattern: str, view: FieldView) -> bool:
+    return view.equals(pattern)
+
+
+def _starts_with(pattern: str, view: FieldView) -> bool:
+    return view.startswith(pattern)
+
+
+def _ends_with(pattern: str, view: FieldView) -> bool:
+    return view.endswith(pattern)
+
+
+def _glob(pattern: str, view: FieldView) -> bool:
+    return path_matches('glob', pattern, view.text(), project_root())
+
+
+def _path_prefix(pattern: str, view: FieldView) -> bool:
+    return path_matches('path_prefix', pattern, view.text(), project_root())
+
+
+def _never(pattern: str, view: Any) -> bool:
+    # Unknown operator
+    return False
+
+
+# Operator -> test taking (pattern, value). Search operators get the list
+# of regions to search, the others the whole field view. regex_match is
+# matched by the engine, which owns the regex time budget.
+OPERATORS: Dict[str, Callable[[str, Any], bool]] = {
+    'contains': _contains,
+    'not_contains': _not_contains,
+    'equals': _equals,
+    'starts_with': _starts_with,
+    'ends_with': _ends_with,
+    'glob': _glob,
+    'path_prefix': _path_prefix,
+}
+
+
+def _edit_field(key: str, tool_input: Dict[str, Any]) -> str:
+    return tool_input.get(key, '')
+
+
+def _edit_content(tool_input: Dict[str, Any]) -> str:
+    # Write uses 'content', Edit has 'new_string'
+    return tool_input.get('content') or tool_input.get('new_string', '')
+
+
+def _multiedit_new_text(tool_input: Dict[str, Any]) -> str:
+    # Concatenate all edits
+    return ' '.join(e.get('new_string', '') for e in tool_input.get('edits', []))
+
+
+# (tool, field) -> getter for values derived from tool_input when the
+# field isn't a tool_input key itself
+_TOOL_FIELDS: Dict[Tuple[str, str], Callable[[Dict[str, Any]], str]] = {
+    ('Bash', 'command'): partial(_edit_field, 'command'),
+    ('MultiEdit', 'file_path'): partial(_edit_field, 'file_path'),
+    ('MultiEdit', 'new_text'): _multiedit_new_text,
+    ('MultiEdit', 'content'): _multiedit_new_text,
+}
+for _tool in ('Write', 'Edit'):
+    _TOOL_FIELDS.update({
+        (_tool, 'content'): _edit_content,
+        (_tool, 'new_text'): partial(_edit_field, 'new_string'),
+        (_tool, 'new_string'): partial(_edit_field, 'new_string'),
+        (_tool, 'old_text'): partial(_edit_field, 'old_string'),
+        (_tool, 'old_string'): partial(_edit_field, 'old_string'),
+        (_tool, 'file_path'): partial(_edit_field, 'file_path'),
+    })
+
+
+def field_getter(tool_name: str, field: str) -> Optional[Callable[[Dict[str, Any]], str]]:
+    """Get the function deriving field from a tool's input, if the tool has one."""
+    return _TOOL_FIELDS.get((tool_name, field))
+
+
+class ConditionNode:
+    """One distinct check, shared by every rule condition that performs it."""
+
+    __slots__ = ('id', 'condition', 'field', 'operator', 'pattern', 'scope', 'searches', 'test', 'folded',
+                 'literals')
+
+    def __init__(self, node_id: int, condition: Condition,
+                 scan_first: Optional[int] = None, scan_last: Optional[int] = None):
+        """Compile a condition.
+
+        Args:
+            node_id: Position of the node in its plan
+            condition: Condition to check
+            scan_first: Scan limits of the rule, for search operators
+            scan_last: See scan_first
+        """
+        self.id = node_id
+        self.condition = condition
+        self.field = condition.field
+        self.operator = condition.operator
+        self.pattern = condition.pattern
+        self.searches = condition.operator in SEARCH_OPERATORS
+        self.scope = (scan_first, scan_last) if self.searches else (None, None)
+        self.test = partial(OPERATORS.get(self.operator, _never), self.pattern)
+        folded = fold_pattern(self.pattern) if self.operator == 'regex_match' else None
+        # Folding only speeds up the scan for a leading letter
+        self.folded = folded if folded is not None and literal_start(folded).isalpha() else None
+        self.literals = required_literals(self.pattern) if self.operator == 'regex_match' else None
+
+    @staticmethod
+    def key(condition: Condition, rule: Rule) -> tuple:
+        """Identify the check a rule's condition performs."""
+        scope = (rule.scan_first, rule.scan_last) if condition.operator in SEARCH_OPERATORS else (None, None)
+        return (condition.field, condition.operator, condition.pattern) + scope
+
+
+class CompiledRule:
+    """A rule with its conditions resolved to shared nodes."""
+
+    __slots__ = ('rule', 'tools', 'nodes', 'fields')
+
+    def __init__(self, rule: Rule, nodes: Tuple[ConditionNode, ...]):
+        """Initialize compiled rule.
+
+        Args:
+            rule: Source rule
+            nodes: Node for each of rule.conditions, in the same order
+        """
+        self.rule = rule
+        matcher = rule.tool_matcher
+        # None means any tool
+        self.tools = None if not matcher or matcher == '*' else frozenset(matcher.split('|'))
+        self.nodes = nodes
+        self.fields = tuple(dict.fromkeys(node.field for node in nodes))
+
+
+class EvaluationPlan:
+    """A rule list compiled for repeated evaluation."""
+
+    __slots__ = ('rules', 'compiled', 'nodes', 'by_key', 'tool_fields', 'path_nodes', 'path_users',
+                 '_path_sets', 'signature', 'fields')
+
+    def __init__(self, rules: List[Rule]):
+        """Compile rules.
+
+        Args:
+            rules: Rules in load order; the plan keeps a reference
+        """
+        self.rules = list(rules)
+        self.nodes: List[ConditionNode] = []
+        by_key: Dict[tuple, ConditionNode] = {}
+        compiled = []
+        for rule in self.rules:
+            nodes = []
+            for condition in rule.conditions:
+                key = ConditionNode.key(condition, rule)
+                node = by_key.get(key)
+                if node is None:
+                    node = by_key[key] = ConditionNode(len(self.nodes), condition, *key[3:])
+                    self.nodes.append(node)
+                nodes.append(node)
+            compiled.append(CompiledRule(rule, tuple(nodes)))
+        self.compiled = tuple(compiled)
+        # ConditionNode.key -> node, to match up results computed elsewhere
+        self.by_key = by_key
+        # Fields whose checks give the same result in PreToolUse and PostToolUse
+        self.tool_fields = sorted({node.field for node in self.nodes} - INPUT_FIELDS)
+        # Field -> glob and path_prefix nodes on it, and node id -> (rule, condition) positions using it
+        self.path_nodes: Dict[str, List[ConditionNode]] = {}
+        self.path_users: Dict[int, List[Tuple[int, int]]] = {}
+        for i, rule in enumerate(compiled):
+            for j, node in enumerate(rule.nodes):
+                if node.operator in PATH_OPERATORS:
+                    if node.id not in self.path_users:
+                        self.path_nodes.setdefault(node.field, []).append(node)
+                    self.path_users.setdefault(node.id, []).append((i, j))
+        self._path_sets: Dict[str, PathSet] = {}
+        # Filled in by the engine when the decision cache needs them
+        self.signature: Optional[str] = None
+        self.fields: Optional[List[str]] = None
+
+    def path_set(self, field: str) -> PathSet:
+        """Get the index of a field's glob and path_prefix nodes, keyed by node id."""
+        path_set = self._path_sets.get(field)
+        if path_set is None:
+            path_set = self._path_sets[field] = PathSet(
+                (node.id, node.operator, node.pattern) for node in self.path_nodes[field])
+        return path_set
+
+
+# For testing
+if __name__ == '__main__':
+    rules = [
+        Rule(name=f'env-{i}', enabled=True, event='file',
+             conditions=[Condition('file_path', 'regex_match', r'\.env$'),
+                         Condition('new_text', 'contains', f'KEY_{i}')])
+        for i in range(3)
+    ]
+    plan = EvaluationPlan(rules)
+    print("Conditions:", sum(len(r.conditions) for r in rules), "Distinct checks:", len(plan.nodes))
+    print("Folded:", [node.folded for node in plan.nodes if node.operator == 'regex_match'])
+    print("Literals:", [node.literals for node in plan.nodes if node.operator == 'regex_match'])
+    print("Contains:", plan.nodes[1].test([FieldView.of('KEY_0=abc')]))
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Per-rule timing and match statistics for hookify plugin.
+
+When HOOKIFY_PROFILE=1 is set (in the shell, or in the "env" section of
+Claude Code settings), every rule evaluation appends one JSON line to a
+per-project log under the user cache dir. The line records which rules
+were evaluated and matched and, for every condition that ran, its wall
+time, how much text it scanned and whether the literal prefilter ruled
+it out without running its regex. Nothing is recorded, and the engine
+does no timing, when profiling is off.
+
+summarize() aggregates the log into per-rule and per-condition totals
+and format_report() ranks them, which is what `hookify stats` prints.
+"""
+
+import os
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from hookify.core.config_loader import Condition, Rule
+from hookify.utils.cache_files import cache_dir, project_key
+
+# Bump when the log line format changes
+PROFILE_VERSION = 1
+
+
+def profiling_enabled() -> bool:
+    """Check whether rule profiling is enabled."""
+    return os.environ.get('HOOKIFY_PROFILE', '0') not in ('', '0')
+
+
+def profile_path(project_dir: str = None) -> str:
+    """Get the profile log for a project (default: the current directory)."""
+    return os.path.join(cache_dir(), 'profiles', f'{project_key(project_dir)}.jsonl')
+
+
+class RuleProfiler:
+    """Collects timings for one evaluate_rules call and appends them to the log."""
+
+    def __init__(self, path: str):
+        """Initialize profiler.
+
+        Args:
+            path: Profile log file to append to
+        """
+        self.path = path
+        self.rules: Dict[int, List[Any]] = {}
+        self.conditions: List[List[Any]] = []
+        self.timeouts: List[List[str]] = []
+
+    @classmethod
+    def from_env(cls) -> Optional['RuleProfiler']:
+        """Get a profiler for the current project, or None if profiling is off."""
+        return cls(profile_path()) if profiling_enabled() else None
+
+    def _rule_entry(self, index: int, rule: Rule) -> List[Any]:
+        # [name, matched, total_ns]
+        return self.rules.setdefault(index, [rule.name, 0, 0])
+
+    def condition(self, index: int, rule: Rule, cond_index: int, condition: Condition,
+                  matched: bool, elapsed_ns: int, scanned: int, prefiltered: bool = False) -> None:
+        """Record one condition check of rule number index.
+
+        prefiltered is True for a regex_match settled by the literal
+        prefilter, without running the regex.
+        """
+        self._rule_entry(index, rule)[2] += elapsed_ns
+        self.conditions.append([rule.name, cond_index, condition.field, condition.operator,
+                                int(matched), elapsed_ns, scanned, int(prefiltered)])
+
+    def rule(self, index: int, rule: Rule, matched: bool) -> None:
+        """Record the outcome of rule number index."""
+        self._rule_entry(index, rule)[1] = int(matched)
+
+    def timeout(self, index: int, rule: Rule, pattern: str, seconds: float) -> None:
+        """Record that rule number index was skipped because pattern ran over budget."""
+        self._rule_entry(index, rule)[2] += int(seconds * 1e9)
+        self.timeouts.append([rule.name, pattern])
+
+    def flush(self, hook_event: str) -> None:
+        """Append this evaluation to the log."""
+        if not self.rules:
+            return
+        line = json.dumps({
+            'version': PROFILE_VERSION,
+            'time': round(time.time(), 3),
+            'event': hook_event,
+            'rules': [self.rules[i] for i in sorted(self.rules)],
+            'conditions': self.conditions,
+            'timeouts': self.timeouts,
+        }, separators=(',', ':'))
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # One small O_APPEND write per evaluation, so concurrent hook
+            # processes never interleave lines
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+        except (IOError, OSError):
+            pass  # Profiling must never break a hook
+
+
+def read_profile(path: str):
+    """Yield the log records in path, skipping malformed or foreign lines."""
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get('version') == PROFILE_VERSION:
+                yield record
+
+
+def _add(totals: Dict[str, Any], matched: int, elapsed_ns: int, scanned: int = 0) -> None:
+    totals['evaluations'] += 1
+    totals['matches'] += matched
+    totals['total_ns'] += elapsed_ns
+    totals['max_ns'] = max(totals['max_ns'], elapsed_ns)
+    totals['scanned'] += scanned
+
+
+def _totals(**keys) -> Dict[str, Any]:
+    return dict(keys, evaluations=0, matches=0, total_ns=0, max_ns=0, scanned=0)
+
+
+def _condition_totals(**keys) -> Dict[str, Any]:
+    return dict(_totals(**keys), prefiltered=0)
+
+
+def summarize(records) -> Dict[str, Any]:
+    """Aggregate profile records into per-rule and per-condition totals.
+
+    Args:
+        records: Iterable of log records (see read_profile)
+
+    Returns:
+        Dict with "evaluations" (records seen), "rules" and "conditions",
+        lists of totals dicts, and "timeouts", regexes that ran over budget.
+    """
+    rules: Dict[str, Dict[str, Any]] = {}
+    conditions: Dict[tuple, Dict[str, Any]] = {}
+    timeouts: Dict[tuple, int] = {}
+    evaluations = 0
+    for record in records:
+        evaluations += 1
+        for name, matched, elapsed_ns in record.get('rules', []):
+            if name not in rules:
+                rules[name] = _totals(name=name)
+            _add(rules[name], matched, elapsed_ns)
+        # Lines written before the prefilter existed have no prefiltered flag
+        for name, index, field, operator, matched, elapsed_ns, scanned, *prefiltered in record.get('conditions', []):
+            key = (name, index, field, operator)
+            if key not in conditions:
+                conditions[key] = _condition_totals(rule=name, index=index, field=field, operator=operator)
+            _add(conditions[key], matched, elapsed_ns, scanned)
+            conditions[key]['prefiltered'] += prefiltered[0] if prefiltered else 0
+            rules[name]['scanned'] += scanned
+        for name, pattern in record.get('timeouts', []):
+            key = (name, pattern)
+            timeouts[key] = timeouts.get(key, 0) + 1
+
+    return {
+        'evaluations': evaluations,
+        'rules': list(rules.values()),
+        'conditions': list(conditions.values()),
+        'timeouts': [{'rule': name, 'pattern': pattern, 'count': count}
+                     for (name, pattern), count in timeouts.items()],
+    }
+
+
+def _ms(ns: float) -> str:
+    return f'{ns / 1e6:.2f}'
+
+
+def format_report(summary: Dict[str, Any], top: int = 10) -> str:
+    """Format a summary as a ranked markdown report.
+
+    Lists the rules and conditions with the highest total time, how often
+    the literal prefilter saved a regex run, regexes that ran over the
+    time budget, and the rules that were evaluated but never matched
+    (candidates for pruning).
+    """
+    lines = [f"## Hookify rule statistics ({summary['evaluations']} evaluations)", '']
+    if not summary['evaluations']:
+        lines.append('No profile data yet. Set HOOKIFY_PROFILE=1 and use Claude Code for a while.')
+        return '\n'.join(lines)
+
+    rules = sorted(summary['rules'], key=lambda r: r['total_ns'], reverse=True)
+    lines += [f'### Slowest rules (top {top})', '',
+              '| Rule | Evaluations | Matches | Total ms | Mean ms | Max ms | Bytes scanned |',
+              '|------|-------------|---------|----------|---------|--------|---------------|']
+    for r in rules[:top]:
+        lines.append(f"| {r['name']} | {r['evaluations']} | {r['matches']} | {_ms(r['total_ns'])} | "
+                     f"{_ms(r['total_ns'] / r['evaluations'])} | {_ms(r['max_ns'])} | {r['scanned']} |")
+
+    conditions = sorted(summary['conditions'], key=lambda c: c['total_ns'], reverse=True)
+    lines += ['', f'### Slowest conditions (top {top})', '',
+              '| Rule | # | Field | Operator | Evaluations | Match % | Total ms | Max ms | Bytes scanned |',
+              '|------|---|-------|----------|-------------|---------|----------|--------|---------------|']
+    for c in conditions[:top]:
+        match_rate = 100.0 * c['matches'] / c['evaluations']
+        lines.append(f"| {c['rule']} | {c['index']} | {c['field']} | {c['operator']} | {c['evaluations']} | "
+                     f"{match_rate:.0f} | {_ms(c['total_ns'])} | {_ms(c['max_ns'])} | {c['scanned']} |")
+
+    regexes = [c for c in summary['conditions'] if c['operator'] == 'regex_match']
+    if regexes:
+        checks = sum(c['evaluations'] for c in regexes)
+        avoided = sum(c.get('prefiltered', 0) for c in regexes)
+        lines += ['', '### Regex prefilter', '',
+                  f'{avoided} of {checks} regex checks ({100.0 * avoided / checks:.0f}%) were ruled out '
+                  f'by a required literal without running the regex.']
+        regexes = sorted((c for c in regexes if c.get('prefiltered')), key=lambda c: c['prefiltered'], reverse=True)
+        if regexes:
+            lines += ['', '| Rule | # | Field | Evaluations | Regex runs avoided |',
+                      '|------|---|-------|-------------|--------------------|']
+            for c in regexes[:top]:
+                lines.append(f"| {c['rule']} | {c['index']} | {c['field']} | {c['evaluations']} | "
+                             f"{c['prefiltered']} |")
+
+    if summary.get('timeouts'):
+        lines += ['', '### Regex timeouts', '',
+                  '| Rule | Pattern | Timeouts |', '|------|---------|----------|']
+        for t in sorted(summary['timeouts'], key=lambda t: t['count'], reverse=True):
+            lines.append(f"| {t['rule']} | `{t['pattern']}` | {t['count']} |")
+
+    never = [r for r in rules if not r['matches']]
+    lines += ['', '### Rules that never matched', '']
+    if never:
+        lines += ['| Rule | Evaluations | Total ms |', '|------|-------------|----------|']
+        for r in never:
+            lines.append(f"| {r['name']} | {r['evaluations']} | {_ms(r['total_ns'])} |")
+    else:
+        lines.append('Every evaluated rule matched at least once.')
+
+    return '\n'.join(lines)
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""Replay recorded sessions through hookify rulesets.
+
+Before a rule is rolled out it helps to know how often it would fire and
+what it would cost. replay() reads session transcripts (the JSONL files
+Claude Code keeps under ~/.claude/projects) or logs of recorded hook
+inputs, rebuilds the hook events they imply, and evaluates them against
+one or two rulesets:
+
+- Each tool_use in an assistant message becomes a PreToolUse event, and
+  a PostToolUse event once its tool_result arrives.
+- Each prompt the user typed becomes a UserPromptSubmit event.
+- Each transcript ends with one Stop event whose transcript_path is the
+  whole file. Stop hooks also run after earlier turns, but a transcript
+  only records the session as it ended, so those are not replayed.
+- A line that already is a hook input (it has hook_event_name) is used
+  as is, so recorded inputs and transcripts can be mixed.
+
+When a ruleset reads the transcript, the events before Stop get a copy
+of the transcript cut off after the line they come from, so transcript
+conditions only see what had been written when the hook ran (give or
+take that line). The copy grows as the file is read, so it costs one
+extra write of the transcript rather than one per event.
+
+Files are spread over a process pool, one file per task. Workers keep
+on-disk caches off, so replays neither read nor disturb the transcript
+checkpoints and stats of live sessions. The parent merges their counts,
+and format_report() renders what `hookify replay` prints: per-rule fire
+counts, decision changes between the current and candidate rulesets,
+and evaluation time percentiles per event.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from hookify.core.config_loader import Rule, parse_rule_files
+from hookify.core.daemon import rule_event_for
+from hookify.core.fastpath import rule_files, scan_rules_dir, user_rules_dir
+
+# Hook events hookify registers for (see hooks/hooks.json)
+REPLAYED_EVENTS = ('PreToolUse', 'PostToolUse', 'Stop', 'UserPromptSubmit')
+
+# Characters of a command, path or prompt shown in change examples
+EXAMPLE_WIDTH = 80
+
+# Set by _init_worker in each pool process: [(RuleIndex, RuleEngine)]
+_workers: List[Tuple[Any, Any]] = []
+
+
+def session_dir(project_dir: str = None) -> str:
+    """Get the directory where Claude Code keeps a project's transcripts.
+
+    Args:
+        project_dir: Project directory (default: the current directory)
+    """
+    key = re.sub(r'[^A-Za-z0-9]', '-', os.path.abspath(project_dir or os.curdir))
+    return os.path.join(user_rules_dir(), 'projects', key)
+
+
+def find_sources(paths: List[str]) -> List[str]:
+    """Expand files and directories into the JSONL files to replay.
+
+    Directories are searched recursively for *.jsonl files, so a
+    project's transcripts and its subagent transcripts are both found.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith('.jsonl'))
+        else:
+            files.append(path)
+    return files
+
+
+def load_ruleset(paths: Optional[List[str]] = None) -> List[Rule]:
+    """Load a ruleset for replay, bypassing the ruleset cache.
+
+    Args:
+        paths: Rule files, bundles and directories holding them, lowest
+            precedence first; None for the current rule sources
+
+    Returns:
+        Enabled rules for every event.
+    """
+    if paths is None:
+        return parse_rule_files(rule_files())
+    files = []
+    for path in paths:
+        files.extend(scan_rules_dir(path) if os.path.isdir(path) else [path])
+    return parse_rule_files(files)
+
+
+def _prompt_text(content: Any) -> str:
+    """Get the typed text of a user message, ignoring tool results."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return '\n'.join(block.get('text', '') for block in content
+                         if isinstance(block, dict) and block.get('type') == 'text')
+    return ''
+
+
+def read_events(path: str, cut_transcript: bool = False) -> Iterator[Dict[str, Any]]:
+    """Rebuild the hook inputs a transcript or hook input log implies.
+
+    Args:
+        path: Transcript or recorded hook input JSONL file
+        cut_transcript: Give events before the final Stop a temporary
+            copy of the transcript up to their line as transcript_path,
+            valid until the next event is taken
+
+    Yields:
+        Hook input dicts in the order the hooks would have run.
+    """
+    pending: Dict[str, Dict[str, Any]] = {}
+    session_id, cwd = '', ''
+    prefix = prefix_path = None
+    try:
+        with open(path, 'rb') as f:
+            if cut_transcript:
+                fd, prefix_path = tempfile.mkstemp(prefix='hookify-replay-', suffix='.jsonl')
+                prefix = os.fdopen(fd, 'wb', buffering=0)
+            for line in f:
+                if prefix is not None:
+                    prefix.write(line)
+                try:
+                    record = json.loads(line.decode('utf-8', errors='replace'))
+                except ValueError:
+                    continue
+                if not isinstance(record, dict):
+                    continue
+                if 'hook_event_name' in record:
+                    yield record
+                    continue
+
+                kind = record.get('type')
+                if kind not in ('user', 'assistant'):
+                    continue
+                session_id = record.get('sessionId') or session_id
+                cwd = record.get('cwd') or cwd
+                base = {'session_id': session_id, 'transcript_path': prefix_path or path, 'cwd': cwd}
+                content = (record.get('message') or {}).get('content')
+
+                if kind == 'assistant':
+                    for block in content if isinstance(content, list) else []:
+                        if isinstance(block, dict) and block.get('type') == 'tool_use':
+                            event = dict(base, hook_event_name='PreToolUse', tool_name=block.get('name', ''),
+                                         tool_input=block.get('input') or {}, tool_use_id=block.get('id', ''))
+                            pending[event['tool_use_id']] = event
+                            yield event
+                    continue
+
+                if record.get('isMeta') or record.get('isCompactSummary'):
+                    continue
+                results = [block for block in content if isinstance(block, dict)
+                           and block.get('type') == 'tool_result'] if isinstance(content, list) else []
+                for block in results:
+                    event = pending.pop(block.get('tool_use_id', ''), None)
+                    if event is not None:
+                        response = record['toolUseResult'] if len(results) == 1 and 'toolUseResult' in record \
+                            else block.get('content')
+                        yield dict(event, hook_event_name='PostToolUse', tool_response=response)
+                prompt = '' if results else _prompt_text(content)
+                if prompt:
+                    # Claude Code sends "prompt"; hookify rules read "user_prompt"
+                    yield dict(base, hook_event_name='UserPromptSubmit', prompt=prompt, user_prompt=prompt)
+    finally:
+        if prefix is not None:
+            prefix.close()
+            os.unlink(prefix_path)
+
+    if session_id:
+        yield {'hook_event_name': 'Stop', 'session_id': session_id, 'transcript_path': path,
+               'cwd': cwd, 'stop_hook_active': False}
+
+
+def decision_of(response: Dict[str, Any]) -> str:
+    """Classify a hook response as "allow", "warn" or "block"."""
+    if response.get('decision') == 'block' or \
+            response.get('hookSpecificOutput', {}).get('permissionDecision') == 'deny':
+        return 'block'
+    return 'warn' if response.get('systemMessage') else 'allow'
+
+
+def _describe(event: Dict[str, Any]) -> str:
+    """Summarize what an event was about, for change examples."""
+    tool_input = event.get('tool_input') or {}
+    text = (tool_input.get('command') or tool_input.get('file_path') or event.get('user_prompt')
+            or event.get('tool_name') or os.path.basename(event.get('transcript_path', '')))
+    text = ' '.join(str(text).split())
+    return text if len(text) <= EXAMPLE_WIDTH else text[:EXAMPLE_WIDTH - 3] + '...'
+
+
+def _init_worker(rulesets: List[List[Rule]]) -> None:
+    """Build an engine per ruleset in a pool process."""
+    from hookify.core.ordering import ConditionStats
+    from hookify.core.rule_engine import RuleEngine
+    from hookify.core.rule_index import RuleIndex
+
+    # Don't read or write the caches of live sessions
+    os.environ['HOOKIFY_CACHE'] = '0'
+    os.environ.pop('HOOKIFY_PROFILE', None)
+    _workers[:] = [(RuleIndex(rules), RuleEngine(ConditionStats())) for rules in rulesets]
+
+
+def _new_totals(rulesets: int) -> Dict[str, Any]:
+    return {
+        'files': 0,
+        'sessions': 0,
+        'errors': [],
+        'events': {},
+        'fires': [{} for _ in range(rulesets)],
+        'changes': {},
+        'examples': [],
+        'times': [{} for _ in range(rulesets)],
+    }
+
+
+def _replay_file(args: Tuple[str, int]) -> Dict[str, Any]:
+    """Evaluate every event of one file against every ruleset."""
+    path, max_examples = args
+    totals = _new_totals(len(_workers))
+    totals['files'] = 1
+    sessions = set()
+    fired_in_file: List[set] = [set() for _ in _workers]
+    reads_transcript = any(condition.field == 'transcript'
+                           for index, _ in _workers for rule in index.rules for condition in rule.conditions)
+    try:
+        for event in read_events(path, reads_transcript):
+            hook_event = event.get('hook_event_name', '')
+            if hook_event not in REPLAYED_EVENTS:
+                continue
+            sessions.add(event.get('session_id', ''))
+            totals['events'][hook_event] = totals['events'].get(hook_event, 0) + 1
+            tool_name = event.get('tool_name', '')
+            rule_event = rule_event_for(hook_event, tool_name)
+
+            decisions = []
+            for i, (index, engine) in enumerate(_workers):
+                rules = index.lookup(rule_event, tool_name)
+                start = time.perf_counter_ns()
+                matched = engine.match_rules(rules, event)
+                response = engine.build_response(matched, hook_event)
+                totals['times'][i].setdefault(hook_event, []).append(time.perf_counter_ns() - start)
+
+                fires = totals['fires'][i]
+                for rule in matched:
+                    fires[rule.name] = fires.get(rule.name, 0) + 1
+                    fired_in_file[i].add(rule.name)
+                decisions.append((decision_of(response), [rule.name for rule in matched]))
+
+            if len(decisions) == 2 and decisions[0] != decisions[1]:
+                key = (hook_event, decisions[0][0], decisions[1][0])
+                totals['changes'][key] = totals['changes'].get(key, 0) + 1
+                if len(totals['examples']) < max_examples:
+                    totals['examples'].append({
+                        'file': path,
+                        'session': event.get('session_id', ''),
+                        'event': hook_event,
+                        'tool': tool_name,
+                        'input': _describe(event),
+                        'baseline': decisions[0][0],
+                        'candidate': decisions[1][0],
+                        'baseline_rules': decisions[0][1],
+                        'candidate_rules': decisions[1][1],
+                    })
+    except (IOError, OSError, UnicodeDecodeError) as e:
+        totals['errors'].append(f'{path}: {e}')
+
+    totals['sessions'] = len(sessions)
+    totals['fired_in'] = [{name: 1 for name in names} for names in fired_in_file]
+    return totals
+
+
+def _merge_counts(into: Dict, counts: Dict) -> None:
+    for key, count in counts.items():
+        into[key] = into.get(key, 0) + count
+
+
+def _percentile(sorted_ns: List[int], fraction: float) -> int:
+    """Nearest-rank percentile of a sorted list."""
+    return sorted_ns[min(len(sorted_ns) - 1, int(fraction * len(sorted_ns)))]
+
+
+def replay(sources: List[str], rulesets: List[List[Rule]], labels: List[str],
+           jobs: int = None, max_examples: int = 10) -> Dict[str, Any]:
+    """Evaluate rulesets over recorded sessions in parallel.
+
+    Args:
+        sources: Transcript or hook input JSONL files
+        rulesets: One ruleset, or [baseline, candidate] to compare
+        labels: A name for each ruleset, used in the report
+        jobs: Worker processes (default: one per CPU); 1 runs in-process
+        max_examples: Decision changes to keep as examples
+
+    Returns:
+        Dict with the counts of files, sessions and events, "rules" (fire
+        counts per ruleset), "changes" and "examples" (when comparing),
+        "timing" (percentiles per ruleset and event) and "errors".
+    """
+    jobs = jobs or os.cpu_count() or 1
+    totals = _new_totals(len(rulesets))
+    fired_in = [{} for _ in rulesets]
+    tasks = [(path, max_examples) for path in sources]
+    start = time.perf_counter()
+
+    def merge(partial: Dict[str, Any]) -> None:
+        totals['files'] += partial['files']
+        totals['sessions'] += partial['sessions']
+        totals['errors'] += partial['errors']
+        _merge_counts(totals['events'], partial['events'])
+        _merge_counts(totals['changes'], partial['changes'])
+        totals['examples'] += partial['examples'][:max_examples - len(totals['examples'])]
+        for i in range(len(rulesets)):
+            _merge_counts(totals['fires'][i], partial['fires'][i])
+            _merge_counts(fired_in[i], partial['fired_in'][i])
+            for hook_event, times in partial['times'][i].items():
+                totals['times'][i].setdefault(hook_event, []).extend(times)
+
+    if jobs == 1 or len(tasks) <= 1:
+        _init_worker(rulesets)
+        for task in tasks:
+            merge(_replay_file(task))
+    else:
+        import multiprocessing
+
+        with multiprocessing.Pool(min(jobs, len(tasks)), _init_worker, (rulesets,)) as pool:
+            for partial in pool.imap(_replay_file, tasks, chunksize=max(1, len(tasks) // (jobs * 8))):
+                merge(partial)
+
+    rules: Dict[str, Dict[str, Any]] = {}
+    for i, ruleset in enumerate(rulesets):
+        for rule in ruleset:
+            entry = rules.setdefault(rule.name, {'name': rule.name, 'fires': {}, 'sessions': {}})
+            entry['action'] = rule.action
+            entry['event'] = rule.event
+            entry['fires'][labels[i]] = totals['fires'][i].get(rule.name, 0)
+            entry['sessions'][labels[i]] = fired_in[i].get(rule.name, 0)
+
+    timing = []
+    for i, label in enumerate(labels):
+        for hook_event in sorted(totals['times'][i]):
+            times = sorted(totals['times'][i][hook_event])
+            timing.append({
+                'ruleset': label,
+                'event': hook_event,
+                'events': len(times),
+                'p50_ns': _percentile(times, 0.50),
+                'p95_ns': _percentile(times, 0.95),
+                'p99_ns': _percentile(times, 0.99),
+                'max_ns': times[-1],
+                'total_ns': sum(times),
+            })
+
+    return {
+        'files': totals['files'],
+        'sessions': totals['sessions'],
+        'events': totals['events'],
+        'jobs': 1 if jobs == 1 or len(tasks) <= 1 else min(jobs, len(tasks)),
+        'elapsed_s': round(time.perf_counter() - start, 3),
+        'rulesets': labels,
+        'rules': list(rules.values()),
+        'changes': [{'event': event, labels[0]: before, labels[-1]: after, 'count': count}
+                    for (event, before, after), count in sorted(totals['changes'].items())]
+        if len(rulesets) == 2 else [],
+        'examples': totals['examples'],
+        'timing': timing,
+        'errors': totals['errors'],
+    }
+
+
+def _ms(ns: float) -> str:
+    return f'{ns / 1e6:.2f}'
+
+
+def _error_lines(errors: List[str]) -> List[str]:
+    if not errors:
+        return []
+    return ['', '### Unreadable files', ''] + [f'- {error}' for error in errors]
+
+
+def format_report(summary: Dict[str, Any]) -> str:
+    """Format a replay summary as a markdown report."""
+    labels = summary['rulesets']
+    total = sum(summary['events'].values())
+    lines = [f"## Hookify replay ({summary['sessions']} sessions, {total} events, "
+             f"{summary['jobs']} jobs, {summary['elapsed_s']:.1f}s)", '']
+    if not total:
+        lines.append('No hook events found in the given files.')
+        return '\n'.join(lines + _error_lines(summary['errors']))
+    lines.append(', '.join(f'{name}: {count}' for name, count in sorted(summary['events'].items())))
+
+    rules = sorted(summary['rules'], key=lambda r: [-r['fires'].get(label, 0) for label in reversed(labels)])
+    lines += ['', '### Rule fires', '',
+              '| Rule | Event | Action | ' + ' | '.join(f'{label} fires' for label in labels)
+              + f' | {labels[-1]} sessions |',
+              '|------|-------|--------|' + '------|' * len(labels) + '------|']
+    for r in rules:
+        fires = ' | '.join(str(r['fires'].get(label, '-')) for label in labels)
+        lines.append(f"| {r['name']} | {r['event']} | {r['action']} | {fires} | "
+                     f"{r['sessions'].get(labels[-1], '-')} |")
+
+    if len(labels) == 2:
+        lines += ['', f'### Decision changes ({labels[0]} -> {labels[1]})', '']
+        if summary['changes']:
+            lines += [f'| Event | {labels[0]} | {labels[1]} | Events |', '|-------|------|------|--------|']
+            for c in summary['changes']:
+                lines.append(f"| {c['event']} | {c[labels[0]]} | {c[labels[1]]} | {c['count']} |")
+            lines += ['', 'Examples:', '']
+            for e in summary['examples']:
+                what = f"{e['event']} {e['tool']}".strip()
+                lines.append(f"- {what} `{e['input']}`: {e['baseline']} -> {e['candidate']} "
+                             f"(rules: {', '.join(e['candidate_rules']) or 'none'}; "
+                             f"was: {', '.join(e['baseline_rules']) or 'none'}) in {e['file']}")
+        else:
+            lines.append('No event gets a different decision.')
+
+    lines += ['', '### Evaluation time', '',
+              '| Ruleset | Event | Events | p50 ms | p95 ms | p99 ms | Max ms | Total ms |',
+              '|---------|-------|--------|--------|--------|--------|--------|----------|']
+    for t in summary['timing']:
+        lines.append(f"| {t['ruleset']} | {t['event']} | {t['events']} | {_ms(t['p50_ns'])} | "
+                     f"{_ms(t['p95_ns'])} | {_ms(t['p99_ns'])} | {_ms(t['max_ns'])} | {_ms(t['total_ns'])} |")
+
+    return '\n'.join(lines + _error_lines(summary['errors']))
+
+
+# For testing
+if __name__ == '__main__':
+    paths = sys.argv[1:] or find_sources([session_dir()])
+    for path in paths[:1]:
+        for event in read_events(path):
+            print(event['hook_event_name'], _describe(event))
@@ -3,15 +3,27 @@
 
 import re
 import sys
+import time
+from dataclasses import replace
 from functools import lru_cache
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 # Import from local module
 from hookify.core.config_loader import Rule, Condition
-
-
-# Cache compiled regexes (max 128 patterns)
-@lru_cache(maxsize=128)
+from hookify.core.decision_cache import DecisionCache, decision_key, fields_read, ruleset_signature
+from hookify.core.fastpath import project_root
+from hookify.core.ordering import ConditionStats, order_conditions, order_rules
+from hookify.core.plan import INPUT_FIELDS, CompiledRule, ConditionNode, EvaluationPlan, field_getter
+from hookify.core.profiling import RuleProfiler, profiling_enabled
+from hookify.core.tool_use_cache import ToolUseCache, input_fingerprint
+from hookify.matchers.payload import FieldView
+from hookify.matchers.regex_safety import RegexTimeout, deadline, regex_timeout, timeout_policy
+from hookify.matchers.regex_set import RegexSet
+from hookify.matchers.transcript import scan_transcript_incremental
+
+
+# Cache compiled regexes (max 1024 patterns)
+@lru_cache(maxsize=1024)
 def compile_regex(pattern: str) -> re.Pattern:
     """Compile regex pattern with caching.
 
@@ -24,13 +36,65 @@ def compile_regex(pattern: str) -> re.Pattern:
     return re.compile(pattern, re.IGNORECASE)
 
 
+# Hook events that share check results through the tool use cache
+TOOL_EVENTS = ('PreToolUse', 'PostToolUse')
+
+# Tool calls whose tool_input fields total less than this are cheaper to
+# evaluate again in PostToolUse than to store and load results for
+SHARE_MIN_SIZE = 4096
+
+# Operators checked before any regex runs: they look at no more of the
+# field than the pattern's length
+CHEAP_OPERATORS = frozenset(('equals', 'starts_with', 'ends_with'))
+
+# Fields shorter than this are searched as they are: for them, lowercasing
+# costs more than case-folded patterns and literal prefilters save
+LOWER_MIN_SIZE = 4096
+
+
+# Cache combined per-field matchers (one per distinct field pattern set)
+@lru_cache(maxsize=32)
+def compile_regex_set(entries: Tuple[Tuple[Any, str], ...], folded: bool = False) -> RegexSet:
+    """Compile (key, pattern) entries into a RegexSet with caching.
+
+    Args:
+        entries: Tuple of (key, pattern) pairs
+        folded: Patterns come from fold_pattern and are matched
+            case-sensitively against lowercased text
+
+    Returns:
+        Combined matcher for all patterns
+    """
+    return RegexSet(entries, 0 if folded else re.IGNORECASE)
+
+
 class RuleEngine:
     """Evaluates rules against hook input data."""
 
-    def __init__(self):
-        """Initialize rule engine."""
-        # No need for instance cache anymore - using global lru_cache
-        pass
+    def __init__(self, stats: ConditionStats = None, decisions: DecisionCache = None,
+                 tool_uses: ToolUseCache = None):
+        """Initialize rule engine.
+
+        Args:
+            stats: Condition match counts used to order evaluation; defaults
+                to the persisted stats for the current project
+            decisions: Cache of earlier decisions; defaults to the shared
+                cache for the current project (None if caching is off)
+            tool_uses: Store passing check results from PreToolUse to
+                PostToolUse; defaults to the current project's (None if
+                caching is off)
+        """
+        self.stats = stats if stats is not None else ConditionStats.for_project()
+        self.decisions = decisions if decisions is not None else DecisionCache.for_project()
+        self.tool_uses = tool_uses if tool_uses is not None else ToolUseCache.for_project()
+        self.regex_timeout = regex_timeout()
+        self.timeout_policy = timeout_policy()
+
+        # id()s of an evaluated rule list -> its compiled plan
+        self._plans: Dict[Tuple[int, ...], EvaluationPlan] = {}
+
+        # Invalid patterns already reported
+        self._invalid: set = set()
 
     def evaluate_rules(self, rules: List[Rule], input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate all rules and return combined results.
@@ -47,15 +111,156 @@ class RuleEngine:
             Empty dict {} if no rules match.
         """
         hook_event = input_data.get('hook_event_name', '')
+
+        # Field name -> view of its value, extracted once for all rules
+        views: Dict[str, Optional[FieldView]] = {}
+
+        # A repeated call with the same relevant fields skips matching.
+        # Profiling bypasses the cache so it measures the rules themselves.
+        key = None
+        if self.decisions is not None and rules and not profiling_enabled():
+            key = self._decision_key(rules, input_data, views)
+            cached = self.decisions.get(key) if key else None
+            if cached is not None:
+                return cached
+
+        # PostToolUse starts from the checks PreToolUse ran on the same input
+        call = None
+        results: Dict[int, Tuple[bool, int]] = {}
+        if self.tool_uses is not None and rules and hook_event in TOOL_EVENTS and not profiling_enabled():
+            call = self._tool_use_call(rules, input_data, views)
+            if call is not None and hook_event == 'PostToolUse':
+                known = self.tool_uses.take(input_data.get('session_id', ''), *call)
+                if known:
+                    by_key = self._plan(rules).by_key
+                    results.update((by_key[k].id, (matched, 0)) for k, matched in known.items() if k in by_key)
+
+        timeouts: Dict[int, str] = {}
+        response = self.build_response(self.match_rules(rules, input_data, views, timeouts, results), hook_event)
+        if key and not timeouts:
+            self.decisions.put(key, response)
+        if call is not None and hook_event == 'PreToolUse' and not timeouts:
+            plan = self._plan(rules)
+            shared = [node_key + (results[node.id][0],) for node_key, node in plan.by_key.items()
+                      if node.id in results and node.field not in INPUT_FIELDS]
+            if shared:
+                self.tool_uses.put(input_data.get('session_id', ''), *call, shared)
+        return response
+
+    def match_rules(self, rules: List[Rule], input_data: Dict[str, Any],
+                    views: Optional[Dict[str, Optional[FieldView]]] = None,
+                    timeouts: Optional[Dict[int, str]] = None,
+                    results: Optional[Dict[int, Tuple[bool, int]]] = None) -> List[Rule]:
+        """Find the rules that match a hook input.
+
+        Args:
+            rules: List of Rule objects to evaluate
+            input_data: Hook input JSON (tool_name, tool_input, etc.)
+            views: Field views already extracted for this input
+            timeouts: Filled with rule index -> pattern for rules whose
+                result hung on a regex that ran over the time budget
+            results: Node id (in the rules' plan) -> (matched, scanned) of
+                checks already known for this input; filled with the
+                checks run here
+
+        Returns:
+            Matching rules in load order. A rule whose other conditions all
+            match but whose regex ran over the time budget is included, with
+            the timeout policy as its action, unless the policy is "allow".
+            A rule another condition rules out doesn't match, timeout or not.
+        """
+        hook_event = input_data.get('hook_event_name', '')
+
+        # Per-call, so concurrent evaluations in the daemon don't mix timings
+        profiler = RuleProfiler.from_env()
+
+        # Rule index -> pattern of rules undecided because a regex ran over budget
+        if timeouts is None:
+            timeouts = {}
+        # Node id -> pattern of regex checks that ran over budget
+        timed_out: Dict[int, str] = {}
+
+        # Field name -> view of its value, extracted once for all rules
+        if views is None:
+            views = {}
+
+        plan = self._plan(rules)
+        tool_name = input_data.get('tool_name', '')
+        tool_input = input_data.get('tool_input', {})
+
+        # Rules that can't apply to this tool or payload size
+        skipped = {i for i, compiled in enumerate(plan.compiled)
+                   if (compiled.tools is not None and tool_name not in compiled.tools)
+                   or self._too_large(compiled, tool_name, tool_input, input_data, views)}
+
+        # Node id -> (matched, scanned): each distinct check runs at most once
+        if results is None:
+            results = {}
+        known = set(results)
+
+        # Settle the cheap checks first: every glob and path_prefix condition,
+        # one index lookup per field, then equals / starts_with / ends_with
+        self._match_path_conditions(plan, skipped, tool_name, tool_input, input_data,
+                                    results, profiler, views)
+        self._match_cheap_conditions(plan, skipped, tool_name, tool_input, input_data,
+                                     results, profiler, views)
+        # Rules one of them ruled out never get their regexes run
+        failed = {i for i, compiled in enumerate(plan.compiled) if i not in skipped and any(
+            node.id in results and not results[node.id][0] for node in compiled.nodes)}
+        # Then match the regex_match conditions of the rest, one scan per field
+        self._scan_regex_conditions(plan, skipped | failed, tool_name, tool_input, input_data,
+                                    results, profiler, timed_out, views)
+        prescanned = set(results) - known
+
+        # Cheapest rules first; matches are reported in load order below
+        matched = {}
+        for i in order_rules(rules, self.stats):
+            rule_matched = False
+            if i not in skipped:
+                try:
+                    rule_matched = self._rule_matches(plan.compiled[i], i, tool_name, tool_input, input_data,
+                                                      results, prescanned, views, profiler, timed_out)
+                except RegexTimeout as e:
+                    timeouts[i] = e.pattern
+            if rule_matched:
+                matched[i] = rules[i]
+            if profiler:
+                profiler.rule(i, rules[i], rule_matched)
+
+        for i, pattern in timeouts.items():
+            rule = rules[i]
+            print(f"Warning: Hookify rule '{rule.name}' skipped: regex '{pattern}' exceeded "
+                  f"the {self.regex_timeout:g}s time budget", file=sys.stderr)
+            if profiler:
+                profiler.timeout(i, rule, pattern, self.regex_timeout)
+            if self.timeout_policy != 'allow':
+                matched[i] = replace(rule, action=self.timeout_policy, message=(
+                    f"Regex `{pattern}` exceeded the {self.regex_timeout:g}s time budget, "
+                    f"so this rule could not be checked."))
+
+        self.stats.save()
+        if profiler:
+            profiler.flush(hook_event)
+
+        return [matched[i] for i in sorted(matched)]
+
+    def build_response(self, matched: List[Rule], hook_event: str) -> Dict[str, Any]:
+        """Combine matched rules into the hook response.
+
+        Args:
+            matched: Matching rules, as returned by match_rules
+            hook_event: Hook event name ("PreToolUse", "Stop", etc.)
+
+        Returns:
+            Response dict, empty if nothing matched.
+        """
         blocking_rules = []
         warning_rules = []
-
-        for rule in rules:
-            if self._rule_matches(rule, input_data):
-                if rule.action == 'block':
-                    blocking_rules.append(rule)
-                else:
-                    warning_rules.append(rule)
+        for rule in matched:
+            if rule.action == 'block':
+                blocking_rules.append(rule)
+            else:
+                warning_rules.append(rule)
 
         # If any blocking rules matched, block the operation
         if blocking_rules:
@@ -93,98 +298,451 @@ class RuleEngine:
         # No matches - allow operation
         return {}
 
-    def _rule_matches(self, rule: Rule, input_data: Dict[str, Any]) -> bool:
-        """Check if rule matches input data.
+    def _plan(self, rules: List[Rule]) -> EvaluationPlan:
+        """Get the compiled plan for a rule list, compiling it on first use."""
+        plan_key = tuple(map(id, rules))
+        plan = self._plans.get(plan_key)
+        if plan is None:
+            if len(self._plans) >= 64:
+                self._plans.clear()
+            # The plan holds the rules, which keeps their ids from being reused
+            plan = self._plans[plan_key] = EvaluationPlan(rules)
+        return plan
+
+    def _tool_use_call(self, rules: List[Rule], input_data: Dict[str, Any],
+                       views: Dict[str, Optional[FieldView]]) -> Optional[Tuple[str, str]]:
+        """Identify a tool call for sharing check results between its hook events.
 
-        Args:
-            rule: Rule to evaluate
-            input_data: Hook input data
+        Returns:
+            (call key, input fingerprint), or None if the rules read too
+            little of tool_input for sharing to pay off.
+        """
+        plan = self._plan(rules)
+        tool_name = input_data.get('tool_name', '')
+        tool_input = input_data.get('tool_input', {})
+        values = [(field, self._field_view(field, tool_name, tool_input, input_data, views))
+                  for field in plan.tool_fields]
+        if sum(len(view) for _, view in values if view is not None) < SHARE_MIN_SIZE:
+            return None
+        fingerprint = input_fingerprint(tool_name, values)
+        return input_data.get('tool_use_id') or fingerprint, fingerprint
+
+    def _decision_key(self, rules: List[Rule], input_data: Dict[str, Any],
+                      views: Dict[str, Optional[FieldView]]) -> Optional[str]:
+        """Get the decision cache key for evaluating rules on input_data.
 
         Returns:
-            True if rule matches, False otherwise
+            Key, or None if the decision must not be cached.
         """
-        # Extract tool information
+        plan = self._plan(rules)
+        if plan.signature is None:
+            plan.signature = ruleset_signature(rules)
+            plan.fields = fields_read(rules)
+        if plan.fields is None:
+            return None
+
         tool_name = input_data.get('tool_name', '')
         tool_input = input_data.get('tool_input', {})
+        values = [(field, self._field_view(field, tool_name, tool_input, input_data, views))
+                  for field in plan.fields]
+        return decision_key(plan.signature, input_data.get('hook_event_name', ''), tool_name, values)
+
+    def _scan_regex_conditions(self, plan: EvaluationPlan, skipped: set, tool_name: str,
+                               tool_input: Dict[str, Any], input_data: Dict[str, Any],
+                               results: Dict[int, Tuple[bool, int]],
+                               profiler: Optional[RuleProfiler] = None,
+                               timed_out: Optional[Dict[int, str]] = None,
+                               views: Optional[Dict[str, Optional[FieldView]]] = None) -> None:
+        """Evaluate all regex_match checks with one combined scan per field.
+
+        Checks with scan_first / scan_last limits are scanned together with
+        other checks that have the same limits. On large ASCII fields, a
+        pattern whose required literals (see plan) are all absent from the
+        lowercased field is a miss without running the regex, and foldable
+        patterns are matched against the lowercased field.
 
-        # Check tool matcher if specified
-        if rule.tool_matcher:
-            if not self._matches_tool(rule.tool_matcher, tool_name):
-                return False
+        Args:
+            plan: Plan of the rules being evaluated
+            skipped: Indexes of rules that can't apply to this event
+            tool_name: Tool being used
+            tool_input: Tool input dict
+            input_data: Full hook input data
+            results: Node id -> (matched, scanned) of checks already known,
+                which are skipped; receives the regex_match checks of the
+                other rules
+            profiler: Records timings if profiling is enabled; each field's
+                scan time is split evenly across its checks, and checks
+                settled by the literal prefilter are marked as such
+            timed_out: Receives node id -> pattern for checks that ran over
+                the time budget; they are left out of results
+            views: Field views shared with later condition checks
+        """
+        if views is None:
+            views = {}
+        nodes_by_scope: Dict[tuple, Dict[int, ConditionNode]] = {}
+        users: Dict[int, List[Tuple[int, int]]] = {}
+        for i, compiled in enumerate(plan.compiled):
+            if i in skipped:
+                continue
+            for j, node in enumerate(compiled.nodes):
+                if (node.operator != 'regex_match' or node.id in results
+                        or self._streams_transcript(node.field, tool_input, input_data)):
+                    continue
+                nodes_by_scope.setdefault((node.field,) + node.scope, {})[node.id] = node
+                users.setdefault(node.id, []).append((i, j))
+
+        # Field name -> lowercased view, or None if the field isn't ASCII
+        lowered: Dict[str, Optional[FieldView]] = {}
+        for (field, scan_first, scan_last), nodes in nodes_by_scope.items():
+            start = time.perf_counter_ns() if profiler else 0
+            hits = set()
+            regions = []
+            # Nodes ruled out by the literal prefilter, without running their regex
+            absent = set()
+            view = self._field_view(field, tool_name, tool_input, input_data, views)
+            if view is not None:
+                regions = view.regions(scan_first, scan_last)
+                # Lowercase the field only for checks that gain from it
+                if field not in lowered and len(view) >= LOWER_MIN_SIZE and any(
+                        node.folded is not None or node.literals for node in nodes.values()):
+                    lowered[field] = view.lower() if view.isascii() else None
+                lower = lowered.get(field)
+                lower_regions = lower.regions(scan_first, scan_last) if lower is not None else []
+                if lower_regions:
+                    absent = {node_id for node_id, node in nodes.items() if node.literals and not any(
+                        region.contains(literal) for literal in node.literals for region in lower_regions)}
+                remaining = [node for node_id, node in nodes.items() if node_id not in absent]
+                fold_entries = tuple((node.id, node.folded) for node in remaining
+                                     if lower_regions and node.folded is not None)
+                entries = tuple((node.id, node.pattern) for node in remaining
+                                if not (lower_regions and node.folded is not None))
+                invalid = set()
+                try:
+                    with deadline(self.regex_timeout):
+                        if fold_entries:
+                            regex_set = compile_regex_set(fold_entries, True)
+                            invalid |= self._report_errors(regex_set, fold_entries, nodes)
+                            for region in lower_regions:
+                                hits |= region.match_set(regex_set)
+                        if entries:
+                            regex_set = compile_regex_set(entries)
+                            invalid |= self._report_errors(regex_set, entries, nodes)
+                            for region in regions:
+                                hits |= region.match_set(regex_set)
+                except RegexTimeout:
+                    hits = self._retry_regex_nodes(remaining, invalid, regions, timed_out)
+            share = (time.perf_counter_ns() - start) // len(nodes) if profiler else 0
+            scanned = sum(map(len, regions))
+
+            for node_id, node in nodes.items():
+                if timed_out and node_id in timed_out:
+                    continue
+                hit = node_id in hits
+                results[node_id] = (hit, scanned)
+                self.stats.record(node.condition, hit)
+                if profiler:
+                    for i, j in users[node_id]:
+                        rule = plan.rules[i]
+                        profiler.condition(i, rule, j, rule.conditions[j], hit, share, scanned,
+                                           prefiltered=node_id in absent)
+
+    def _match_path_conditions(self, plan: EvaluationPlan, skipped: set, tool_name: str,
+                               tool_input: Dict[str, Any], input_data: Dict[str, Any],
+                               results: Dict[int, Tuple[bool, int]],
+                               profiler: Optional[RuleProfiler] = None,
+                               views: Optional[Dict[str, Optional[FieldView]]] = None) -> None:
+        """Evaluate all glob and path_prefix checks with one PathSet lookup per field.
+
+        Args:
+            plan: Plan of the rules being evaluated
+            skipped: Indexes of rules that can't apply to this event
+            tool_name: Tool being used
+            tool_input: Tool input dict
+            input_data: Full hook input data
+            results: Node id -> (matched, scanned) of checks already known,
+                which are skipped; receives the path checks of the other rules
+            profiler: Records timings if profiling is enabled; each field's
+                lookup time is split evenly across its checks
+            views: Field views shared with later condition checks
+        """
+        if views is None:
+            views = {}
+        for field, field_nodes in plan.path_nodes.items():
+            if self._streams_transcript(field, tool_input, input_data):
+                continue
+            nodes = [node for node in field_nodes if node.id not in results
+                     and (not skipped or any(i not in skipped for i, _ in plan.path_users[node.id]))]
+            if not nodes:
+                continue
+            start = time.perf_counter_ns() if profiler else 0
+            view = self._field_view(field, tool_name, tool_input, input_data, views)
+            hits = plan.path_set(field).match(view.text(), project_root()) if view is not None else set()
+            share = (time.perf_counter_ns() - start) // len(nodes) if profiler else 0
+            scanned = len(view) if view is not None else 0
+
+            for node in nodes:
+                hit = node.id in hits
+                results[node.id] = (hit, scanned)
+                self.stats.record(node.condition, hit)
+                if profiler:
+                    for i, j in plan.path_users[node.id]:
+                        rule = plan.rules[i]
+                        profiler.condition(i, rule, j, rule.conditions[j], hit, share, scanned)
+
+    def _match_cheap_conditions(self, plan: EvaluationPlan, skipped: set, tool_name: str,
+                                tool_input: Dict[str, Any], input_data: Dict[str, Any],
+                                results: Dict[int, Tuple[bool, int]],
+                                profiler: Optional[RuleProfiler] = None,
+                                views: Optional[Dict[str, Optional[FieldView]]] = None) -> None:
+        """Evaluate the equals, starts_with and ends_with checks of rules that can apply.
+
+        These compare at most the pattern's length of the field, so they
+        run before any search and rule out rules without scanning payloads.
+
+        Args:
+            plan: Plan of the rules being evaluated
+            skipped: Indexes of rules that can't apply to this event
+            tool_name: Tool being used
+            tool_input: Tool input dict
+            input_data: Full hook input data
+            results: Node id -> (matched, scanned) of checks already known,
+                which are skipped; receives the checks run here
+            profiler: Records condition timings if profiling is enabled
+            views: Field views shared with later condition checks
+        """
+        if views is None:
+            views = {}
+        settled = set(results)
+        for i, compiled in enumerate(plan.compiled):
+            if i in skipped:
+                continue
+            for j, node in enumerate(compiled.nodes):
+                if (node.operator not in CHEAP_OPERATORS or node.id in settled
+                        or self._streams_transcript(node.field, tool_input, input_data)):
+                    continue
+                known = results.get(node.id)
+                elapsed = 0
+                if known is None:
+                    start = time.perf_counter_ns() if profiler else 0
+                    known = results[node.id] = self._evaluate_node(node, tool_name, tool_input, input_data, views)
+                    elapsed = time.perf_counter_ns() - start if profiler else 0
+                    self.stats.record(node.condition, known[0])
+                if profiler:
+                    profiler.condition(i, compiled.rule, j, compiled.rule.conditions[j], known[0],
+                                       elapsed, known[1])
+
+    def _report_errors(self, regex_set: RegexSet, entries: Tuple[Tuple[int, str], ...],
+                       nodes: Dict[int, ConditionNode]) -> set:
+        """Print invalid patterns of a regex set; return their node ids."""
+        invalid = set()
+        for node_id, pattern in entries:
+            if pattern in regex_set.errors:
+                invalid.add(node_id)
+                self._invalid_pattern(nodes[node_id].pattern, regex_set.errors[pattern])
+        return invalid
+
+    def _invalid_pattern(self, pattern: str, error: re.error) -> None:
+        """Report an invalid pattern, once per engine.
+
+        The loader disables rules with invalid patterns, so this only
+        fires for rules built in code.
+        """
+        if pattern not in self._invalid:
+            self._invalid.add(pattern)
+            print(f"Invalid regex pattern '{pattern}': {error}", file=sys.stderr)
+
+    def _retry_regex_nodes(self, nodes: List[ConditionNode], invalid: set, regions: List[FieldView],
+                           timed_out: Optional[Dict[int, str]]) -> set:
+        """Match nodes one by one after their combined scan ran over budget.
+
+        Each pattern gets its own budget, so only the slow ones are
+        reported in timed_out and the rest still match normally.
+
+        Returns:
+            Set of matching node ids
+        """
+        hits = set()
+        for node in nodes:
+            if node.id in invalid:
+                continue
+            try:
+                # A lone pattern already used up its budget in the combined scan
+                if len(nodes) == 1:
+                    raise RegexTimeout(node.pattern, self.regex_timeout)
+                if any(self._regex_match(node.pattern, region) for region in regions):
+                    hits.add(node.id)
+            except RegexTimeout:
+                if timed_out is not None:
+                    timed_out[node.id] = node.pattern
+        return hits
+
+    def _rule_matches(self, compiled: CompiledRule, index: int, tool_name: str,
+                      tool_input: Dict[str, Any], input_data: Dict[str, Any],
+                      results: Dict[int, Tuple[bool, int]], prescanned: set,
+                      views: Dict[str, Optional[FieldView]],
+                      profiler: Optional[RuleProfiler] = None,
+                      timed_out: Optional[Dict[int, str]] = None) -> bool:
+        """Check if a rule that applies to this tool matches input data.
+
+        Args:
+            compiled: Rule to evaluate
+            index: Position of rule in the evaluated list, for the profiler
+            results: Node id -> (matched, scanned) of checks already run
+                for this event; receives the checks run here
+            prescanned: Node ids settled by _scan_regex_conditions, which
+                already reported them to the profiler
+            views: Field views already extracted during this evaluation
+            profiler: Records condition timings if profiling is enabled
+            timed_out: Node id -> pattern of regex checks that ran over the
+                time budget; receives the ones that do so here
+
+        Returns:
+            True if rule matches, False otherwise
+
+        Raises:
+            RegexTimeout: if every other condition matches but a regex ran
+                over the time budget, so the result can't be known
+        """
+        if timed_out is None:
+            timed_out = {}
 
         # If no conditions, don't match
         # (Rules must have at least one condition to be valid)
-        if not rule.conditions:
+        if not compiled.nodes:
             return False
 
-        # All conditions must match
-        for condition in rule.conditions:
-            if not self._check_condition(condition, tool_name, tool_input, input_data):
+        # A check another rule already failed rules this out before anything runs
+        for node in compiled.nodes:
+            known = results.get(node.id)
+            if known is not None and not known[0]:
                 return False
 
-        return True
+        # All conditions must match; try the ones most likely to fail cheaply first.
+        # A check that ran over budget only matters if all the others match.
+        rule = compiled.rule
+        undecided = None
+        for j, condition in order_conditions(list(enumerate(rule.conditions)), self.stats):
+            node = compiled.nodes[j]
+            if node.id in timed_out:
+                undecided = timed_out[node.id]
+                continue
+            known = results.get(node.id)
+            elapsed = 0
+            if known is None:
+                start = time.perf_counter_ns() if profiler else 0
+                try:
+                    known = self._evaluate_node(node, tool_name, tool_input, input_data, views)
+                except RegexTimeout as e:
+                    undecided = timed_out[node.id] = e.pattern
+                    continue
+                results[node.id] = known
+                elapsed = time.perf_counter_ns() - start if profiler else 0
+                self.stats.record(condition, known[0])
+            if profiler and node.id not in prescanned:
+                profiler.condition(index, rule, j, condition, known[0], elapsed, known[1])
+            if not known[0]:
+                return False
 
-    def _matches_tool(self, matcher: str, tool_name: str) -> bool:
-        """Check if tool_name matches the matcher pattern.
+        if undecided is not None:
+            raise RegexTimeout(undecided, self.regex_timeout)
+        return True
 
-        Args:
-            matcher: Pattern like "Bash", "Edit|Write", "*"
-            tool_name: Actual tool name
+    def _evaluate_node(self, node: ConditionNode, tool_name: str, tool_input: Dict[str, Any],
+                       input_data: Dict[str, Any], views: Dict[str, Optional[FieldView]]) -> Tuple[bool, int]:
+        """Run one check and report how much text it looked at.
 
         Returns:
-            True if matches
+            (matched, scanned): scanned is the length of the text searched,
+            or the bytes read for a streamed transcript.
         """
-        if matcher == '*':
-            return True
+        # Transcripts can be huge: match them as a stream instead of reading them
+        if self._streams_transcript(node.field, tool_input, input_data):
+            return self._check_transcript_condition(node.condition, input_data['transcript_path'],
+                                                    input_data.get('session_id', ''))
 
-        # Split on | for OR matching
-        patterns = matcher.split('|')
-        return tool_name in patterns
+        # Extract the field value to check
+        view = self._field_view(node.field, tool_name, tool_input, input_data, views)
+        if view is None:
+            return False, 0
+        return self._test_node(node, view)
 
-    def _check_condition(self, condition: Condition, tool_name: str,
-                        tool_input: Dict[str, Any], input_data: Dict[str, Any] = None) -> bool:
-        """Check if a single condition matches.
+    def _test_node(self, node: ConditionNode, view: FieldView) -> Tuple[bool, int]:
+        """Apply a node's operator to a field view.
+
+        Searches look only at the parts of large fields the rule asks for.
+        """
+        if not node.searches:
+            return node.test(view), len(view)
+        regions = view.regions(*node.scope)
+        scanned = sum(map(len, regions))
+        if node.operator == 'regex_match':
+            return any(self._regex_match(node.pattern, region) for region in regions), scanned
+        return node.test(regions), scanned
+
+    def _too_large(self, compiled: CompiledRule, tool_name: str, tool_input: Dict[str, Any],
+                   input_data: Dict[str, Any], views: Dict[str, Optional[FieldView]]) -> bool:
+        """Check whether a field the rule reads exceeds its skip_larger_than limit."""
+        limit = compiled.rule.skip_larger_than
+        if limit is None:
+            return False
+        for field in compiled.fields:
+            if self._streams_transcript(field, tool_input, input_data):
+                continue
+            view = self._field_view(field, tool_name, tool_input, input_data, views)
+            if view is not None and len(view) > limit:
+                return True
+        return False
+
+    def _streams_transcript(self, field: str, tool_input: Dict[str, Any],
+                            input_data: Dict[str, Any] = None) -> bool:
+        """Check if field is a transcript that should be matched as a stream."""
+        return (field == 'transcript' and field not in tool_input
+                and bool(input_data) and bool(input_data.get('transcript_path')))
+
+    def _check_transcript_condition(self, condition: Condition, transcript_path: str,
+                                    session_id: str = '') -> Tuple[bool, int]:
+        """Check a condition against a transcript file in bounded memory.
+
+        Only bytes appended since the last evaluation in this session are
+        scanned (see scan_transcript_incremental).
 
         Args:
-            condition: Condition to check
-            tool_name: Tool being used
-            tool_input: Tool input dict
-            input_data: Full hook input data (for Stop events, etc.)
+            condition: Condition on the transcript field
+            transcript_path: Path to the session transcript
+            session_id: Session the transcript belongs to
 
         Returns:
-            True if condition matches
+            (matched, bytes scanned). Unreadable transcripts are treated
+            as empty, as when the whole file was read.
         """
-        # Extract the field value to check
-        field_value = self._extract_field(condition.field, tool_name, tool_input, input_data)
-        if field_value is None:
-            return False
-
-        # Apply operator
-        operator = condition.operator
-        pattern = condition.pattern
-
-        if operator == 'regex_match':
-            return self._regex_match(pattern, field_value)
-        elif operator == 'contains':
-            return pattern in field_value
-        elif operator == 'equals':
-            return pattern == field_value
-        elif operator == 'not_contains':
-            return pattern not in field_value
-        elif operator == 'starts_with':
-            return field_value.startswith(pattern)
-        elif operator == 'ends_with':
-            return field_value.endswith(pattern)
-        else:
-            # Unknown operator
-            return False
+        try:
+            # The budget applies to each window of the scan, not to the whole file
+            return scan_transcript_incremental(transcript_path, condition.operator, condition.pattern,
+                                               compile_regex, session_id, self.regex_timeout)
+        except RegexTimeout:
+            raise RegexTimeout(condition.pattern, self.regex_timeout) from None
+        except FileNotFoundError:
+            print(f"Warning: Transcript file not found: {transcript_path}", file=sys.stderr)
+        except PermissionError:
+            print(f"Warning: Permission denied reading transcript: {transcript_path}", file=sys.stderr)
+        except (IOError, OSError) as e:
+            print(f"Warning: Error reading transcript {transcript_path}: {e}", file=sys.stderr)
+        except UnicodeDecodeError as e:
+            print(f"Warning: Encoding error in transcript {transcript_path}: {e}", file=sys.stderr)
+        except re.error as e:
+            self._invalid_pattern(condition.pattern, e)
+            return False, 0
+        return self._test_node(ConditionNode(0, condition), FieldView.of(''))[0], 0
 
     def _extract_field(self, field: str, tool_name: str,
                       tool_input: Dict[str, Any], input_data: Dict[str, Any] = None) -> Optional[str]:
         """Extract field value from tool input or hook input data.
 
+        The transcript is never read here: conditions on it are matched
+        as a stream (see _check_transcript_condition).
+
         Args:
-            field: Field name like "command", "new_text", "file_path", "reason", "transcript"
+            field: Field name like "command", "new_text", "file_path", "reason"
             tool_name: Tool being used (may be empty for Stop events)
             tool_input: Tool input dict
             input_data: Full hook input (for accessing transcript_path, reason, etc.)
@@ -204,72 +762,65 @@ class RuleEngine:
             # Stop event specific fields
             if field == 'reason':
                 return input_data.get('reason', '')
-            elif field == 'transcript':
-                # Read transcript file if path provided
-                transcript_path = input_data.get('transcript_path')
-                if transcript_path:
-                    try:
-                        with open(transcript_path, 'r') as f:
-                            return f.read()
-                    except FileNotFoundError:
-                        print(f"Warning: Transcript file not found: {transcript_path}", file=sys.stderr)
-                        return ''
-                    except PermissionError:
-                        print(f"Warning: Permission denied reading transcript: {transcript_path}", file=sys.stderr)
-                        return ''
-                    except (IOError, OSError) as e:
-                        print(f"Warning: Error reading transcript {transcript_path}: {e}", file=sys.stderr)
-                        return ''
-                    except UnicodeDecodeError as e:
-                        print(f"Warning: Encoding error in transcript {transcript_path}: {e}", file=sys.stderr)
-                        return ''
             elif field == 'user_prompt':
                 # For UserPromptSubmit events
                 return input_data.get('user_prompt', '')
 
-        # Handle special cases by tool type
-        if tool_name == 'Bash':
-            if field == 'command':
-                return tool_input.get('command', '')
-
-        elif tool_name in ['Write', 'Edit']:
-            if field == 'content':
-                # Write uses 'content', Edit has 'new_string'
-                return tool_input.get('content') or tool_input.get('new_string', '')
-            elif field == 'new_text' or field == 'new_string':
-                return tool_input.get('new_string', '')
-            elif field == 'old_text' or field == 'old_string':
-                return tool_input.get('old_string', '')
-            elif field == 'file_path':
-                return tool_input.get('file_path', '')
-
-        elif tool_name == 'MultiEdit':
-            if field == 'file_path':
-                return tool_input.get('file_path', '')
-            elif field in ['new_text', 'content']:
-                # Concatenate all edits
-                edits = tool_input.get('edits', [])
-                return ' '.join(e.get('new_string', '') for e in edits)
+        # Values derived from tool_input, e.g. Edit content is its new_string
+        getter = field_getter(tool_name, field)
+        if getter is not None:
+            return getter(tool_input)
 
         return None
 
-    def _regex_match(self, pattern: str, text: str) -> bool:
+    def _field_view(self, field: str, tool_name: str, tool_input: Dict[str, Any],
+                    input_data: Dict[str, Any], views: Dict[str, Optional[FieldView]]) -> Optional[FieldView]:
+        """Get a view of a field's value, extracting it once per evaluation.
+
+        MultiEdit new_text / content is viewed as the list of new strings
+        rather than joined; everything else as returned by _extract_field.
+
+        Args:
+            views: Per-evaluation cache of field name -> view
+
+        Returns:
+            FieldView, or None if the field is not present
+        """
+        if field in views:
+            return views[field]
+        if tool_name == 'MultiEdit' and field in ('new_text', 'content') and field not in tool_input:
+            view = FieldView([e.get('new_string', '') for e in tool_input.get('edits', [])])
+        else:
+            value = self._extract_field(field, tool_name, tool_input, input_data)
+            view = None if value is None else FieldView.of(value)
+        views[field] = view
+        return view
+
+    def _regex_match(self, pattern: str, text) -> bool:
         """Check if pattern matches text using regex.
 
         Args:
             pattern: Regex pattern
-            text: Text to match against
+            text: Text or FieldView to match against
 
         Returns:
             True if pattern matches
+
+        Raises:
+            RegexTimeout: if the search ran over the time budget
         """
         try:
-            # Use cached compiled regex (LRU cache with max 128 patterns)
+            # Use cached compiled regex (LRU cache with max 1024 patterns)
             regex = compile_regex(pattern)
-            return bool(regex.search(text))
+            if isinstance(text, str):
+                text = FieldView.of(text)
+            with deadline(self.regex_timeout):
+                return text.search(regex)
 
+        except RegexTimeout:
+            raise RegexTimeout(pattern, self.regex_timeout) from None
         except re.error as e:
-            print(f"Invalid regex pattern '{pattern}': {e}", file=sys.stderr)
+            self._invalid_pattern(pattern, e)
             return False
 
 
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Event- and tool-indexed rule lookup for hookify plugin.
+
+Rules are bucketed by (event, tool) once when a ruleset is loaded, so an
+evaluation only visits rules that can apply to the current event and tool
+instead of filtering the whole ruleset every time.
+
+Bucket keys are "event|tool" strings so they can be stored as JSON object
+keys in the ruleset cache. A rule without a tool_matcher (or with "*")
+goes in the "*" tool bucket; rules with event "all" go in "all" buckets.
+
+This module has no imports so hook scripts can check for empty buckets
+before loading anything else.
+"""
+
+WILDCARD = '*'
+
+
+def bucket_keys(event: str, tool_matcher: str = None) -> list:
+    """Get the bucket keys a rule belongs to.
+
+    Args:
+        event: Rule event ("bash", "file", "all", etc.)
+        tool_matcher: Rule tool matcher like "Bash", "Edit|Write", "*"
+
+    Returns:
+        List of "event|tool" keys
+    """
+    if not tool_matcher or tool_matcher == WILDCARD:
+        tools = [WILDCARD]
+    else:
+        tools = tool_matcher.split('|')
+    return [f'{event}|{tool}' for tool in tools]
+
+
+def matching_keys(keys, event: str, tool_name: str) -> list:
+    """Select the bucket keys that apply to an event and tool.
+
+    Args:
+        keys: Bucket keys present in the ruleset
+        event: Rule event being evaluated, or None for every event
+        tool_name: Tool being used (empty for non-tool events), or None
+            to skip tool filtering
+
+    Returns:
+        List of applicable keys
+    """
+    selected = []
+    for key in keys:
+        key_event, key_tool = key.rsplit('|', 1)
+        if event and key_event != event and key_event != 'all':
+            continue
+        if tool_name is not None and key_tool != WILDCARD and key_tool != tool_name:
+            continue
+        selected.append(key)
+    return selected
+
+
+class RuleIndex:
+    """Rules bucketed by (event, tool), preserving load order on lookup."""
+
+    def __init__(self, rules: list, buckets: dict = None):
+        """Build the index.
+
+        Args:
+            rules: Rules in load order
+            buckets: Precomputed key -> rule positions (e.g. from the cache)
+        """
+        self.rules = list(rules)
+        if buckets is None:
+            buckets = {}
+            for i, rule in enumerate(self.rules):
+                for key in bucket_keys(rule.event, rule.tool_matcher):
+                    buckets.setdefault(key, []).append(i)
+        self.buckets = buckets
+
+    def positions(self, event: str, tool_name: str) -> list:
+        """Get the load-order positions of rules that can apply."""
+        found = set()
+        for key in matching_keys(self.buckets, event, tool_name):
+            found.update(self.buckets[key])
+        return sorted(found)
+
+    def lookup(self, event: str, tool_name: str) -> list:
+        """Get the rules that can apply to event and tool_name, in load order."""
+        return [self.rules[i] for i in self.positions(event, tool_name)]
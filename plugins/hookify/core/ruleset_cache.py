@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""On-disk cache of parsed hookify rulesets.
+
+Parsing every rule file on every hook event is wasted work when nothing
+changed. This module stores the parsed ruleset under the user cache dir
+in two layers:
+
+- rulesets/<sha256>.json: the parsed rules, content-addressed by the
+  bytes and project-relative paths of the rule files, so worktrees of
+  the same repo with identical rule files share one entry.
+- projects/<hash>.json: per project directory, the stat fingerprint
+  (path, mtime, size, inode) of every rule file and the ruleset it
+  produced. A hit needs only stat calls; no rule file is opened.
+
+Rules are stored with their (event, tool) buckets from rule_index, so
+loading for one event only rebuilds the rules for that event and "all".
+Next to the project index, a plain-text summary lists the non-empty
+buckets, which lets hook scripts skip evaluation entirely (see
+fastpath.may_have_rules) before importing the rule engine.
+
+Set HOOKIFY_CACHE=0 to disable the cache.
+"""
+
+import os
+import hashlib
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple
+
+from hookify.core.fastpath import project_root, write_summary
+from hookify.core.rule_index import RuleIndex
+from hookify.utils.cache_files import (
+    cache_dir, project_key, read_json, write_json_atomic
+)
+
+if TYPE_CHECKING:
+    # For annotations only; config_loader imports this module in turn
+    from hookify.core.config_loader import Rule
+
+# Bump when the cached format or parsing semantics change
+CACHE_VERSION = 7
+
+
+def _project_index_path() -> str:
+    """Get the per-project index file for the current directory."""
+    return os.path.join(cache_dir(), 'projects', f'{project_key()}.json')
+
+
+def _ruleset_path(content_hash: str) -> str:
+    """Get the content-addressed ruleset file for content_hash."""
+    return os.path.join(cache_dir(), 'rulesets', f'{content_hash}.json')
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    """Read a cache file, treating any failure as a miss."""
+    return read_json(path, CACHE_VERSION)
+
+
+def _rule_to_dict(rule: 'Rule') -> Dict[str, Any]:
+    """Serialize a Rule for the cache."""
+    return {
+        'name': rule.name,
+        'enabled': rule.enabled,
+        'event': rule.event,
+        'pattern': rule.pattern,
+        'conditions': [[c.field, c.operator, c.pattern] for c in rule.conditions],
+        'action': rule.action,
+        'tool_matcher': rule.tool_matcher,
+        'message': rule.message,
+        'limits': [rule.scan_first, rule.scan_last, rule.skip_larger_than],
+    }
+
+
+def _rule_from_dict(data: Dict[str, Any]) -> 'Rule':
+    """Rebuild a Rule from its cached form without re-parsing frontmatter."""
+    from hookify.core.config_loader import Rule, Condition
+
+    conditions = [Condition(field=f, operator=o, pattern=p) for f, o, p in data['conditions']]
+    scan_first, scan_last, skip_larger_than = data['limits']
+    return Rule(
+        name=data['name'],
+        enabled=data['enabled'],
+        event=data['event'],
+        pattern=data['pattern'],
+        conditions=conditions,
+        action=data['action'],
+        tool_matcher=data['tool_matcher'],
+        message=data['message'],
+        scan_first=scan_first,
+        scan_last=scan_last,
+        skip_larger_than=skip_larger_than,
+    )
+
+
+def _select(ruleset: Dict[str, Any], event: Optional[str],
+            tool_name: Optional[str]) -> List['Rule']:
+    """Rebuild the rules that apply to event and tool_name from a cached ruleset."""
+    rules = ruleset['rules']
+    index = RuleIndex(rules, ruleset['buckets'])
+    return [_rule_from_dict(rules[i]) for i in index.positions(event, tool_name)]
+
+
+def load_cached(fingerprint: Tuple, event: Optional[str],
+                tool_name: Optional[str] = None) -> Optional[List['Rule']]:
+    """Get enabled rules for event from the cache using only stat calls.
+
+    Args:
+        fingerprint: Current rule_fingerprint() of the project's rule files
+        event: Optional event filter, as for load_rules
+        tool_name: Optional tool filter, as for load_rules
+
+    Returns:
+        List of Rule objects, or None on a cache miss.
+    """
+    index = _read_json(_project_index_path())
+    if not index or tuple(tuple(e) for e in index.get('fingerprint', [])) != fingerprint:
+        return None
+
+    ruleset = _read_json(_ruleset_path(index.get('ruleset', '')))
+    if not ruleset:
+        return None
+
+    try:
+        return _select(ruleset, event, tool_name)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def _source_label(file_path: str, root: str) -> str:
+    """Name a rule file by its path inside the project, or absolute outside it."""
+    path = os.path.abspath(file_path)
+    if path.startswith(root.rstrip(os.sep) + os.sep):
+        return os.path.relpath(path, root)
+    return path
+
+
+def content_hash(files: List[str]) -> str:
+    """Hash rule file locations and contents into a worktree-independent key.
+
+    Files are hashed in precedence order, so the same files layered
+    differently give a different key.
+    """
+    root = project_root()
+    digest = hashlib.sha256(f'hookify-ruleset-v{CACHE_VERSION}'.encode('utf-8'))
+    for file_path in files:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        digest.update(b'\0' + _source_label(file_path, root).encode('utf-8') + b'\0')
+        digest.update(str(len(data)).encode('ascii') + b'\0' + data)
+    return digest.hexdigest()
+
+
+def load_shared(files: List[str], fingerprint: Tuple, event: Optional[str],
+                tool_name: Optional[str] = None) -> Optional[List['Rule']]:
+    """Get rules from a ruleset another worktree already parsed.
+
+    Reads the rule files to hash them but skips parsing. On a hit the
+    project index is updated so the next lookup is stat-only.
+
+    Returns:
+        List of Rule objects, or None on a cache miss.
+    """
+    key = content_hash(files)
+    ruleset = _read_json(_ruleset_path(key))
+    if not ruleset:
+        return None
+
+    try:
+        rules = _select(ruleset, event, tool_name)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+    _write_index(fingerprint, key, ruleset['buckets'])
+    return rules
+
+
+def _write_index(fingerprint: Tuple, key: str, buckets: Dict[str, List[int]]) -> None:
+    """Point the project index at ruleset key for fingerprint."""
+    write_json_atomic(_project_index_path(), {
+        'version': CACHE_VERSION,
+        'fingerprint': [list(e) for e in fingerprint],
+        'ruleset': key,
+    })
+    write_summary(fingerprint, buckets)
+
+
+def store(files: List[str], fingerprint: Tuple, rules: List['Rule']) -> None:
+    """Cache the enabled rules parsed from files.
+
+    Args:
+        files: Rule file paths the rules were parsed from
+        fingerprint: rule_fingerprint() taken before the files were read,
+            so a file edited mid-parse makes the entry miss instead of
+            going stale
+        rules: All enabled rules, in load order, before event filtering
+    """
+    buckets = RuleIndex(rules).buckets
+
+    key = content_hash(files)
+    write_json_atomic(_ruleset_path(key), {
+        'version': CACHE_VERSION,
+        'rules': [_rule_to_dict(rule) for rule in rules],
+        'buckets': buckets,
+    })
+    _write_index(fingerprint, key, buckets)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Condition results shared between a tool call's PreToolUse and PostToolUse.
+
+Both hooks of a tool call load the same bash or file rules and match
+them against the same tool_input. PreToolUse stores the result of every
+check it ran on a tool_input field; PostToolUse for the same call starts
+from those results and only runs the checks they don't cover, such as
+ones on the transcript, which has grown in between.
+
+Entries are keyed by session and tool_use_id (or, without one, by the
+fingerprint below) and hold:
+
+- a fingerprint of the tool name and the tool_input fields the rules
+  read, so a call whose input was changed in between (for example by
+  another hook) is evaluated from scratch;
+- (field, operator, pattern, scan_first, scan_last, matched) for each
+  check, the same key the evaluation plan shares checks by.
+
+PostToolUse removes the entry it reads. Entries of calls that never got
+a PostToolUse (denied, or the session ended) expire after TTL_SECONDS.
+Like the decision cache, entries are small JSON files in the user cache
+dir and HOOKIFY_CACHE=0 disables them.
+"""
+
+import os
+import time
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from hookify.core.decision_cache import decision_key
+from hookify.matchers.payload import FieldView
+from hookify.utils.cache_files import cache_enabled, cache_dir, project_key, read_json, write_json_atomic
+
+# Bump when the entry format or matching semantics change
+TOOL_USE_VERSION = 2
+
+# Longer than a tool call can take: Bash commands time out after 10 minutes
+TTL_SECONDS = 20 * 60
+
+
+def input_fingerprint(tool_name: str, values: List[Tuple[str, Optional[FieldView]]]) -> str:
+    """Hash a tool name and the (field, view) pairs read from its input."""
+    # Same hashing as decision keys, with no ruleset or event: the
+    # results stay valid across both hook events
+    return decision_key('', '', tool_name, values)
+
+
+class ToolUseCache:
+    """Short-lived on-disk store of check results, one entry per tool call."""
+
+    def __init__(self, directory: str, ttl: float = TTL_SECONDS):
+        """Initialize tool use cache.
+
+        Args:
+            directory: Directory holding one file per entry
+            ttl: Seconds after which an unread entry is removed
+        """
+        self.directory = directory
+        self.ttl = ttl
+
+    @classmethod
+    def for_project(cls) -> Optional['ToolUseCache']:
+        """Get the store for the current project, or None if caching is off."""
+        if not cache_enabled():
+            return None
+        return cls(os.path.join(cache_dir(), 'tooluse', project_key()))
+
+    def _path(self, session_id: str, call_key: str) -> str:
+        name = hashlib.blake2b(f'{session_id}\0{call_key}'.encode('utf-8', 'surrogatepass'),
+                               digest_size=16).hexdigest()
+        return os.path.join(self.directory, f'{name}.json')
+
+    def put(self, session_id: str, call_key: str, fingerprint: str,
+            results: List[Tuple[Any, ...]]) -> None:
+        """Store the check results of a PreToolUse evaluation.
+
+        Args:
+            session_id: Session the tool call belongs to
+            call_key: tool_use_id, or the fingerprint if there is none
+            fingerprint: input_fingerprint of the evaluated input
+            results: (field, operator, pattern, scan_first, scan_last, matched) tuples
+        """
+        path = self._path(session_id, call_key)
+        try:
+            write_json_atomic(path, {'version': TOOL_USE_VERSION, 'fingerprint': fingerprint,
+                                     'results': results})
+            # Names are uniformly distributed: sweep on 1 in 16 writes
+            if os.path.basename(path)[0] == '0':
+                self._expire()
+        except (IOError, OSError):
+            pass  # A lost entry only costs a re-evaluation
+
+    def take(self, session_id: str, call_key: str, fingerprint: str) -> Optional[Dict[tuple, bool]]:
+        """Remove and return the results stored for a tool call.
+
+        Returns:
+            (field, operator, pattern, scan_first, scan_last) -> matched,
+            or None if there is no fresh entry for this exact input.
+        """
+        path = self._path(session_id, call_key)
+        data = read_json(path, TOOL_USE_VERSION)
+        if data is None:
+            return None
+        try:
+            fresh = time.time() - os.stat(path).st_mtime < self.ttl
+            os.unlink(path)
+        except OSError:
+            return None  # Taken by a concurrent hook, or just expired
+        if not fresh or data.get('fingerprint') != fingerprint or not isinstance(data.get('results'), list):
+            return None
+        try:
+            return {tuple(entry[:5]): bool(entry[5]) for entry in data['results']}
+        except (TypeError, IndexError):
+            return None
+
+    def _expire(self) -> None:
+        """Remove entries older than the TTL."""
+        cutoff = time.time() - self.ttl
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                try:
+                    if entry.name.endswith('.json') and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except OSError:
+                    continue
+
+
+# For testing
+if __name__ == '__main__':
+    import tempfile
+
+    cache = ToolUseCache(tempfile.mkdtemp())
+    fingerprint = input_fingerprint('Bash', [('command', FieldView.of('rm -rf /tmp/x'))])
+    cache.put('session', 'toolu_1', fingerprint, [('command', 'regex_match', r'rm\s+-rf', None, None, True)])
+    print("Other input:", cache.take('session', 'toolu_1', 'different'))
+    cache.put('session', 'toolu_1', fingerprint, [('command', 'regex_match', r'rm\s+-rf', None, None, True)])
+    print("Same input:", cache.take('session', 'toolu_1', fingerprint))
+    print("Taken once:", cache.take('session', 'toolu_1', fingerprint))
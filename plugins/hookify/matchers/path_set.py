@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Indexed path matching for glob and path_prefix conditions in hookify plugin.
+
+Path rules written as regexes (\\.env$|credentials|secrets) are searched
+one by one, and a policy naming hundreds of vendored or generated
+directories becomes one huge alternation. The glob and path_prefix
+operators take path patterns instead, and PathSet indexes all of them
+for a field, so a path is matched against every pattern in time
+proportional to its depth rather than to the number of patterns:
+
+- path_prefix patterns, globs ending in /** and globs without wildcards
+  go into tries of path segments, walked once along the path.
+- File name globs of the form *.ext go into a map from extension to
+  patterns, looked up for each dotted suffix of the file name, and
+  file name globs without wildcards into a map of names.
+- Other globs are translated to anchored regexes and matched together
+  with a RegexSet, grouped by what they match against.
+
+Pattern semantics follow .gitignore where they can:
+
+- A glob without a slash matches the file name at any depth: *.pem,
+  .env, id_rsa*. So does one starting with **/ and no other slash.
+- A glob with a slash matches the whole path relative to the project
+  root, or the absolute path if it starts with / or ~. * and ? don't
+  match /, ** matches any number of directories, and a trailing /
+  means everything below: vendor/ is vendor/**.
+- path_prefix matches the path itself and everything below it, by whole
+  segments: vendor matches vendor/x.js but not vendors/x.js. Relative
+  prefixes are relative to the project root.
+
+Matching is case-sensitive. A path outside the project only matches
+absolute patterns and file name globs.
+"""
+
+import os
+import posixpath
+import re
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+from hookify.matchers.regex_set import RegexSet
+
+# Operators whose patterns PathSet indexes
+PATH_OPERATORS = ('glob', 'path_prefix')
+
+_WILDCARDS = re.compile(r'[*?\[]')
+
+# Trie node entry modes: the pattern matches the path at its node, below
+# it, or both
+_EXACT, _BELOW, _PREFIX = 'exact', 'below', 'prefix'
+
+# Key under which a trie node keeps its entries; never a path segment
+_ENTRIES = ''
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a path glob to an anchored regex.
+
+    * and ? match within one segment, **/ any number of leading
+    directories, /** everything below, and other ** any text. Character
+    classes work as in fnmatch; an unclosed [ is a literal.
+    """
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**', i):
+            if pattern.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+            else:
+                parts.append('.*')
+                i += 2
+            continue
+        if c == '*':
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2 if pattern[i + 1:i + 2] in ('!', ']') else i + 1)
+            if end < 0:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                elif body.startswith('^'):
+                    body = '\\' + body
+                parts.append(f'[{body}]')
+                i = end
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return r'\A(?:' + ''.join(parts) + r')\Z'
+
+
+def _segments(path: str) -> List[str]:
+    """Split a normalized path into segments; '.' and '/' have none."""
+    return [segment for segment in path.split('/') if segment and segment != '.']
+
+
+class PathSet:
+    """A set of keyed glob and path_prefix patterns matched against a path at once."""
+
+    def __init__(self, entries: Iterable[Tuple[Hashable, str, str]]):
+        """Index entries.
+
+        Args:
+            entries: (key, operator, pattern) triples, operator one of
+                PATH_OPERATORS; several keys may share a pattern
+        """
+        # Segment tries for relative and absolute patterns
+        self._relative: Dict[str, dict] = {}
+        self._absolute: Dict[str, dict] = {}
+        # File name -> keys, extension -> keys
+        self._names: Dict[str, List[Hashable]] = {}
+        self._extensions: Dict[str, List[Hashable]] = {}
+        # Regexes for other globs, by what they match
+        name_globs, relative_globs, absolute_globs = [], [], []
+
+        for key, operator, pattern in entries:
+            if not pattern:
+                continue
+            if pattern.startswith('~'):
+                pattern = os.path.expanduser(pattern)
+            if operator == 'path_prefix':
+                self._insert(pattern, key, _PREFIX)
+                continue
+            if pattern.endswith('/'):
+                pattern += '**'
+            if pattern.startswith('**/') and '/' not in pattern[3:] and '**' not in pattern[3:]:
+                pattern = pattern[3:]
+            if '/' not in pattern:
+                if not _WILDCARDS.search(pattern):
+                    self._names.setdefault(pattern, []).append(key)
+                elif pattern.startswith('*.') and not _WILDCARDS.search(pattern[2:]):
+                    self._extensions.setdefault(pattern[2:], []).append(key)
+                else:
+                    name_globs.append((key, translate_glob(pattern)))
+                continue
+            absolute = pattern.startswith('/')
+            body = pattern[1:] if absolute else pattern
+            while body.startswith('./'):
+                body = body[2:]
+            if not _WILDCARDS.search(body):
+                self._insert(pattern, key, _EXACT)
+            elif body.endswith('/**') and not _WILDCARDS.search(body[:-3]):
+                self._insert(pattern[:-3], key, _BELOW)
+            else:
+                (absolute_globs if absolute else relative_globs).append((key, translate_glob(body)))
+
+        self._name_globs = RegexSet(name_globs, 0) if name_globs else None
+        self._relative_globs = RegexSet(relative_globs, 0) if relative_globs else None
+        self._absolute_globs = RegexSet(absolute_globs, 0) if absolute_globs else None
+
+    def _insert(self, pattern: str, key: Hashable, mode: str) -> None:
+        """Add a literal path pattern to the trie it belongs in."""
+        node = self._absolute if pattern.startswith('/') else self._relative
+        for segment in _segments(posixpath.normpath(pattern)):
+            node = node.setdefault(segment, {})
+        node.setdefault(_ENTRIES, []).append((key, mode))
+
+    @staticmethod
+    def _walk(trie: Dict[str, dict], segments: List[str], found: Set[Hashable]) -> None:
+        """Collect the keys of trie entries matching a path's segments."""
+        node = trie
+        depth = len(segments)
+        for k in range(depth + 1):
+            for key, mode in node.get(_ENTRIES, ()):
+                if mode == _PREFIX or (mode == _BELOW) == (k < depth):
+                    found.add(key)
+            if k == depth:
+                return
+            node = node.get(segments[k])
+            if node is None:
+                return
+
+    def match(self, path: str, root: str) -> Set[Hashable]:
+        """Get the keys of all entries matching a path.
+
+        Args:
+            path: File path, absolute or relative to root
+            root: Project root relative patterns are resolved against
+
+        Returns:
+            Set of matching keys.
+        """
+        if not path:
+            return set()
+        absolute = posixpath.normpath(path if path.startswith('/') else posixpath.join(root, path))
+        base = posixpath.normpath(root).rstrip('/')
+        if absolute == base:
+            relative = ''
+        elif absolute.startswith(base + '/'):
+            relative = absolute[len(base) + 1:]
+        else:
+            relative = None
+        absolute_segments = _segments(absolute)
+        name = absolute_segments[-1] if absolute_segments else ''
+
+        found: Set[Hashable] = set()
+        self._walk(self._absolute, absolute_segments, found)
+        if relative is not None:
+            self._walk(self._relative, _segments(relative), found)
+        found.update(self._names.get(name, ()))
+        if self._extensions:
+            dot = name.find('.')
+            while dot >= 0:
+                found.update(self._extensions.get(name[dot + 1:], ()))
+                dot = name.find('.', dot + 1)
+        if self._name_globs is not None:
+            found |= self._name_globs.match(name)
+        if self._relative_globs is not None and relative is not None:
+            found |= self._relative_globs.match(relative)
+        if self._absolute_globs is not None:
+            found |= self._absolute_globs.match(absolute.lstrip('/'))
+        return found
+
+
+@lru_cache(maxsize=256)
+def _single(operator: str, pattern: str) -> PathSet:
+    return PathSet([(0, operator, pattern)])
+
+
+def path_matches(operator: str, pattern: str, path: str, root: str) -> bool:
+    """Check one glob or path_prefix pattern against a path.
+
+    Args:
+        operator: "glob" or "path_prefix"
+        pattern: Path pattern
+        path: File path, absolute or relative to root
+        root: Project root
+
+    Returns:
+        True if the pattern matches.
+    """
+    return bool(_single(operator, pattern).match(path, root))
+
+
+# For testing
+if __name__ == '__main__':
+    paths = PathSet([
+        ('vendor', 'path_prefix', 'vendor'),
+        ('ssh', 'path_prefix', '~/.ssh'),
+        ('pem', 'glob', '*.pem'),
+        ('env', 'glob', '.env'),
+        ('env-any', 'glob', '.env.*'),
+        ('generated', 'glob', 'src/generated/**'),
+        ('lockfile', 'glob', 'package-lock.json'),
+        ('tests', 'glob', 'src/**/test_*.py'),
+        ('etc', 'glob', '/etc/*.conf'),
+    ])
+    root = '/work/repo'
+    for path in ['/work/repo/vendor/lib/a.js', '/work/repo/vendors/a.js', 'certs/server.pem',
+                 '/work/repo/.env.local', '/work/repo/src/generated/api.ts', '/work/repo/src/generated',
+                 '/work/repo/src/app/tests/test_api.py', '/etc/nginx.conf', '/etc/nginx/site.conf',
+                 os.path.expanduser('~/.ssh/id_rsa'), '/work/repo/web/package-lock.json']:
+        print(f'{path:45} {sorted(paths.match(path, root))}')
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""Copy-free views of large hook payload fields for hookify plugin.
+
+A MultiEdit's new_text is the new_string of every edit joined with
+spaces, and a Write's content can be many MB. Building that string for
+every condition that reads it, and scanning all of it for every rule,
+makes an event cost payload size times rule count. FieldView keeps a
+field as the list of its segments and applies operators to it directly:
+
+- A single-segment field (Write content, a command) is searched in
+  place. A field of several segments up to CHUNK_SIZE characters is
+  joined once per evaluation and shared by every rule.
+- Larger multi-segment fields are never joined. starts_with, ends_with
+  and equals compare segment by segment; contains / not_contains scan
+  CHUNK_SIZE parts, carrying enough characters across each boundary
+  to give the same results as the joined text.
+- regex_match on them searches overlapping windows like a transcript
+  (see matchers.transcript): a match that spans a window edge is found
+  as long as it is shorter than OVERLAP characters.
+
+regions() applies a rule's scan_first / scan_last limits, giving the
+head and tail of a large field as separate views that are searched
+independently. lower() gives the lowercased view that case-folded
+regexes search (see regex_set.fold_pattern).
+"""
+
+import re
+from typing import Iterator, List, Optional, Set, Tuple
+
+from hookify.matchers.regex_set import RegexSet, search_window
+from hookify.matchers.transcript import CHUNK_SIZE, OVERLAP
+
+
+class FieldView:
+    """A field value made of segments joined by a separator."""
+
+    __slots__ = ('segments', 'separator', 'size', '_text', '_batches', '_digest')
+
+    def __init__(self, segments: List[str], separator: str = ' '):
+        """Create a view.
+
+        Args:
+            segments: Parts of the value, e.g. one per MultiEdit edit
+            separator: Text between segments in the joined value
+        """
+        self.segments = segments
+        self.separator = separator
+        self.size = sum(map(len, segments)) + len(separator) * max(0, len(segments) - 1)
+        self._text = segments[0] if len(segments) == 1 else (None if segments else '')
+        self._batches = None
+        self._digest = None
+
+    @classmethod
+    def of(cls, value: str) -> 'FieldView':
+        """View a plain string."""
+        return cls([value])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def text(self) -> str:
+        """Get the joined value, building it at most once."""
+        if self._text is None:
+            self._text = self.separator.join(self.segments)
+        return self._text
+
+    def digest(self) -> bytes:
+        """Hash the joined value, computing it at most once."""
+        if self._digest is None:
+            import hashlib
+
+            digest = hashlib.blake2b(digest_size=20)
+            for i, segment in enumerate(self.segments):
+                if i:
+                    digest.update(self.separator.encode('utf-8', 'surrogatepass'))
+                digest.update(segment.encode('utf-8', 'surrogatepass'))
+            self._digest = digest.digest()
+        return self._digest
+
+    def isascii(self) -> bool:
+        """Check whether the value is pure ASCII."""
+        return self.separator.isascii() and all(segment.isascii() for segment in self.segments)
+
+    def lower(self) -> 'FieldView':
+        """Get a view of the lowercased value, segment by segment.
+
+        Only ASCII values keep their length when lowercased, so offsets
+        (and scan limits) carry over only when isascii() is True.
+        """
+        view = FieldView([segment.lower() for segment in self.segments], self.separator.lower())
+        if self._text is not None and view._text is None:
+            view._text = self._text.lower()
+        return view
+
+    def _pieces(self) -> Iterator[str]:
+        """Yield the non-empty pieces of the joined value in order."""
+        for i, segment in enumerate(self.segments):
+            if i and self.separator:
+                yield self.separator
+            if segment:
+                yield segment
+
+    def head(self, n: int) -> str:
+        """Get the first n characters."""
+        if self._text is not None:
+            return self._text[:n]
+        parts, size = [], 0
+        for piece in self._pieces():
+            if size >= n:
+                break
+            parts.append(piece[:n - size])
+            size += len(parts[-1])
+        return ''.join(parts)
+
+    def tail(self, n: int) -> str:
+        """Get the last n characters."""
+        if n <= 0:
+            return ''
+        if self._text is not None:
+            return self._text[-n:]
+        parts, size = [], 0
+        pieces = list(self._pieces())
+        for piece in reversed(pieces):
+            if size >= n:
+                break
+            parts.append(piece[-(n - size):])
+            size += len(parts[-1])
+        return ''.join(reversed(parts))
+
+    def startswith(self, prefix: str) -> bool:
+        """Check whether the value starts with prefix."""
+        return self.head(len(prefix)) == prefix
+
+    def endswith(self, suffix: str) -> bool:
+        """Check whether the value ends with suffix."""
+        return self.tail(len(suffix)) == suffix
+
+    def _joinable(self) -> bool:
+        """Check whether the value is small enough to join for searching."""
+        return self._text is not None or self.size <= CHUNK_SIZE
+
+    def equals(self, other: str) -> bool:
+        """Check whether the value equals other."""
+        if self.size != len(other):
+            return False
+        if self._joinable():
+            return self.text() == other
+        offset = 0
+        for piece in self._pieces():
+            if not other.startswith(piece, offset):
+                return False
+            offset += len(piece)
+        return True
+
+    def contains(self, needle: str) -> bool:
+        """Check whether needle occurs in the value, including across segments."""
+        if self._joinable():
+            return needle in self.text()
+        keep = len(needle) - 1
+        tail = ''
+        for chunk in self._chunks():
+            # Occurrences starting in tail end within keep chars of chunk
+            if needle in chunk or (keep and needle in tail + chunk[:keep]):
+                return True
+            tail = chunk[-keep:] if len(chunk) >= keep else (tail + chunk)[-keep:]
+        return not needle
+
+    def _plan(self) -> List[Tuple[int, int]]:
+        """Group segments into (start, end) batches of about CHUNK_SIZE characters.
+
+        A segment longer than CHUNK_SIZE gets a batch of its own.
+        """
+        if self._batches is None:
+            batches, first, size = [], 0, 0
+            for i, segment in enumerate(self.segments):
+                if len(segment) > CHUNK_SIZE:
+                    if first < i:
+                        batches.append((first, i))
+                    batches.append((i, i + 1))
+                    first, size = i + 1, 0
+                    continue
+                size += len(segment) + len(self.separator)
+                if size >= CHUNK_SIZE:
+                    batches.append((first, i + 1))
+                    first, size = i + 1, 0
+            if first < len(self.segments):
+                batches.append((first, len(self.segments)))
+            self._batches = batches
+        return self._batches
+
+    def _chunks(self) -> Iterator[str]:
+        """Yield the joined value in parts of at most about 2 * CHUNK_SIZE characters."""
+        count = len(self.segments)
+        for first, end in self._plan():
+            segment = self.segments[first]
+            if end - first == 1 and len(segment) > CHUNK_SIZE:
+                for i in range(0, len(segment), CHUNK_SIZE):
+                    yield segment[i:i + CHUNK_SIZE]
+                if end < count and self.separator:
+                    yield self.separator
+            else:
+                # A trailing '' makes join end with the separator without another copy
+                yield self.separator.join(self.segments[first:end] + [''] if end < count else self.segments[first:end])
+
+    def _windows(self) -> Iterator[Tuple[str, int, Optional[int]]]:
+        """Yield overlapping (window, start, limit) triples covering the value.
+
+        Matches must start at or after start and end by limit (None in
+        the last window). As in scan_regex, each window keeps one
+        character of context before its owned region and two after it,
+        so anchors and lookarounds see real neighbours.
+        """
+        carry, start = '', 0
+        chunks = self._chunks()
+        chunk = next(chunks, '')
+        while True:
+            following = next(chunks, None)
+            window = carry + chunk
+            if following is None:
+                yield window, start, None
+                return
+            limit = len(window) - 2
+            yield window, start, limit
+            owned = max(start, limit - OVERLAP)
+            cut = max(0, owned - 1)
+            carry, start = window[cut:], owned - cut
+            chunk = following
+
+    def search(self, regex: re.Pattern) -> bool:
+        """Check whether regex matches anywhere in the value."""
+        if self._joinable():
+            return bool(regex.search(self.text()))
+        return any(search_window(regex, window, start, limit)
+                   for window, start, limit in self._windows())
+
+    def match_set(self, regex_set: RegexSet) -> Set:
+        """Get the keys of all regex_set entries that match the value."""
+        if self._joinable():
+            return regex_set.match(self.text())
+        found = set()
+        for window, start, limit in self._windows():
+            found |= regex_set.match_indices(window, start, limit)
+            if len(found) == len(regex_set.patterns):
+                break
+        return {key for i in found for key in regex_set.keys[i]}
+
+    def regions(self, first: Optional[int] = None, last: Optional[int] = None) -> List['FieldView']:
+        """Limit the value to its first and/or last characters.
+
+        Args:
+            first: Keep this many leading characters (None: no head limit)
+            last: Keep this many trailing characters (None: no tail limit)
+
+        Returns:
+            [self] if no limit applies or the value fits within the limits,
+            else views of the head and tail, to be searched separately.
+        """
+        if (first is None and last is None) or self.size <= (first or 0) + (last or 0):
+            return [self]
+        regions = []
+        if first:
+            regions.append(FieldView.of(self.head(first)))
+        if last:
+            regions.append(FieldView.of(self.tail(last)))
+        return regions
+
+
+# For testing
+if __name__ == '__main__':
+    view = FieldView(['def foo():', 'return 1', '', 'console.log(x)'])
+    print("Contains across edits:", view.contains('foo(): return'), view.contains('1  console'))
+    print("Regex:", view.search(re.compile(r'return\s+1\s+console')))
+    print("Ends with:", view.endswith('log(x)'), "Head:", repr(view.head(12)))
+    print("Regions:", [v.text() for v in view.regions(first=3, last=4)])
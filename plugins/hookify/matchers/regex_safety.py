@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""Protection against catastrophic regex backtracking for hookify plugin.
+
+Python's re backtracks, so a pattern like (a+)+$ can take exponential
+time on a few dozen characters. Run against a multi-MB Write or a
+transcript, it stalls the agent until the hook times out, and the rule
+is then silently skipped. This module defends in two layers:
+
+- At load time, check_pattern() finds nested quantifiers whose inner
+  repetition can split the same text many ways. The simplest shape,
+  (X+)+ and friends, is rewritten to the equivalent (?:X)+. Any other
+  shape is rejected so the rule is never run.
+- At run time, deadline() bounds each regex search with a wall-clock
+  budget (HOOKIFY_REGEX_TIMEOUT seconds, default 1, 0 disables). A
+  search over budget raises RegexTimeout. When every other condition of
+  the rule matches, so the regex would decide it, the engine applies
+  HOOKIFY_REGEX_TIMEOUT_POLICY: allow (skip the rule, the default),
+  warn (skip it and say so) or block (deny the operation).
+
+re exposes no step counter, so the budget is time only. The deadline
+uses SIGALRM, so it is enforced in the main thread of processes on
+platforms that have it. The hook scripts and the daemon both evaluate
+rules there.
+"""
+
+import os
+import re
+import signal
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Seconds each regex search may take
+DEFAULT_TIMEOUT = 1.0
+
+# What to do when a rule's regex runs over budget
+POLICIES = ('allow', 'warn', 'block')
+DEFAULT_POLICY = 'allow'
+
+# Outer repeats allowing more iterations than this count as unbounded
+_MAX_SAFE_REPEATS = 10
+
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+
+# (X+)+, (X*)*, (?:X+)* ... where X is one character, escape or class
+_SIMPLE_NESTED = re.compile(
+    r'(?<!\\)\((?:\?:)?((?:\\.|\[\^?\]?(?:\\.|[^\]\\])*\]|[^()\[\]\\|*+?{}^$]))([+*])\)([+*])(?![?+])'
+)
+_GROUP_REFERENCE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+
+class RegexTimeout(Exception):
+    """A regex search ran past its time budget."""
+
+    def __init__(self, pattern: str = '', seconds: float = 0.0):
+        super().__init__(f"regex '{pattern}' exceeded the {seconds:g}s time budget")
+        self.pattern = pattern
+        self.seconds = seconds
+
+
+def regex_timeout() -> float:
+    """Get the per-search time budget in seconds (0 disables it)."""
+    try:
+        return max(0.0, float(os.environ.get('HOOKIFY_REGEX_TIMEOUT', DEFAULT_TIMEOUT)))
+    except ValueError:
+        return DEFAULT_TIMEOUT
+
+
+def timeout_policy() -> str:
+    """Get what to do when a regex runs over budget: allow, warn or block."""
+    policy = os.environ.get('HOOKIFY_REGEX_TIMEOUT_POLICY', DEFAULT_POLICY).strip().lower()
+    return policy if policy in POLICIES else DEFAULT_POLICY
+
+
+def _raise_timeout(signum, frame):
+    raise RegexTimeout()
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Raise RegexTimeout in the block if it runs longer than seconds.
+
+    A no-op when seconds is 0, outside the main thread, or without
+    SIGALRM. Deadlines must not be nested.
+    """
+    if seconds <= 0 or not hasattr(signal, 'setitimer'):
+        yield
+        return
+    try:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    except ValueError:
+        # Signal handlers can only be installed from the main thread
+        yield
+        return
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _nullable(item) -> bool:
+    """Check whether a parsed regex item can match the empty string."""
+    op, av = item
+    if op in _REPEATS or op == getattr(sre_parse, 'POSSESSIVE_REPEAT', None):
+        return av[0] == 0 or all(_nullable(i) for i in av[2])
+    if op == sre_parse.SUBPATTERN:
+        return all(_nullable(i) for i in av[-1])
+    if op == sre_parse.BRANCH:
+        return any(all(_nullable(i) for i in branch) for branch in av[1])
+    return op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT)
+
+
+def _wide(items) -> bool:
+    """Check whether parsed items match a broad class like . or \\w."""
+    for op, av in items:
+        if op in (sre_parse.ANY, sre_parse.NOT_LITERAL):
+            return True
+        if op == sre_parse.IN and any(o in (sre_parse.CATEGORY, sre_parse.NEGATE) for o, _ in av):
+            return True
+    return False
+
+
+def _splits(body) -> bool:
+    """Check whether a repeated body can split the same text many ways.
+
+    True when every required element of the body is a variable-length
+    repetition and, if there are several, they can match the same
+    characters: (a+)+, (\\w+\\s?)*, (x+x+)+ or (\\w+\\d+)+. A mandatory
+    delimiter, as in (\\w+\\.)+, or disjoint repetitions, as in
+    ([a-z]+[0-9]+)+, pin each iteration down.
+    """
+    items = list(body)
+    while len(items) == 1 and items[0][0] == sre_parse.SUBPATTERN:
+        items = list(items[0][1][-1])
+    if len(items) == 1 and items[0][0] == sre_parse.BRANCH:
+        return any(_splits(branch) for branch in items[0][1][1])
+
+    required = [item for item in items if not _nullable(item)]
+    if not required:
+        return any(op in _REPEATS and av[0] != av[1] for op, av in items)
+    if not all(op in _REPEATS and av[0] != av[1] for op, av in required):
+        return False
+    bodies = [list(av[2]) for _, av in required]
+    return all(b == bodies[0] for b in bodies) or any(map(_wide, bodies))
+
+
+def _find_nested(items) -> bool:
+    """Check parsed regex items for a dangerous nested quantifier."""
+    for op, av in items:
+        if op in _REPEATS:
+            if av[1] > _MAX_SAFE_REPEATS and _splits(av[2]):
+                return True
+            if _find_nested(av[2]):
+                return True
+        elif op == sre_parse.SUBPATTERN:
+            if _find_nested(av[-1]):
+                return True
+        elif op == sre_parse.BRANCH:
+            if any(_find_nested(branch) for branch in av[1]):
+                return True
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if _find_nested(av[1]):
+                return True
+        elif op == sre_parse.GROUPREF_EXISTS:
+            if _find_nested(av[1]) or (av[2] and _find_nested(av[2])):
+                return True
+        # Atomic groups and possessive repeats never backtrack into their body
+    return False
+
+
+def find_catastrophic(pattern: str) -> Optional[str]:
+    """Describe why pattern can backtrack catastrophically, or return None.
+
+    Invalid patterns return None; compiling them reports the error.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError):
+        return None
+    if _find_nested(parsed):
+        return 'has a nested quantifier such as (a+)+ that can backtrack exponentially'
+    return None
+
+
+def _whitespace(items) -> bool:
+    """Check whether parsed items are just \\s, whose runs are short in practice."""
+    return len(items) == 1 and items[0][0] == sre_parse.IN and \
+        items[0][1] == [(sre_parse.CATEGORY, sre_parse.CATEGORY_SPACE)]
+
+
+def _count_wide_repeats(items) -> int:
+    count = 0
+    for op, av in items:
+        if op in _REPEATS or op == getattr(sre_parse, 'POSSESSIVE_REPEAT', None):
+            body = list(av[2])
+            if av[1] == sre_parse.MAXREPEAT and _wide(body) and not _whitespace(body):
+                count += 1
+            count += _count_wide_repeats(body)
+        elif op == sre_parse.SUBPATTERN:
+            count += _count_wide_repeats(av[-1])
+        elif op == sre_parse.BRANCH:
+            count += max(_count_wide_repeats(branch) for branch in av[1])
+    return count
+
+
+def wide_repeats(pattern: str) -> int:
+    """Count unbounded repeats of broad classes, like .* or \\w+, in a pattern.
+
+    One is harmless. Each further one multiplies the positions a failing
+    search retries (.*foo.*bar is quadratic in the line length), so
+    patterns with several are slow on large fields even when
+    find_catastrophic accepts them. Repeats of \\s alone don't count,
+    and invalid patterns count 0.
+    """
+    try:
+        return _count_wide_repeats(sre_parse.parse(pattern))
+    except (re.error, RecursionError):
+        return 0
+
+
+def _rewrite(m: re.Match) -> str:
+    atom, inner, outer = m.groups()
+    return f'(?:{atom}){"+" if inner == outer == "+" else "*"}'
+
+
+def check_pattern(pattern: str) -> Tuple[str, Optional[str]]:
+    """Make a pattern safe to run, if possible.
+
+    Args:
+        pattern: Regex pattern from a rule
+
+    Returns:
+        (pattern, problem): the pattern to use, which differs from the
+        input if it was rewritten, and a description of the remaining
+        problem if it must be rejected (else None).
+    """
+    problem = find_catastrophic(pattern)
+    if not problem:
+        return pattern, None
+
+    # (X+)+ matches exactly what X+ does; rules only test whether a
+    # pattern matches, so dropping the group is safe without backrefs
+    if not _GROUP_REFERENCE.search(pattern):
+        rewritten = _SIMPLE_NESTED.sub(_rewrite, pattern)
+        if rewritten != pattern and not find_catastrophic(rewritten):
+            return rewritten, None
+
+    return pattern, problem
+
+
+# For testing
+if __name__ == '__main__':
+    import time
+
+    for p in [r'(a+)+$', r'(\w+\s?)+$', r'(\w+\.)+com', r'([a-z]*)*x', r'(?>a+)+',
+              r'rm\s+-rf', r'(x+x+)+y', r'([a-z]+[0-9]+)+', r'((ab)+)+c']:
+        print(f'{p!r:20} -> {check_pattern(p)}')
+    print('Wide repeats:', [wide_repeats(p) for p in (r'rm\s+-rf', r'.*foo.*bar', r'(\w+)=(\S+)')])
+
+    start = time.time()
+    try:
+        with deadline(0.2):
+            re.search(r'(a+)+$', 'a' * 40 + 'b')
+    except RegexTimeout:
+        print(f'Timed out after {time.time() - start:.2f}s')
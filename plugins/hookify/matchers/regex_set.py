@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Multi-pattern regex matching for hookify plugin.
+
+Checking each regex_match condition separately scans the same field once
+per rule. RegexSet merges every pattern for a field into one alternation
+of named groups and finds all matching patterns with a staged union:
+
+1. Search the union of all patterns. The leftmost match tells us which
+   pattern hit first, and that no pattern matches before that position.
+2. Drop the pattern that hit and search the union of the rest, starting
+   from the same position, until nothing else matches.
+
+The common no-match case is a single pass over the text, and every later
+stage only scans from the last hit onwards. Results are identical to
+running each pattern's search() on its own.
+"""
+
+import re
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# Patterns with these constructs can't be embedded in a larger alternation
+# without changing meaning (group references, named group clashes,
+# conditionals, global inline flags), so they are searched on their own.
+_UNMERGEABLE = re.compile(r'\(\?P|\(\?[aiLmsux]+\)|\(\?\(|\\[1-9]|\\g<')
+
+# Bound on distinct stage unions cached per RegexSet
+_MAX_UNIONS = 64
+
+# Retries per window for matches that run past its limit
+_MAX_DEFERRED = 8
+
+
+# Escapes fold_pattern keeps: their meaning doesn't depend on letter case
+_FOLD_SAFE_ESCAPES = frozenset('bdswntrfva')
+
+# Group openers that neither set flags nor name the group
+_PLAIN_GROUPS = ('(?:', '(?=', '(?!', '(?<=', '(?<!')
+
+# Characters with special meaning outside a character class
+_METACHARS = frozenset('.^$*+?{}[]|()\\')
+
+# Prefilter literal sets must have literals at least this long, and at
+# most this many alternatives, to be worth checking before the regex
+_MIN_LITERAL = 2
+_MAX_ALTERNATIVES = 16
+
+
+def fold_pattern(pattern: str) -> Optional[str]:
+    """Rewrite a pattern so it can run case-sensitively on lowercased text.
+
+    On ASCII text, searching text.lower() for the result finds the same
+    matches as searching text for pattern with re.IGNORECASE, but the
+    regex engine can use its fast literal scans, which IGNORECASE turns
+    off.
+
+    Returns:
+        The lowercased pattern, or None if lowercasing could change its
+        meaning: non-ASCII patterns, escapes other than escaped
+        punctuation and the lowercase b d s w n t r f v a escapes (so no
+        uppercase classes, hex or octal escapes or back references),
+        inline flags and named groups, and character class ranges other
+        than lowercase, uppercase or digit runs.
+    """
+    if not pattern.isascii():
+        return None
+    folded = []
+    i, n = 0, len(pattern)
+    class_start = None
+    while i < n:
+        c = pattern[i]
+        if c == '\\':
+            escaped = pattern[i + 1:i + 2]
+            if not escaped or (escaped.isalnum() and escaped not in _FOLD_SAFE_ESCAPES):
+                return None
+            folded.append(c + escaped)
+            i += 2
+            continue
+        if class_start is not None:
+            if c == ']' and i > class_start:
+                class_start = None
+            elif c == '-' and i > class_start and pattern[i + 1:i + 2] not in ('', ']'):
+                low, high = pattern[i - 1], pattern[i + 1]
+                if pattern[i - 2:i - 1] == '\\' or not (
+                        (low.isdigit() and high.isdigit())
+                        or (low.isalpha() and high.isalpha() and low.islower() == high.islower())):
+                    return None
+        elif c == '[':
+            # A ] right after [ or [^ is a literal
+            class_start = i + 2 if pattern[i + 1:i + 2] == '^' else i + 1
+        elif c == '(' and pattern.startswith('(?', i) and not pattern.startswith(_PLAIN_GROUPS, i):
+            return None
+        folded.append(c.lower())
+        i += 1
+    return ''.join(folded)
+
+
+def literal_start(pattern: str) -> str:
+    """Get the literal character every match of pattern's first branch starts with.
+
+    The regex engine scans ahead for a pattern's leading literals instead
+    of trying a match at every position. With re.IGNORECASE it does so
+    only for characters without case, so a pattern starting with a
+    letter gains the most from fold_pattern. Only the plain cases are
+    recognized: optional leading groups, then a literal or escaped
+    punctuation that isn't optional.
+
+    Returns:
+        The character, or '' if the pattern doesn't start with one.
+    """
+    i = 0
+    while pattern.startswith('(', i):
+        i += 3 if pattern.startswith('(?:', i) else 1
+    c = pattern[i:i + 1]
+    if c == '\\':
+        c = pattern[i + 1:i + 2]
+        if not c or c.isalnum():
+            return ''
+        i += 1
+    elif c in _METACHARS:
+        return ''
+    return '' if pattern[i + 1:i + 2] in ('*', '?', '{') else c
+
+
+def _literal_sets(items) -> Tuple[List[FrozenSet[str]], Optional[str]]:
+    """Find literal sets required by a parsed pattern sequence.
+
+    Returns:
+        (sets, whole): every match contains at least one literal of each
+        set, lowercased; whole is the lowercased text of the sequence if
+        it is a fixed string, else None.
+    """
+    sets, run, fixed = [], [], True
+
+    def end_run():
+        if run:
+            sets.append(frozenset((''.join(run),)))
+            run.clear()
+
+    for op, av in items:
+        if op is sre_parse.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        if op is sre_parse.SUBPATTERN:
+            inner, whole = _literal_sets(av[-1])
+            if whole is not None:
+                # A group of plain text continues the surrounding text
+                run.append(whole)
+                continue
+            fixed = False
+            end_run()
+            sets += inner
+            continue
+        fixed = False
+        if op is sre_parse.BRANCH:
+            end_run()
+            alternatives = set()
+            for branch in av[1]:
+                inner, whole = _literal_sets(branch)
+                best = [whole] if whole is not None else _best(inner)
+                if not best:
+                    alternatives = None
+                    break
+                alternatives.update(best)
+            if alternatives:
+                sets.append(frozenset(alternatives))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            end_run()
+            inner, whole = _literal_sets(av[2])
+            sets += [frozenset((whole,))] if whole else inner
+        else:
+            # Anything else (classes, anchors, lookarounds, optional parts)
+            # separates the literal text around it
+            end_run()
+    whole = ''.join(run) if fixed else None
+    end_run()
+    return sets, whole
+
+
+def _best(sets: List[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+    """Pick the most selective set: the longest shortest literal, then the fewest alternatives."""
+    usable = [s for s in sets if s and min(map(len, s)) >= _MIN_LITERAL and len(s) <= _MAX_ALTERNATIVES]
+    if not usable:
+        return None
+    return max(usable, key=lambda s: (min(map(len, s)), -len(s)))
+
+
+def required_literals(pattern: str) -> Optional[FrozenSet[str]]:
+    """Get lowercased literals at least one of which is in any text pattern matches.
+
+    For ASCII text, if none of the literals occurs in text.lower(), the
+    pattern can't match text even with re.IGNORECASE, so the regex
+    doesn't need to run. `rm\\s+-rf` gives {'-rf'}, `(eval|exec)\\(`
+    gives {'val', 'xec'} (the parser factors out the shared e).
+
+    Returns:
+        Set of ASCII literals, or None if the pattern has no usable
+        required text (or doesn't compile).
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError, OverflowError):
+        return None
+    sets, whole = _literal_sets(parsed.data)
+    if whole is not None:
+        return frozenset((whole,)) if len(whole) >= _MIN_LITERAL else None
+    return _best(sets)
+
+
+def search_window(regex: re.Pattern, text: str, start: int = 0, limit: int = None) -> bool:
+    """Check for a match starting at or after start that ends by limit.
+
+    Windowed scans (see matchers.payload) pass the end of the region a
+    window owns as limit; matches running past it are left to the next
+    window, which overlaps this one. None means text ends for real.
+    """
+    pos = start
+    for _ in range(_MAX_DEFERRED):
+        m = regex.search(text, pos)
+        if not m or (limit is not None and m.start() >= limit):
+            return False
+        if limit is None or m.end() <= limit:
+            return True
+        pos = m.start() + 1
+    return False
+
+
+class RegexSet:
+    """A set of keyed regex patterns matched against text in one scan."""
+
+    def __init__(self, entries: Iterable[Tuple[Hashable, str]], flags: int = re.IGNORECASE):
+        """Compile entries into a combined matcher.
+
+        Args:
+            entries: (key, pattern) pairs; several keys may share a pattern
+            flags: Regex flags applied to every pattern
+        """
+        self.flags = flags
+        self.patterns: List[str] = []
+        self.keys: List[List[Hashable]] = []
+        self.errors: Dict[str, re.error] = {}
+        self._compiled: List[re.Pattern] = []
+        self._singles: List[Tuple[int, re.Pattern]] = []
+
+        index_by_pattern = {}
+        for key, pattern in entries:
+            if pattern in self.errors:
+                continue
+            if pattern not in index_by_pattern:
+                try:
+                    compiled = re.compile(pattern, flags)
+                except re.error as e:
+                    self.errors[pattern] = e
+                    continue
+                index_by_pattern[pattern] = len(self.patterns)
+                self.patterns.append(pattern)
+                self._compiled.append(compiled)
+                self.keys.append([])
+                if _UNMERGEABLE.search(pattern):
+                    self._singles.append((index_by_pattern[pattern], compiled))
+            self.keys[index_by_pattern[pattern]].append(key)
+
+        singles = {i for i, _ in self._singles}
+        self._merged: Tuple[int, ...] = tuple(i for i in range(len(self.patterns)) if i not in singles)
+        self._unions: Dict[Tuple[int, ...], re.Pattern] = {}
+
+    def _union(self, indices: Tuple[int, ...]) -> re.Pattern:
+        """Get the compiled alternation of the patterns at indices."""
+        union = self._unions.get(indices)
+        if union is None:
+            if len(self._unions) >= _MAX_UNIONS:
+                self._unions.clear()
+            union = re.compile(
+                '|'.join(f'(?P<_{i}>{self.patterns[i]})' for i in indices),
+                self.flags
+            )
+            self._unions[indices] = union
+        return union
+
+    def match_indices(self, text: str, start: int = 0, limit: int = None) -> Set[int]:
+        """Get the indices of all patterns that match somewhere in text.
+
+        Args:
+            text: Text to search
+            start: Only count matches starting here or later
+            limit: Only count matches ending by this position (see
+                search_window); None for the whole text
+        """
+        found = set()
+        deferred = []
+
+        remaining = self._merged
+        pos = start
+        while remaining:
+            m = self._union(remaining).search(text, pos)
+            if not m or (limit is not None and m.start() >= limit):
+                break
+            hit = int(m.lastgroup[1:])
+            if limit is None or m.end() <= limit:
+                found.add(hit)
+            else:
+                deferred.append((hit, m.start() + 1))
+            remaining = tuple(i for i in remaining if i != hit)
+            pos = m.start()
+
+        # A match running past the limit may hide a shorter one after it
+        for i, pos in deferred:
+            if search_window(self._compiled[i], text, pos, limit):
+                found.add(i)
+
+        for i, compiled in self._singles:
+            if search_window(compiled, text, start, limit):
+                found.add(i)
+
+        return found
+
+    def match(self, text: str) -> Set[Hashable]:
+        """Get the keys of all entries whose pattern matches somewhere in text."""
+        return {key for i in self.match_indices(text) for key in self.keys[i]}
+
+
+# For testing
+if __name__ == '__main__':
+    regex_set = RegexSet([
+        ('rm', r'rm\s+-rf'),
+        ('sudo', r'^sudo\b'),
+        ('rm-again', r'rm\s+-rf'),
+        ('backref', r'(\w+) \1'),
+        ('broken', r'('),
+    ])
+    print("Errors:", regex_set.errors)
+    print("Match:", regex_set.match('sudo rm -rf /tmp/x x'))
+    print("Anchored:", regex_set.match('echo sudo rm -rf'))
+    print("Literal start:", [literal_start(p) for p in (r'(rm|del)\s', r'\.env$', r'\bfoo', r'a?b')])
+    print("Literals:", [sorted(required_literals(p) or ()) for p in (r'rm\s+-rf', r'(eval|exec)\(', r'\.env$', r'a.b')])
+    print("Folded:", fold_pattern(r'API_KEY\s*=\s*[A-Z0-9]+'), fold_pattern(r'\S+'), fold_pattern(r'[0-z]'))
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Streaming transcript matching for hookify plugin.
+
+Session transcripts can grow to hundreds of MB. Instead of reading the
+whole file into one string per condition, these helpers scan it in
+fixed-size chunks so peak memory is bounded by CHUNK_SIZE + OVERLAP no
+matter how large the transcript is.
+
+- contains / not_contains search raw UTF-8 bytes and stop at the first
+  hit (a substring of valid UTF-8 text is found at the same place in
+  its encoding).
+- regex_match decodes chunks incrementally and searches overlapping
+  windows. A match is reported only once the window has context on both
+  sides of it, so anchors and lookarounds behave as on the full text.
+  A match that spans a chunk boundary is found as long as it is shorter
+  than OVERLAP characters.
+- equals / starts_with / ends_with read only the bytes they compare.
+
+Transcripts are append-only JSONL and Stop hooks fire many times per
+session, so scan_transcript_incremental keeps a checkpoint per
+transcript and condition: the byte offset scanned so far and the result
+("already seen pytest"). Later evaluations scan only the appended bytes,
+plus the overlap window for regexes.
+
+The regex time budget (see regex_safety) applies to each window search,
+not to the whole scan, so a large transcript isn't cut off just for
+being large. When a window runs over budget, the checkpoint keeps the
+offset reached so far and the next evaluation resumes from there.
+"""
+
+import os
+import codecs
+import hashlib
+import re
+from typing import Optional, Tuple
+
+from hookify.matchers.regex_safety import RegexTimeout, deadline
+from hookify.utils.cache_files import cache_enabled, cache_dir, read_json, write_json_atomic
+
+# Bytes read per chunk
+CHUNK_SIZE = 1024 * 1024
+
+# Characters of the previous window carried into the next one
+OVERLAP = 64 * 1024
+
+# Retries per window for matches that run into the next window
+_MAX_DEFERRED = 8
+
+# Resume offset meaning a scan result is settled for good
+FINAL = -1
+
+# Bump when the checkpoint format changes
+CHECKPOINT_VERSION = 1
+
+
+class ScanTimeout(RegexTimeout):
+    """A window search ran over budget; resume is where a later scan may pick up."""
+
+    def __init__(self, resume: int):
+        super().__init__()
+        self.resume = resume
+
+
+def _iter_chunks(path: str, offset: int = 0, chunk_size: int = None):
+    """Yield the file's bytes chunk by chunk, starting at byte offset."""
+    with open(path, 'rb') as f:
+        if offset:
+            f.seek(offset)
+        while True:
+            data = f.read(chunk_size or CHUNK_SIZE)
+            if not data:
+                return
+            yield data
+
+
+def scan_contains(path: str, needle: str, offset: int = 0) -> Tuple[bool, int]:
+    """Search for needle from byte offset, stopping at the first hit.
+
+    Returns:
+        (found, resume): resume is the byte offset a later scan of the
+        grown file must start from, or FINAL if found (appending to the
+        file can't undo a substring hit).
+    """
+    needle_bytes = needle.encode('utf-8')
+    if not needle_bytes:
+        return True, FINAL
+
+    keep = len(needle_bytes) - 1
+    tail = b''
+    end = offset
+    for data in _iter_chunks(path, offset):
+        end += len(data)
+        buf = tail + data
+        if needle_bytes in buf:
+            return True, FINAL
+        tail = buf[-keep:] if keep else b''
+    return False, end - len(tail)
+
+
+def stream_contains(path: str, needle: str) -> bool:
+    """Check whether the file contains needle, stopping at the first hit."""
+    return scan_contains(path, needle)[0]
+
+
+def scan_regex(path: str, regex: re.Pattern, offset: int = 0, timeout: float = 0) -> Tuple[bool, int]:
+    """Search regex from byte offset in bounded memory.
+
+    Args:
+        path: File to scan
+        regex: Compiled pattern
+        offset: Byte offset of a character boundary to start from. When
+            non-zero, the character there is context only: it is visible to
+            lookbehinds and ^ but no match may start on it.
+        timeout: Seconds each window search may take (0 for no limit)
+
+    Returns:
+        (found, resume): resume is the byte offset a later scan of the
+        grown file must start from, or FINAL when the result can't change
+        by appending (a hit with at least OVERLAP characters after it).
+
+    Raises:
+        ScanTimeout: if a window search ran over timeout
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    carry = ''
+    start = 1 if offset else 0
+    end = offset
+    chunks = _iter_chunks(path, offset)
+
+    while True:
+        # Where a scan resuming before this window starts: the carried
+        # text, which begins with its context character if it has one
+        resume = end - len(decoder.getstate()[0]) - len(carry.encode('utf-8'))
+        data = next(chunks, None)
+        final = data is None
+        window = carry + decoder.decode(data or b'', final=final)
+        end += len(data or b'')
+
+        if final:
+            m = _search(regex, window, start, timeout, resume)
+            if m and m.end() <= len(window) - OVERLAP:
+                return True, FINAL
+            # Rescan the tail, including a hit near the end that more text
+            # could still invalidate (e.g. one that matched $)
+            owned = max(start, len(window) - OVERLAP)
+            if m:
+                owned = min(owned, m.start())
+            cut = max(0, owned - 1)
+            return bool(m), end - len(window[cut:].encode('utf-8'))
+
+        # Keep two characters after the owned region so $ can't match at
+        # an artificial end of text; matches reaching into them are
+        # deferred to the next window, which starts OVERLAP chars back.
+        limit = len(window) - 2
+        pos = start
+        for _ in range(_MAX_DEFERRED):
+            m = _search(regex, window, pos, timeout, resume)
+            if not m or m.start() >= limit:
+                break
+            if m.end() <= limit:
+                return True, FINAL
+            pos = m.start() + 1
+
+        # Carry the last OVERLAP owned characters plus one character of
+        # context before them, so lookbehinds and ^ see the real preceding
+        # character without a match starting on it
+        owned = max(start, limit - OVERLAP)
+        cut = max(0, owned - 1)
+        carry = window[cut:]
+        start = owned - cut
+
+
+def _search(regex: re.Pattern, window: str, pos: int, timeout: float, resume: int) -> Optional[re.Match]:
+    """Search one window within the time budget."""
+    try:
+        with deadline(timeout):
+            return regex.search(window, pos)
+    except RegexTimeout:
+        raise ScanTimeout(resume) from None
+
+
+def stream_regex_search(path: str, regex: re.Pattern, timeout: float = 0) -> bool:
+    """Check whether regex matches anywhere in the file, in bounded memory."""
+    return scan_regex(path, regex, 0, timeout)[0]
+
+
+def stream_equals(path: str, pattern: str) -> bool:
+    """Check whether the whole file equals pattern."""
+    pattern_bytes = pattern.encode('utf-8')
+    if os.path.getsize(path) != len(pattern_bytes):
+        return False
+    with open(path, 'rb') as f:
+        return f.read() == pattern_bytes
+
+
+def stream_starts_with(path: str, pattern: str) -> bool:
+    """Check whether the file starts with pattern."""
+    pattern_bytes = pattern.encode('utf-8')
+    with open(path, 'rb') as f:
+        return f.read(len(pattern_bytes)) == pattern_bytes
+
+
+def stream_ends_with(path: str, pattern: str) -> bool:
+    """Check whether the file ends with pattern."""
+    pattern_bytes = pattern.encode('utf-8')
+    if not pattern_bytes:
+        return True
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() < len(pattern_bytes):
+            return False
+        f.seek(-len(pattern_bytes), os.SEEK_END)
+        return f.read() == pattern_bytes
+
+
+def match_transcript(path: str, operator: str, pattern: str, compile_regex, timeout: float = 0) -> bool:
+    """Apply a condition operator to a transcript file without loading it.
+
+    Args:
+        path: Transcript file path
+        operator: Condition operator ("regex_match", "contains", etc.)
+        pattern: Condition pattern
+        compile_regex: Function compiling a pattern string to a regex
+        timeout: Seconds each regex window search may take (0 for no limit)
+
+    Returns:
+        True if the condition matches
+
+    Raises:
+        OSError, UnicodeDecodeError, re.error, ScanTimeout: propagated
+        to the caller
+    """
+    if operator == 'regex_match':
+        return stream_regex_search(path, compile_regex(pattern), timeout)
+    elif operator == 'contains':
+        return stream_contains(path, pattern)
+    elif operator == 'not_contains':
+        return not stream_contains(path, pattern)
+    elif operator == 'equals':
+        return stream_equals(path, pattern)
+    elif operator == 'starts_with':
+        return stream_starts_with(path, pattern)
+    elif operator == 'ends_with':
+        return stream_ends_with(path, pattern)
+    else:
+        # Unknown operator
+        return False
+
+
+def _checkpoint_path(path: str, session_id: str) -> str:
+    """Get the checkpoint file for a session's transcript."""
+    key = f'{session_id}\0{os.path.realpath(path)}'
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir(), 'transcripts', f'{digest}.json')
+
+
+def _save_checkpoint(checkpoint_path: str, state: dict) -> None:
+    try:
+        write_json_atomic(checkpoint_path, state)
+    except (IOError, OSError):
+        pass  # Checkpoints are an optimization; rescan next time
+
+
+def scan_transcript_incremental(path: str, operator: str, pattern: str, compile_regex,
+                                session_id: str = '', timeout: float = 0) -> Tuple[bool, int]:
+    """Apply a condition operator to a transcript, scanning only new bytes.
+
+    regex_match, contains and not_contains resume from the checkpoint
+    left by the previous evaluation of the same condition. Other
+    operators, and all operators when caches are disabled, fall back to
+    match_transcript. A transcript that shrank or was replaced (new
+    inode) starts over from byte 0. A regex window search that runs over
+    timeout saves the offset reached before raising, so the next call
+    resumes from that window instead of from the start.
+
+    Args:
+        path: Transcript file path
+        operator: Condition operator
+        pattern: Condition pattern
+        compile_regex: Function compiling a pattern string to a regex
+        session_id: Session the transcript belongs to
+        timeout: Seconds each regex window search may take (0 for no limit)
+
+    Returns:
+        (matched, scanned): scanned is an estimate of the bytes read,
+        0 when the checkpoint already settled the result.
+
+    Raises:
+        ScanTimeout: if a regex window search ran over timeout
+    """
+    if operator not in ('regex_match', 'contains', 'not_contains') or not cache_enabled():
+        matched = match_transcript(path, operator, pattern, compile_regex, timeout)
+        if operator in ('equals', 'starts_with', 'ends_with'):
+            return matched, len(pattern.encode('utf-8'))
+        return matched, os.path.getsize(path)
+
+    st = os.stat(path)
+    checkpoint_path = _checkpoint_path(path, session_id)
+    state = read_json(checkpoint_path, CHECKPOINT_VERSION)
+    if not state or state.get('inode') != st.st_ino or state.get('size', 0) > st.st_size:
+        state = {'version': CHECKPOINT_VERSION, 'inode': st.st_ino, 'conditions': {}}
+
+    # contains and not_contains share one scan
+    kind = 'regex_match' if operator == 'regex_match' else 'contains'
+    key = f'{kind}:{pattern}'
+    resume, found, scanned_size = state['conditions'].get(key, (0, False, -1))
+
+    scanned = 0
+    if resume != FINAL and scanned_size != st.st_size:
+        scanned = st.st_size - resume
+        try:
+            if kind == 'regex_match':
+                found, resume = scan_regex(path, compile_regex(pattern), resume, timeout)
+            else:
+                found, resume = scan_contains(path, pattern, resume)
+        except ScanTimeout as e:
+            # Nothing found before the slow window; resume there next time.
+            # Size -1 so the next call scans even if the file didn't grow.
+            state['size'] = st.st_size
+            state['conditions'][key] = [e.resume, False, -1]
+            _save_checkpoint(checkpoint_path, state)
+            raise
+
+        state['size'] = st.st_size
+        state['conditions'][key] = [resume, found, st.st_size]
+        _save_checkpoint(checkpoint_path, state)
+
+    return (not found if operator == 'not_contains' else found), scanned
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Command line tools for hookify plugin.
+
+Usage:
+    python3 cli.py stats [--top N] [--json] [--clear] [--project DIR]
+    python3 cli.py replay [--rules PATH ...] [--baseline PATH ...] [--jobs N]
+                          [--examples N] [--json] [SOURCE ...]
+    python3 cli.py lint [--cost] [--json] [PATH ...]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# Add the plugins dir to the path so the hookify package imports
+PLUGIN_ROOT = os.environ.get('CLAUDE_PLUGIN_ROOT') or os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))
+PARENT_DIR = os.path.dirname(PLUGIN_ROOT)
+if PARENT_DIR not in sys.path:
+    sys.path.insert(0, PARENT_DIR)
+
+
+def cmd_stats(args) -> int:
+    """Print a ranked report of rule timings from the profile log."""
+    from hookify.core.profiling import format_report, profile_path, read_profile, summarize
+
+    path = profile_path(args.project)
+    if args.clear:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        print(f"Cleared {path}")
+        return 0
+
+    try:
+        summary = summarize(read_profile(path))
+    except FileNotFoundError:
+        summary = summarize([])
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_report(summary, args.top))
+        print(f"\nProfile log: {path}")
+    return 0
+
+
+def cmd_replay(args) -> int:
+    """Evaluate rulesets over recorded sessions and report what would fire."""
+    from hookify.core.replay import find_sources, format_report, load_ruleset, replay, session_dir
+
+    sources = find_sources(args.sources or [session_dir()])
+    if not sources:
+        print(f"No transcripts found in {', '.join(args.sources or [session_dir()])}", file=sys.stderr)
+        return 1
+
+    if args.rules:
+        rulesets = [load_ruleset(args.baseline), load_ruleset(args.rules)]
+        labels = ['baseline' if args.baseline else 'current', 'candidate']
+    else:
+        rulesets = [load_ruleset(args.baseline)]
+        labels = ['baseline' if args.baseline else 'current']
+
+    summary = replay(sources, rulesets, labels, args.jobs, args.examples)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_report(summary))
+    return 0
+
+
+def cmd_lint(args) -> int:
+    """Check rules for problems and estimate what evaluating each one costs."""
+    from dataclasses import asdict
+    from hookify.core.lint import expand_paths, format_report, lint_sources
+
+    findings, costs = lint_sources(expand_paths(args.paths) if args.paths else None)
+    if args.json:
+        print(json.dumps({'findings': [asdict(f) for f in findings],
+                          'costs': [asdict(c) for c in costs]}, indent=2))
+    else:
+        print(format_report(findings, costs, args.cost))
+    return 1 if any(f.severity == 'error' for f in findings) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='hookify')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    stats = subparsers.add_parser('stats', help='rank rules by evaluation time and matches')
+    stats.add_argument('--top', type=int, default=10, help='rows per table (default 10)')
+    stats.add_argument('--json', action='store_true', help='print aggregated totals as JSON')
+    stats.add_argument('--clear', action='store_true', help='delete the collected profile data')
+    stats.add_argument('--project', help='project directory (default: current directory)')
+    stats.set_defaults(func=cmd_stats)
+
+    replay = subparsers.add_parser('replay', help='evaluate rulesets over recorded sessions')
+    replay.add_argument('sources', nargs='*',
+                        help='transcript or hook input JSONL files, or directories of them '
+                             "(default: this project's transcripts)")
+    replay.add_argument('--rules', nargs='+', metavar='PATH',
+                        help='candidate rule files, bundles or rule directories, lowest precedence first')
+    replay.add_argument('--baseline', nargs='+', metavar='PATH',
+                        help='ruleset to compare against (default: the current rules)')
+    replay.add_argument('--jobs', type=int, help='worker processes (default: one per CPU)')
+    replay.add_argument('--examples', type=int, default=10, help='decision changes to show (default 10)')
+    replay.add_argument('--json', action='store_true', help='print the summary as JSON')
+    replay.set_defaults(func=cmd_replay)
+
+    lint = subparsers.add_parser('lint', help='find rules that never match, duplicates and costly patterns')
+    lint.add_argument('paths', nargs='*', metavar='PATH',
+                      help='rule files, bundles or rule directories, lowest precedence first '
+                           '(default: the current rules)')
+    lint.add_argument('--cost', action='store_true', help='add the estimated cost of each rule')
+    lint.add_argument('--json', action='store_true', help='print findings and costs as JSON')
+    lint.set_defaults(func=cmd_lint)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Helpers for hookify's on-disk caches and state files.
+
+Everything lives under the user cache dir so it can be deleted at any
+time. Reads treat any failure as a miss, and writes go through a temp
+file and os.replace so concurrent hook processes never observe a
+partially written file.
+
+Set HOOKIFY_CACHE=0 to disable all on-disk caches.
+
+Hook scripts import this module before they know whether any rule
+applies, so it imports only os at module level.
+"""
+
+import os
+
+
+def cache_enabled() -> bool:
+    """Check whether on-disk caches are enabled."""
+    return os.environ.get('HOOKIFY_CACHE', '1') != '0'
+
+
+def cache_dir() -> str:
+    """Get the hookify directory under the user cache dir."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'hookify')
+
+
+def short_hash(text: str) -> str:
+    """Get a short stable hash of text for use in file names."""
+    try:
+        # The builtin module skips loading OpenSSL through hashlib
+        from _sha1 import sha1
+    except ImportError:
+        from hashlib import sha1
+
+    return sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def project_key(project_dir: str = None) -> str:
+    """Get a short stable key for a project directory (default: the cwd)."""
+    return short_hash(os.path.realpath(project_dir or os.getcwd()))
+
+
+def read_json(path: str, version: int) -> dict:
+    """Read a cache file, treating any failure or version mismatch as a miss.
+
+    Args:
+        path: Cache file path
+        version: Expected value of the file's "version" key
+
+    Returns:
+        Parsed dict, or None on a miss.
+    """
+    import json
+
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != version:
+        return None
+    return data
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Write text to path via temp file and rename so readers never see partial files."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # One writer per process at a time, so the pid makes the name unique
+    # without importing tempfile
+    tmp_path = os.path.join(directory, f'.tmp-{os.getpid()}-{os.path.basename(path)}')
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path: str, data: dict) -> None:
+    """Write data to path as JSON via write_atomic."""
+    import json
+
+    write_atomic(path, json.dumps(data, separators=(',', ':')))
@@ -2,11 +2,32 @@
 """
 Security Reminder Hook for Claude Code
 This hook checks for security patterns in file edits and warns about potential vulnerabilities.
+
+By default a reminder blocks the edit (exit code 2), and Claude retries it
+after reading the reminder. In advise mode the edit goes ahead and the
+reminder is added to Claude's context instead, which saves resending a
+large Write. Rules configured as hard failures still block in advise mode.
+
+Content patterns only look at text the edit introduces: the lines of a
+Write that aren't already in the file on disk, and the lines of each
+new_string that aren't in its old_string. New files, and files too big to
+read cheaply, are scanned in full.
+
+Configuration, environment variables first:
+- SECURITY_REMINDER_MODE: "block" (default) or "advise"
+- SECURITY_REMINDER_BLOCK_RULES: comma-separated rule names that always block
+- Settings files, the first one found: .claude/security-guidance.local.json
+  in the project, then ~/.claude/security-guidance.json, holding
+  {"mode": "advise", "block_rules": ["eval_injection"]}
+- A pattern in SECURITY_PATTERNS with "hard_fail": True always blocks
+- SECURITY_REMINDER_DIFF: "0" to scan the whole content of every edit
 """
 
+import hashlib
 import json
 import os
 import random
+import re
 import sys
 from datetime import datetime
 
@@ -25,7 +46,14 @@ def debug_log(message):
         pass
 
 
-# State file to track warnings shown (session-scoped using session ID)
+# How reminders are delivered: block the tool call, or add context and
+# allow it. SECURITY_REMINDER_MODE overrides the first settings file found.
+MODES = ("block", "advise")
+DEFAULT_MODE = "block"
+SETTINGS_FILES = (
+    os.path.join(os.environ.get("CLAUDE_PROJECT_DIR", "."), ".claude", "security-guidance.local.json"),
+    os.path.expanduser("~/.claude/security-guidance.json"),
+)
 
 # Security patterns configuration
 SECURITY_PATTERNS = [
@@ -126,88 +154,413 @@ Only use exec() if you absolutely need shell features and the input is guarantee
 ]
 
 
-def get_state_file(session_id):
-    """Get session-specific state file path."""
-    return os.path.expanduser(f"~/.claude/security_warnings_state_{session_id}.json")
-
+# Content substrings are looked for with one `in` scan each while there
+# are fewer than this many; from this many on, one combined scan is faster
+AUTOMATON_MIN_SUBSTRINGS = 24
+
+# Combined matcher built from the substrings, reused until they change
+AUTOMATON_CACHE_FILE = os.path.expanduser("~/.claude/security_patterns_automaton.json")
+AUTOMATON_VERSION = 2
+
+# Matches in a row that find no new pattern before the combined scan is
+# narrowed to the substrings still missing
+NARROW_AFTER = 64
+
+# In-process copy of the automaton
+_automaton = None
+
+
+def substring_owners():
+    """Map each content substring to the indexes of the patterns listing it.
+
+    Insertion order follows SECURITY_PATTERNS.
+    """
+    owners = {}
+    for index, pattern in enumerate(SECURITY_PATTERNS):
+        for substring in pattern.get("substrings", ()):
+            indexes = owners.setdefault(substring, [])
+            if index not in indexes:
+                indexes.append(index)
+    return owners
+
+
+def trie_regex(substrings):
+    """Build a regex matching any of the substrings, sharing common prefixes.
+
+    At each position it matches the longest substring starting there:
+    the others starting there are prefixes of it.
+    """
+    trie = {}
+    for substring in substrings:
+        node = trie
+        for char in substring:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy, so longer substrings win over ones ending here
+        return body if "" not in node else ("(?:" + body + ")?" if len(branches) == 1 else body + "?")
+
+    return emit(trie)
+
+
+def build_automaton(owners):
+    """Compile content substrings into a single-pass matcher.
+
+    Returns:
+        Dict with "source", the trie_regex of all substrings, and
+        "patterns", mapping each substring to the indexes of the
+        patterns of every substring it contains: a match of it means
+        all of those occur.
+    """
+    patterns = {}
+    for substring in owners:
+        implied = set()
+        for other, indexes in owners.items():
+            if other in substring:
+                implied.update(indexes)
+        patterns[substring] = sorted(implied)
+    return {"source": trie_regex(owners), "patterns": patterns}
+
+
+def load_automaton(owners):
+    """Get the automaton for owners, from the cache file if it is current."""
+    global _automaton
+    key = hashlib.sha256(json.dumps(list(owners.items())).encode("utf-8", "surrogatepass")).hexdigest()
+    if _automaton is not None and _automaton["key"] == key:
+        return _automaton
+
+    automaton = None
+    try:
+        with open(AUTOMATON_CACHE_FILE, "r") as f:
+            cached = json.load(f)
+        if cached.get("version") == AUTOMATON_VERSION and cached.get("key") == key:
+            automaton = cached
+    except (OSError, ValueError):
+        pass
 
-def cleanup_old_state_files():
-    """Remove state files older than 30 days."""
+    if automaton is None:
+        automaton = build_automaton(owners)
+        automaton.update(version=AUTOMATON_VERSION, key=key)
+        try:
+            os.makedirs(os.path.dirname(AUTOMATON_CACHE_FILE), exist_ok=True)
+            temp_file = f"{AUTOMATON_CACHE_FILE}.{os.getpid()}.tmp"
+            with open(temp_file, "w") as f:
+                json.dump(automaton, f)
+            os.replace(temp_file, AUTOMATON_CACHE_FILE)
+        except OSError as e:
+            debug_log(f"Failed to save pattern automaton: {e}")
+
+    automaton["regex"] = re.compile(automaton["source"])
+    _automaton = automaton
+    return automaton
+
+
+def content_matches(content):
+    """Find every pattern with a substring in content.
+
+    Returns:
+        Set of the patterns' indexes in SECURITY_PATTERNS.
+    """
+    owners = substring_owners()
+    if len(owners) < AUTOMATON_MIN_SUBSTRINGS:
+        return {index for substring, indexes in owners.items() if substring in content for index in indexes}
+
+    automaton = load_automaton(owners)
+    regex = automaton["regex"]
+    found = set()
+    missing = owners
+    useless = 0
+    pos = 0
+    while missing:
+        match = regex.search(content, pos)
+        if match is None:
+            break
+        pos = match.start() + 1
+        new = set(automaton["patterns"][match.group()]) - found
+        if not new:
+            useless += 1
+            if useless >= NARROW_AFTER and len(missing) < len(owners):
+                # Stop revisiting substrings of patterns already found
+                regex = re.compile(trie_regex(missing))
+                owners = missing
+                useless = 0
+            continue
+        found |= new
+        missing = {substring: indexes for substring, indexes in missing.items() if not found.issuperset(indexes)}
+        if len(missing) < AUTOMATON_MIN_SUBSTRINGS:
+            # Few enough left to look for one by one
+            for substring, indexes in missing.items():
+                if content.find(substring, pos) >= 0:
+                    found.update(indexes)
+            break
+    return found
+
+
+# Warnings already shown, per session, in one SQLite database (WAL mode,
+# so concurrent hooks in one session see each other's inserts)
+STATE_DB_FILE = os.path.expanduser("~/.claude/security_warnings_state.db")
+
+# Shown warnings are forgotten after this many seconds
+STATE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# Seconds to wait for another hook holding the database lock
+STATE_BUSY_TIMEOUT = 5
+
+
+def migrate_legacy_state_files(db):
+    """Move the per-session JSON state files of earlier versions into db.
+
+    Files past STATE_TTL_SECONDS are just removed.
+    """
+    state_dir = os.path.dirname(STATE_DB_FILE)
+    cutoff = datetime.now().timestamp() - STATE_TTL_SECONDS
     try:
-        state_dir = os.path.expanduser("~/.claude")
-        if not os.path.exists(state_dir):
-            return
-
-        current_time = datetime.now().timestamp()
-        thirty_days_ago = current_time - (30 * 24 * 60 * 60)
-
-        for filename in os.listdir(state_dir):
-            if filename.startswith("security_warnings_state_") and filename.endswith(
-                ".json"
-            ):
-                file_path = os.path.join(state_dir, filename)
-                try:
-                    file_mtime = os.path.getmtime(file_path)
-                    if file_mtime < thirty_days_ago:
-                        os.remove(file_path)
-                except (OSError, IOError):
-                    pass  # Ignore errors for individual file cleanup
-    except Exception:
-        pass  # Silently ignore cleanup errors
-
-
-def load_state(session_id):
-    """Load the state of shown warnings from file."""
-    state_file = get_state_file(session_id)
-    if os.path.exists(state_file):
+        filenames = os.listdir(state_dir)
+    except OSError:
+        return
+    prefix, suffix = "security_warnings_state_", ".json"
+    for filename in filenames:
+        if not (filename.startswith(prefix) and filename.endswith(suffix)):
+            continue
+        file_path = os.path.join(state_dir, filename)
+        session_id = filename[len(prefix):-len(suffix)]
         try:
-            with open(state_file, "r") as f:
-                return set(json.load(f))
-        except (json.JSONDecodeError, IOError):
-            return set()
-    return set()
+            shown_at = os.path.getmtime(file_path)
+            if shown_at >= cutoff:
+                with open(file_path, "r") as f:
+                    keys = [str(key) for key in json.load(f)]
+                db.executemany(
+                    "INSERT OR IGNORE INTO shown_warnings VALUES (?, ?, ?)",
+                    [(session_id, key, shown_at) for key in keys],
+                )
+            os.remove(file_path)
+        except (ValueError, TypeError, OSError) as e:
+            debug_log(f"Failed to migrate state file {file_path}: {e}")
+
+
+def open_state_db():
+    """Open the shown-warnings database, creating it on first use."""
+    import sqlite3
+
+    os.makedirs(os.path.dirname(STATE_DB_FILE), exist_ok=True)
+    created = not os.path.exists(STATE_DB_FILE)
+    db = sqlite3.connect(STATE_DB_FILE, timeout=STATE_BUSY_TIMEOUT, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS shown_warnings ("
+        " session_id TEXT NOT NULL,"
+        " warning_key TEXT NOT NULL,"
+        " shown_at REAL NOT NULL,"
+        " PRIMARY KEY (session_id, warning_key)"
+        ") WITHOUT ROWID"
+    )
+    db.execute("CREATE INDEX IF NOT EXISTS shown_warnings_by_time ON shown_warnings (shown_at)")
+    if created:
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            migrate_legacy_state_files(db)
+    return db
+
+
+def claim_warnings(session_id, warning_keys):
+    """Record warnings as shown in a session, returning those not shown before.
+
+    Insert-if-absent is atomic, so when parallel hooks in one session hit
+    the same warning, exactly one of them gets to show it. On 10% of
+    calls, warnings older than STATE_TTL_SECONDS are deleted.
+
+    Returns:
+        The warning keys that were new, in the order given. All of them
+        if the database can't be used, so warnings are shown rather than lost.
+    """
+    import sqlite3
 
-
-def save_state(session_id, shown_warnings):
-    """Save the state of shown warnings to file."""
-    state_file = get_state_file(session_id)
     try:
-        os.makedirs(os.path.dirname(state_file), exist_ok=True)
-        with open(state_file, "w") as f:
-            json.dump(list(shown_warnings), f)
-    except IOError as e:
-        debug_log(f"Failed to save state file: {e}")
-        pass  # Fail silently if we can't save state
-
-
-def check_patterns(file_path, content):
-    """Check if file path or content matches any security patterns."""
+        db = open_state_db()
+    except (sqlite3.Error, OSError) as e:
+        debug_log(f"Failed to open state database: {e}")
+        return list(warning_keys)
+    try:
+        now = datetime.now().timestamp()
+        new_keys = []
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            for key in warning_keys:
+                cursor = db.execute(
+                    "INSERT OR IGNORE INTO shown_warnings VALUES (?, ?, ?)", (session_id, key, now)
+                )
+                if cursor.rowcount:
+                    new_keys.append(key)
+            if random.random() < 0.1:
+                db.execute("DELETE FROM shown_warnings WHERE shown_at < ?", (now - STATE_TTL_SECONDS,))
+        return new_keys
+    except sqlite3.Error as e:
+        debug_log(f"Failed to update state database: {e}")
+        return list(warning_keys)
+    finally:
+        db.close()
+
+
+def find_patterns(file_path, content):
+    """Find every security pattern the file path or content matches.
+
+    Returns:
+        (ruleName, reminder) pairs in SECURITY_PATTERNS order.
+    """
     # Normalize path by removing leading slashes
     normalized_path = file_path.lstrip("/")
 
-    for pattern in SECURITY_PATTERNS:
-        # Check path-based patterns
+    matched = content_matches(content) if content else set()
+    for index, pattern in enumerate(SECURITY_PATTERNS):
         if "path_check" in pattern and pattern["path_check"](normalized_path):
-            return pattern["ruleName"], pattern["reminder"]
+            matched.add(index)
 
-        # Check content-based patterns
-        if "substrings" in pattern and content:
-            for substring in pattern["substrings"]:
-                if substring in content:
-                    return pattern["ruleName"], pattern["reminder"]
+    return [
+        (SECURITY_PATTERNS[index]["ruleName"], SECURITY_PATTERNS[index]["reminder"])
+        for index in sorted(matched)
+    ]
 
-    return None, None
+
+def check_patterns(file_path, content):
+    """Check if file path or content matches any security patterns.
+
+    Returns:
+        (ruleName, reminder) of the first matching pattern in
+        SECURITY_PATTERNS order, or (None, None).
+    """
+    matches = find_patterns(file_path, content)
+    return matches[0] if matches else (None, None)
+
+
+def format_reminders(matches, blocked=True):
+    """Combine the reminders of several matched patterns into one message.
+
+    Args:
+        matches: (ruleName, reminder) pairs
+        blocked: Whether the edit is blocked, rather than allowed with the
+            reminders added to Claude's context
+    """
+    reminders = [reminder for _, reminder in matches]
+    if blocked:
+        if len(reminders) == 1:
+            return reminders[0]
+        header = f"This edit triggered {len(reminders)} security reminders. Address them all before retrying:"
+    elif len(reminders) == 1:
+        header = "This edit was allowed, but triggered a security reminder. If it applies, fix it in a follow-up edit:"
+    else:
+        header = (f"This edit was allowed, but triggered {len(reminders)} security reminders. "
+                  "If they apply, fix them in a follow-up edit:")
+    return "\n\n---\n\n".join([header] + reminders)
+
+
+def load_settings():
+    """Load the first settings file found, or {} if there is none."""
+    for settings_file in SETTINGS_FILES:
+        try:
+            with open(settings_file, "r") as f:
+                settings = json.load(f)
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as e:
+            debug_log(f"Failed to read settings file {settings_file}: {e}")
+            continue
+        if isinstance(settings, dict):
+            return settings
+    return {}
+
+
+def get_mode(settings):
+    """Get the reminder mode: "block" or "advise"."""
+    mode = os.environ.get("SECURITY_REMINDER_MODE") or settings.get("mode") or DEFAULT_MODE
+    mode = str(mode).strip().lower()
+    return mode if mode in MODES else DEFAULT_MODE
+
+
+def get_block_rules(settings):
+    """Get the names of rules that block even in advise mode."""
+    names = os.environ.get("SECURITY_REMINDER_BLOCK_RULES")
+    if names is not None:
+        names = names.split(",")
+    else:
+        names = settings.get("block_rules") or []
+    rules = {str(name).strip() for name in names if str(name).strip()}
+    rules.update(pattern["ruleName"] for pattern in SECURITY_PATTERNS if pattern.get("hard_fail"))
+    return rules
+
+
+def advise(reminders):
+    """Print hook output adding reminders to Claude's context without blocking."""
+    rule_names = ", ".join(rule_name for rule_name, _ in reminders)
+    print(json.dumps({
+        "hookSpecificOutput": {
+            "hookEventName": "PreToolUse",
+            "additionalContext": format_reminders(reminders, blocked=False),
+        },
+        "systemMessage": f"Security reminder: {rule_names}",
+    }))
+
+
+# Files a Write replaces are diffed against up to this size; larger ones
+# are scanned in full
+DIFF_MAX_BYTES = 16 * 1024 * 1024
+
+
+def added_text(old_text, new_text):
+    """Get the lines of new_text that don't occur anywhere in old_text.
+
+    Lines are compared by hash, so this takes time linear in the size of
+    both texts. A line moved or copied from elsewhere in old_text counts
+    as existing.
+    """
+    if not old_text:
+        return new_text
+    old_lines = set(old_text.splitlines())
+    return "\n".join(line for line in new_text.splitlines() if line not in old_lines)
+
+
+def read_existing_file(file_path):
+    """Read the file a Write replaces, or None if it is new, too big or unreadable."""
+    try:
+        if not os.path.isfile(file_path) or os.path.getsize(file_path) > DIFF_MAX_BYTES:
+            return None
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        debug_log(f"Scanning all of {file_path}, can't read it to diff: {e}")
+        return None
 
 
 def extract_content_from_input(tool_name, tool_input):
-    """Extract content to check from tool input based on tool type."""
+    """Extract content to check from tool input based on tool type.
+
+    Unless SECURITY_REMINDER_DIFF is "0", only text the edit adds is
+    returned (see added_text).
+    """
+    diff = os.environ.get("SECURITY_REMINDER_DIFF", "1") != "0"
     if tool_name == "Write":
-        return tool_input.get("content", "")
+        content = tool_input.get("content", "")
+        if diff and content:
+            existing = read_existing_file(tool_input.get("file_path", ""))
+            if existing is not None:
+                return added_text(existing, content)
+        return content
     elif tool_name == "Edit":
-        return tool_input.get("new_string", "")
+        new_string = tool_input.get("new_string", "")
+        if diff:
+            return added_text(tool_input.get("old_string", ""), new_string)
+        return new_string
     elif tool_name == "MultiEdit":
         edits = tool_input.get("edits", [])
         if edits:
+            if diff:
+                return " ".join(added_text(edit.get("old_string", ""), edit.get("new_string", ""))
+                                for edit in edits)
             return " ".join(edit.get("new_string", "") for edit in edits)
         return ""
 
@@ -223,10 +576,6 @@ def main():
     if security_reminder_enabled == "0":
         sys.exit(0)
 
-    # Periodically clean up old state files (10% chance per run)
-    if random.random() < 0.1:
-        cleanup_old_state_files()
-
     # Read input from stdin
     try:
         raw_input = sys.stdin.read()
@@ -252,24 +601,26 @@ def main():
     # Extract content to check
     content = extract_content_from_input(tool_name, tool_input)
 
-    # Check for security patterns
-    rule_name, reminder = check_patterns(file_path, content)
-
-    if rule_name and reminder:
-        # Create unique warning key
-        warning_key = f"{file_path}-{rule_name}"
-
-        # Load existing warnings for this session
-        shown_warnings = load_state(session_id)
-
-        # Check if we've already shown this warning in this session
-        if warning_key not in shown_warnings:
-            # Add to shown warnings and save
-            shown_warnings.add(warning_key)
-            save_state(session_id, shown_warnings)
-
-            # Output the warning to stderr and block execution
-            print(reminder, file=sys.stderr)
+    # Check for all security patterns at once
+    matches = find_patterns(file_path, content)
+
+    if matches:
+        # Record them all as shown, so the retry isn't blocked again, and
+        # only warn about those not yet shown for this file in this session
+        new_keys = set(claim_warnings(session_id, [f"{file_path}-{rule_name}" for rule_name, _ in matches]))
+        unseen = [(rule_name, reminder) for rule_name, reminder in matches
+                  if f"{file_path}-{rule_name}" in new_keys]
+        if unseen:
+
+            # In advise mode, only rules configured as hard failures block
+            settings = load_settings()
+            block_rules = get_block_rules(settings)
+            if get_mode(settings) == "advise" and not any(rule_name in block_rules for rule_name, _ in unseen):
+                advise(unseen)
+                sys.exit(0)
+
+            # Output the combined warning to stderr and block execution
+            print(format_reminders(unseen), file=sys.stderr)
             sys.exit(2)  # Block tool execution (exit code 2 for PreToolUse hooks)
 
     # Allow tool to proceed